@@ -0,0 +1,115 @@
+"""
+Deterministyczny generator danych do testów obciążeniowych
+
+Ten sam (size, seed) daje zawsze identyczne tabele, więc wyniki
+przebiegów z różnymi ustawieniami serwera są porównywalne.
+Zapisuje snapshot w formacie `python -m src.cli snapshot`.
+"""
+
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_TYPES = ["government", "deputies", "senate", "president", "citizens", "committee"]
+URGENCIES = ["normal", "normal", "normal", "pilny", "ekspresowy"]
+CATEGORIES = ["finanse", "zdrowie", "edukacja", "infrastruktura", "bezpieczenstwo", "srodowisko",
+              "praca", "kultura", "cyfryzacja", "rolnictwo", "sprawiedliwosc", "inne"]
+STAGES = ["Projekt wpłynął do Sejmu", "Skierowanie do I czytania", "I czytanie w komisjach",
+          "Praca w komisjach", "II czytanie", "III czytanie", "Stanowisko Senatu",
+          "Rozpatrywanie stanowiska Senatu", "Przekazanie Prezydentowi", "Publikacja w Dzienniku Ustaw"]
+LAWS = [f"ustawa z dnia {d} o {topic}" for d, topic in zip(
+    range(1, 41), ["podatku dochodowym", "ochronie zdrowia", "systemie oświaty", "drogach publicznych",
+                   "ochronie środowiska", "prawie pracy", "kulturze", "informatyzacji"] * 5)]
+
+
+def _at(day: date, hour: int = 0) -> str:
+    """Znacznik czasu ISO 8601 w UTC - wszystkie daty fixture'a mają strefę"""
+    return f"{day.isoformat()}T{hour:02d}:00:00+00:00"
+
+
+def generate(size: int = 2000, seed: int = 42) -> Dict[str, List[Dict]]:
+    """Generuje tabele: size procesów i ~3×size głosowań"""
+    rng = random.Random(seed)
+    start = date(2023, 11, 13)
+    processes, votings, stages = [], [], []
+
+    for i in range(size):
+        document_date = start + timedelta(days=rng.randint(0, 700))
+        num_stages = rng.randint(1, len(STAGES))
+        day = document_date
+        timeline = []
+        for position, name in enumerate(STAGES[:num_stages]):
+            end = day + timedelta(days=rng.randint(0, 60))
+            timeline.append({"id": f"s{position}", "name": name, "dateStart": _at(day), "dateEnd": _at(end)})
+            stages.append({"id": len(stages) + 1, "process_id": f"10-{i}", "stage_name": name,
+                           "stage_number": position + 1, "date": _at(day), "updated_at": "2025-01-01T00:00:00+00:00"})
+            day = end
+
+        is_finished = num_stages >= 8 or rng.random() < 0.1
+        processes.append({
+            "id": f"10-{i}",
+            "term_number": 10,
+            "number": str(i + 1),
+            "title": f"Rządowy projekt ustawy o zmianie {rng.choice(LAWS)}",
+            "description": "Projekt dotyczy zmian w przepisach." if rng.random() < 0.7 else None,
+            "document_type": "projekt ustawy",
+            "project_type": rng.choice(PROJECT_TYPES),
+            "urgency": rng.choice(URGENCIES),
+            "current_stage": timeline[-1]["name"],
+            "is_finished": is_finished,
+            "is_rejected": is_finished and rng.random() < 0.15,
+            "document_date": _at(document_date),
+            "change_date": _at(day, 12),
+            "updated_at": "2025-01-01T00:00:00+00:00",
+            "timeline": timeline,
+            "categories": rng.sample(CATEGORIES, rng.randint(1, 3)),
+            "extended_data": {
+                "pdfAnalyzed": rng.random() < 0.5,
+                "simpleSummary": "Krótki opis projektu." if rng.random() < 0.6 else None,
+                "keyChanges": ["zmiana"] * rng.randint(0, 5),
+                "tags": ["tag"] * rng.randint(0, 4),
+                "relatedLaws": [
+                    {"title": rng.choice(LAWS), "relation": rng.choice(["nowelizuje", "uchyla", "odwołuje"]),
+                     "dziennikUstaw": f"Dz.U. {rng.randint(2000, 2024)} poz. {rng.randint(1, 2500)}"}
+                    for _ in range(rng.randint(0, 4))
+                ],
+            },
+        })
+
+        for _ in range(rng.randint(0, 6)):
+            yes = rng.randint(0, 460)
+            no = rng.randint(0, 460 - yes)
+            abstain = rng.randint(0, 460 - yes - no)
+            votings.append({
+                "id": len(votings) + 1,
+                "term_number": 10,
+                "sitting_number": len(votings) // 40 + 1,
+                "voting_number": len(votings) % 40 + 1,
+                "date": _at(document_date + timedelta(days=rng.randint(0, 200)), 10),
+                "topic": f"Głosowanie nad projektem nr {i + 1}",
+                "yes_count": yes,
+                "no_count": no,
+                "abstain_count": abstain,
+                "not_participating": 460 - yes - no - abstain,
+                "process_id": f"10-{i}",
+                "updated_at": "2025-01-01T00:00:00+00:00",
+            })
+
+    return {"processes": processes, "votings": votings, "process_stages": stages, "prints": []}
+
+
+def write_snapshot(path: Path, size: int, seed: int) -> Path:
+    """Zapisuje fixture jako katalog snapshotu (pomija, jeśli już istnieje)"""
+    path = Path(path)
+    marker = path / ".complete"
+    if marker.exists():
+        return path
+
+    path.mkdir(parents=True, exist_ok=True)
+    for name, rows in generate(size, seed).items():
+        with open(path / f"{name}.json", "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False)
+    marker.touch()
+    return path
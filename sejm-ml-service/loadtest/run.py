@@ -0,0 +1,361 @@
+"""
+Test obciążeniowy Sejm ML Service na lokalnym fixture
+
+Przykłady:
+    python -m loadtest.run --size 5000 --workers 2 --concurrency 16 --duration 30
+    python -m loadtest.run --mix analyze/all=1,analyze/process-dynamics=4 --env REPLICA_ENABLED=false
+    python -m loadtest.run compare
+
+Przebieg:
+1. generuje deterministyczny fixture (loadtest.fixture) o zadanym rozmiarze,
+2. startuje `uvicorn loadtest.server:app` z N workerami,
+3. po rozgrzewce wysyła żądania z zadaną współbieżnością i miksem endpointów,
+4. mierzy opóźnienia, błędy, przepustowość oraz CPU/RSS każdego workera (/proc),
+5. zapisuje wynik do loadtest/results/<znacznik>.json.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from loadtest.fixture import write_snapshot
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_MIX = "analyze/all=1,analyze/process-dynamics=3,analyze/voting-patterns=3,analyze/law-references=2,analyze/success-prediction=2"
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def parse_mix(mix: str) -> List[Tuple[str, float]]:
+    """'analyze/all=1,flow/transitions=2' -> [('/analyze/all', 1.0), ...]"""
+    entries = []
+    for part in mix.split(","):
+        path, _, weight = part.strip().partition("=")
+        entries.append(("/" + path.strip("/"), float(weight or 1)))
+    return entries
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def latency_stats(latencies: List[float]) -> Dict[str, float]:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 1),
+        "p90_ms": round(percentile(values, 90) * 1000, 1),
+        "p99_ms": round(percentile(values, 99) * 1000, 1),
+        "max_ms": round(values[-1] * 1000, 1) if values else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 1) if values else 0.0,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Procesy serwera (/proc)
+# ---------------------------------------------------------------------------
+
+def _children(pid: int) -> List[int]:
+    children = []
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            fields = (entry / "stat").read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry.name))
+    return children
+
+
+def _process_usage(pid: int) -> Tuple[float, int]:
+    """(czas CPU w sekundach, RSS w bajtach)"""
+    fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    rss = 0
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            rss = int(line.split()[1]) * 1024
+    return cpu, rss
+
+
+class ResourceSampler(threading.Thread):
+    """Próbkuje CPU i RSS procesu serwera oraz jego workerów"""
+
+    def __init__(self, root_pid: int, interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.root_pid = root_pid
+        self.interval = interval
+        self.start_cpu: Dict[int, float] = {}
+        self.last_cpu: Dict[int, float] = {}
+        self.peak_rss: Dict[int, int] = defaultdict(int)
+        self._halt = threading.Event()
+        self._started_at = 0.0
+
+    def pids(self) -> List[int]:
+        return [self.root_pid] + _children(self.root_pid)
+
+    def sample(self):
+        for pid in self.pids():
+            try:
+                cpu, rss = _process_usage(pid)
+            except (OSError, IndexError):
+                continue
+            self.start_cpu.setdefault(pid, cpu)
+            self.last_cpu[pid] = cpu
+            self.peak_rss[pid] = max(self.peak_rss[pid], rss)
+
+    def run(self):
+        self._started_at = time.perf_counter()
+        while not self._halt.is_set():
+            self.sample()
+            self._halt.wait(self.interval)
+
+    def stop(self) -> List[Dict]:
+        self._halt.set()
+        self.join()
+        self.sample()
+        elapsed = time.perf_counter() - self._started_at
+        return [
+            {
+                "pid": pid,
+                "role": "master" if pid == self.root_pid else "worker",
+                "cpu_pct": round((self.last_cpu[pid] - self.start_cpu[pid]) / elapsed * 100, 1) if elapsed else 0.0,
+                "peak_rss_mb": round(self.peak_rss[pid] / 2**20, 1),
+            }
+            for pid in self.last_cpu
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Generator obciążenia
+# ---------------------------------------------------------------------------
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[int, int] = defaultdict(int)
+
+    def record(self, path: str, status: int, latency: float):
+        with self.lock:
+            self.statuses[status] += 1
+            if 200 <= status < 300:
+                self.latencies[path].append(latency)
+            else:
+                self.errors[path] += 1
+
+
+def _worker(host: str, port: int, mix, deadline: float, seed: int, recorder: Recorder, timeout: float):
+    rng = random.Random(seed)
+    paths, weights = zip(*mix)
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    while time.perf_counter() < deadline:
+        path = rng.choices(paths, weights)[0]
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            status = 0
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        recorder.record(path, status, time.perf_counter() - started)
+
+    conn.close()
+
+
+def drive(host: str, port: int, mix, concurrency: int, duration: float, timeout: float) -> Tuple[Recorder, float]:
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_worker, args=(host, port, mix, deadline, seed, recorder, timeout))
+        for seed in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder, time.perf_counter() - started
+
+
+# ---------------------------------------------------------------------------
+# Serwer
+# ---------------------------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(fixture: Path, port: int, workers: int, extra_env: Dict[str, str], data_dir: str) -> subprocess.Popen:
+    """
+    Serwer pod obciążeniem na własnym, pustym ML_DATA_DIR: bez stanu ciepłego startu,
+    artefaktów i indeksu z poprzednich przebiegów (i bez zapisu do data/ serwisu)
+    """
+    pythonpath = os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))
+    env = {**os.environ, "ML_DATA_DIR": data_dir, **extra_env, "LOADTEST_FIXTURE": str(fixture), "PYTHONPATH": pythonpath}
+    command = [sys.executable, "-m", "uvicorn", "loadtest.server:app",
+               "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    return subprocess.Popen(command, cwd=ROOT, env=env)
+
+
+def wait_ready(port: int, timeout: float = 60):
+    """Czeka aż /ready zwróci 200 (replika załadowana), nie tylko aż serwer nasłuchuje"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/ready")
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+            if response.status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server not ready on port {port} within {timeout}s")
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def cmd_run(args) -> int:
+    mix = parse_mix(args.mix)
+    extra_env = dict(item.split("=", 1) for item in args.env)
+    fixture = write_snapshot(Path(args.fixture_dir) / f"size{args.size}-seed{args.seed}", args.size, args.seed)
+    port = args.port or _free_port()
+
+    print(f"[loadtest] fixture={fixture} workers={args.workers} concurrency={args.concurrency} duration={args.duration}s")
+    data_dir = tempfile.mkdtemp(prefix="sejm-loadtest-")
+    server = start_server(fixture, port, args.workers, extra_env, data_dir)
+    try:
+        wait_ready(port)
+        if args.warmup > 0:
+            print(f"[loadtest] warming up for {args.warmup}s...")
+            drive("127.0.0.1", port, mix, min(args.concurrency, 2), args.warmup, args.timeout)
+
+        sampler = ResourceSampler(server.pid)
+        sampler.start()
+        recorder, elapsed = drive("127.0.0.1", port, mix, args.concurrency, args.duration, args.timeout)
+        processes = sampler.stop()
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    name = args.label or f"{datetime.now():%Y%m%d-%H%M%S}-w{args.workers}-c{args.concurrency}"
+    total_ok = sum(len(v) for v in recorder.latencies.values())
+    total_errors = sum(recorder.errors.values())
+    total = total_ok + total_errors
+    result = {
+        "label": name,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "size": args.size, "seed": args.seed, "workers": args.workers,
+            "concurrency": args.concurrency, "duration_s": args.duration,
+            "mix": args.mix, "env": extra_env,
+        },
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "error_rate_pct": round(total_errors / total * 100, 2) if total else 0.0,
+        "statuses": dict(recorder.statuses),
+        "latency": latency_stats([l for values in recorder.latencies.values() for l in values]),
+        "endpoints": {
+            path: {**latency_stats(recorder.latencies[path]), "errors": recorder.errors[path]}
+            for path, _ in mix
+        },
+        "processes": processes,
+    }
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"{name}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+    print_results([result])
+    print(f"[loadtest] saved {path}")
+    return 0 if result["error_rate_pct"] == 0 else 1
+
+
+def print_results(results: List[Dict]):
+    header = f"{'run':<32} {'workers':>7} {'conc':>5} {'rps':>8} {'err%':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'cpu%':>7} {'rss MB':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        workers = [p for p in r["processes"] if p["role"] == "worker"] or r["processes"]
+        print(
+            f"{r['label']:<32} {r['config']['workers']:>7} {r['config']['concurrency']:>5} "
+            f"{r['throughput_rps']:>8} {r['error_rate_pct']:>6} "
+            f"{r['latency']['p50_ms']:>8} {r['latency']['p90_ms']:>8} {r['latency']['p99_ms']:>8} "
+            f"{sum(p['cpu_pct'] for p in workers):>7.1f} {sum(p['peak_rss_mb'] for p in workers):>8.1f}"
+        )
+
+
+def cmd_compare(args) -> int:
+    files = [Path(f) for f in args.files] or sorted(RESULTS_DIR.glob("*.json"))
+    if not files:
+        print(f"[loadtest] no results in {RESULTS_DIR}")
+        return 1
+    results = []
+    for file in files:
+        with open(file, encoding="utf-8") as f:
+            results.append(json.load(f))
+    print_results(results)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.run", description="Sejm ML Service load test")
+    parser.set_defaults(handler=cmd_run)
+    parser.add_argument("--size", type=int, default=2000, help="number of processes in the fixture")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent client connections")
+    parser.add_argument("--duration", type=float, default=20, help="measured phase in seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="warm-up phase in seconds (not measured)")
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout in seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint=weight pairs, comma separated")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra server environment")
+    parser.add_argument("--port", type=int, help="server port (default: random free port)")
+    parser.add_argument("--label", help="result name (default: timestamp + settings)")
+    parser.add_argument("--fixture-dir", default=str(Path(__file__).resolve().parent / "fixtures"))
+
+    commands = parser.add_subparsers(dest="command")
+    compare = commands.add_parser("compare", help="print saved results side by side")
+    compare.add_argument("files", nargs="*", help="result files (default: all in loadtest/results)")
+    compare.set_defaults(handler=cmd_compare)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Aplikacja src.main:app z warstwą danych podmienioną na lokalny fixture
+
+Uruchamiana przez loadtest.run jako `uvicorn loadtest.server:app`;
+każdy worker importuje ten moduł, więc podmiana działa w każdym procesie.
+Katalog fixture'a wskazuje zmienna LOADTEST_FIXTURE.
+"""
+
+import json
+import os
+from pathlib import Path
+
+# src.config wymaga danych logowania Supabase — nie są używane
+os.environ.setdefault("SUPABASE_URL", "http://loadtest.invalid")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "loadtest")
+
+from src import database  # noqa: E402
+
+_FIXTURE = Path(os.environ["LOADTEST_FIXTURE"])
+_TABLES = {
+    "legislative_processes": "processes",
+    "votings": "votings",
+    "process_stages": "process_stages",
+    "prints": "prints",
+}
+_cache = {}
+
+
+def _rows(table: str):
+    if table not in _cache:
+        file = _FIXTURE / f"{_TABLES[table]}.json"
+        with open(file, encoding="utf-8") as f:
+            _cache[table] = json.load(f)
+    # Kopia listy: zachowuje się jak świeża odpowiedź z bazy
+    return list(_cache[table])
+
+
+database.fetch_table = _rows
+database.fetch_rows_since = lambda table, since: [r for r in _rows(table) if (r.get("updated_at") or "") >= since]
+database.fetch_ids = lambda table: [r["id"] for r in _rows(table)]
+
+from src.main import app  # noqa: E402,F401
@@ -1,6 +1,16 @@
 #!/bin/bash
 
 # Sejm ML Service - Quick Start Script
+#
+# Bez argumentów: interaktywne menu.
+# Z argumentami: przekazuje je do nieinteraktywnego CLI, np.
+#   ./run.sh run --all --jobs 4 --out results/
+
+# W trybie CLI komunikaty przygotowania (echo, venv, pip) idą na stderr:
+# stdout należy do wyników (JSON na stdout bez --out)
+if [ $# -gt 0 ]; then
+    exec 3>&1 1>&2
+fi
 
 echo "🚀 Sejm ML Service"
 echo "=================="
@@ -27,6 +37,11 @@ if [ ! -f ".env" ]; then
     exit 1
 fi
 
+# Tryb nieinteraktywny (cron, Ansible)
+if [ $# -gt 0 ]; then
+    exec python -m src.cli "$@" 1>&3 3>&-
+fi
+
 echo ""
 echo "✅ Setup complete!"
 echo ""
@@ -63,13 +78,7 @@ case $choice in
         ;;
     6)
         echo "🔄 Running ALL analyses..."
-        python -m src.analyzers.law_references
-        echo ""
-        python -m src.analyzers.process_dynamics
-        echo ""
-        python -m src.analyzers.voting_patterns
-        echo ""
-        python -m src.analyzers.success_prediction
+        python -m src.cli run --all --out results/
         ;;
     *)
         echo "Invalid choice"
@@ -0,0 +1,126 @@
+"""
+Scalanie identycznych żądań (single-flight) i kontrola dopuszczenia analiz
+
+- Identyczne żądania w locie (nazwa analizy + parametry) czekają na jedno
+  wspólne obliczenie zamiast uruchamiać własne.
+- Każdy typ analizy ma limit równoległych obliczeń i ograniczoną kolejkę;
+  po jej przepełnieniu żądanie dostaje 503 z Retry-After, zamiast dokładać
+  kolejne kopie ciężkich zadań pandas.
+- Obliczenie działa w osobnym zadaniu, więc rozłączenie klienta, który je
+  zainicjował, nie przerywa go pozostałym oczekującym.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Saturated(Exception):
+    """Kolejka analizy jest pełna"""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"Analysis '{name}' is saturated, retry after {retry_after}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class _Gate:
+    """Limit równoległości + licznik oczekujących dla jednego typu analizy"""
+
+    def __init__(self, concurrency: int, queue_size: int):
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.admitted = 0
+        self.avg_duration: Optional[float] = None
+
+    def observe(self, duration: float):
+        # Średnia krocząca czasu obliczenia - podstawa Retry-After
+        self.avg_duration = duration if self.avg_duration is None else 0.8 * self.avg_duration + 0.2 * duration
+
+    def retry_after(self) -> int:
+        waves = math.ceil((self.admitted + 1) / max(self.concurrency, 1))
+        return max(1, math.ceil((self.avg_duration or 1.0) * waves))
+
+
+class AdmissionController:
+    """
+    Args:
+        limits: nazwa analizy -> (równoległość, rozmiar kolejki)
+        default: limity dla analiz spoza `limits`
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[int, int]], default: Tuple[int, int]):
+        self.limits = limits
+        self.default = default
+        self._gates: Dict[str, _Gate] = {}
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def _gate(self, name: str) -> _Gate:
+        if name not in self._gates:
+            self._gates[name] = _Gate(*self.limits.get(name, self.default))
+        return self._gates[name]
+
+    async def run(self, name: str, fn: Callable[..., Any], **params) -> Any:
+        """
+        Uruchamia `fn(**params)` w wątku z scalaniem i limitami
+
+        Raises:
+            Saturated: przekroczono równoległość + kolejkę dla `name`
+        """
+        key = (name, tuple(sorted(params.items())))
+
+        task = self._inflight.get(key)
+        if task is not None:
+            logger.info(f"[Admission] {name}: joined in-flight computation")
+            return await asyncio.shield(task)
+
+        gate = self._gate(name)
+        if gate.admitted >= gate.concurrency + gate.queue_size:
+            raise Saturated(name, gate.retry_after())
+
+        gate.admitted += 1
+        task = asyncio.create_task(self._execute(gate, fn, params))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish(key, gate, t))
+        return await asyncio.shield(task)
+
+    async def _execute(self, gate: _Gate, fn: Callable[..., Any], params: Dict[str, Any]) -> Any:
+        async with gate.semaphore:
+            started = time.perf_counter()
+            try:
+                return await asyncio.to_thread(fn, **params)
+            finally:
+                gate.observe(time.perf_counter() - started)
+
+    def _finish(self, key: Hashable, gate: _Gate, task: asyncio.Task):
+        gate.admitted -= 1
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Oznacz wyjątek jako odebrany, nawet jeśli wszyscy klienci się rozłączyli
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Stan kolejek (dla monitoringu)"""
+        return {
+            name: {
+                "admitted": gate.admitted,
+                "concurrency": gate.concurrency,
+                "queue_size": gate.queue_size,
+                "avg_duration_s": round(gate.avg_duration, 3) if gate.avg_duration is not None else None,
+            }
+            for name, gate in self._gates.items()
+        }
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    """'all:1:2,process_dynamics:2:8' -> {'all': (1, 2), 'process_dynamics': (2, 8)}"""
+    limits = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, concurrency, queue_size = part.split(":")
+        limits[name] = (int(concurrency), int(queue_size))
+    return limits
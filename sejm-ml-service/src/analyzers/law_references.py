@@ -13,7 +13,8 @@ import pandas as pd
 from collections import Counter, defaultdict
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
-from src.database import fetch_all_processes, save_analysis_results
+from src.database import save_analysis_results
+from src.pipeline import analysis, run_analysis
 
 # Regex patterns for detecting law references in Polish legislative text
 LAW_PATTERNS = [
@@ -73,20 +74,11 @@ def extract_law_references(text: str) -> List[Dict[str, str]]:
 
     return references
 
-def analyze_law_references():
+@analysis("law_references", deps=["processes", "related_laws"])
+def compute_law_references(processes: List[Dict], related_laws: List[Dict]) -> Dict[str, Any]:
     """
-    Główna funkcja analizy odwołań do ustaw
-
-    Returns:
-        Dict z wynikami analizy:
-        - most_referenced: najczęściej przywoływane ustawy
-        - most_amended: najczęściej nowelizowane
-        - trending: ostatnio często zmieniane
-        - reference_network: sieć powiązań
+    Liczy statystyki odwołań na podstawie tabeli related_laws
     """
-    print("[Law References] Fetching data...")
-    processes = fetch_all_processes()
-
     if not processes:
         print("[Law References] No processes found")
         return {}
@@ -106,44 +98,33 @@ def analyze_law_references():
     six_months_ago = datetime.now() - timedelta(days=180)
     recent_references = Counter()
 
-    for proc in processes:
-        process_id = proc.get("id")
-        process_number = proc.get("number")
-        change_date = proc.get("change_date")
-
-        # Sprawdź extended_data.relatedLaws (z AI)
-        extended_data = proc.get("extended_data", {})
-        related_laws = extended_data.get("relatedLaws", [])
-
-        for law in related_laws:
-            law_title = law.get("title", "").strip()
-            relation_type = law.get("relation", "")
-            dz_u = law.get("dziennikUstaw", "")
-
-            if law_title:
-                all_references[law_title] += 1
-                process_law_network[process_number].append({
-                    "law": law_title,
-                    "relation": relation_type,
-                    "dz_u": dz_u
-                })
-
-                if relation_type == "nowelizuje":
-                    amendment_references[law_title] += 1
-                elif relation_type == "uchyla":
-                    repeal_references[law_title] += 1
-
-                if dz_u:
-                    dz_u_references[dz_u] += 1
-
-                # Trendy
-                if change_date:
-                    try:
-                        proc_date = datetime.fromisoformat(change_date.replace("Z", "+00:00"))
-                        if proc_date > six_months_ago:
-                            recent_references[law_title] += 1
-                    except:
-                        pass
+    for row in related_laws:
+        law_title = row["law"]
+        relation_type = row["relation"]
+        dz_u = row["dz_u"]
+
+        all_references[law_title] += 1
+        process_law_network[row["process_number"]].append({
+            "law": law_title,
+            "relation": relation_type,
+            "dz_u": dz_u
+        })
+
+        if relation_type == "nowelizuje":
+            amendment_references[law_title] += 1
+        elif relation_type == "uchyla":
+            repeal_references[law_title] += 1
+
+        if dz_u:
+            dz_u_references[dz_u] += 1
+
+        # Trendy
+        if row["change_date"]:
+            try:
+                if row["change_date"] > six_months_ago:
+                    recent_references[law_title] += 1
+            except TypeError:
+                pass
 
     # Przygotuj wyniki
     results = {
@@ -184,6 +165,20 @@ def analyze_law_references():
 
     return results
 
+def analyze_law_references():
+    """
+    Główna funkcja analizy odwołań do ustaw
+
+    Returns:
+        Dict z wynikami analizy:
+        - most_referenced: najczęściej przywoływane ustawy
+        - most_amended: najczęściej nowelizowane
+        - trending: ostatnio często zmieniane
+        - reference_network: sieć powiązań
+    """
+    print("[Law References] Fetching data...")
+    return run_analysis("law_references")
+
 if __name__ == "__main__":
     print("=" * 60)
     print("📜 LAW REFERENCES ANALYZER")
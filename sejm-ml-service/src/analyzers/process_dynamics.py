@@ -13,55 +13,32 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from collections import defaultdict
-from typing import List, Dict, Any
-from src.database import fetch_all_processes, fetch_process_stages
+from typing import List, Dict, Any, Tuple
+from src.artifacts import days_between
+from src.pipeline import analysis, run_analysis
 
-def calculate_stage_durations(timeline: List[Dict]) -> Dict[str, float]:
+def group_stage_durations(stages: List[Dict]) -> Dict[int, Dict[str, int]]:
     """
-    Oblicza czas trwania każdego etapu w timeline
+    Grupuje wiersze spłaszczonego timeline'u per proces
 
     Returns:
-        Dict: {"nazwa_etapu": dni_trwania}
+        Dict: {indeks_procesu: {"nazwa_etapu": dni_trwania}}
     """
-    if not timeline:
-        return {}
-
-    durations = {}
-
-    for i, node in enumerate(timeline):
-        date_start = node.get("dateStart")
-        date_end = node.get("dateEnd")
+    durations = defaultdict(dict)
 
-        if not date_start or not date_end:
-            continue
-
-        try:
-            start = datetime.fromisoformat(date_start.replace("Z", "+00:00"))
-            end = datetime.fromisoformat(date_end.replace("Z", "+00:00"))
-            duration_days = (end - start).days
-
-            stage_name = node.get("name", f"Stage {i+1}")
-            durations[stage_name] = duration_days
-        except:
+    for row in stages:
+        if row["duration_days"] is None:
             continue
+        durations[row["process"]][row["stage"]] = row["duration_days"]
 
     return durations
 
-def analyze_process_dynamics():
+@analysis("process_dynamics", deps=["processes", "process_dates", "timeline"])
+def compute_process_dynamics(processes: List[Dict], process_dates: List[Tuple], timeline: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Główna funkcja analizy dynamiki procesów
-
-    Returns:
-        Dict z wynikami analizy:
-        - avg_total_duration: średni czas całego procesu
-        - avg_stage_durations: średnie czasy poszczególnych etapów
-        - bottlenecks: etapy, które trwają najdłużej
-        - speed_by_type: tempo różnych typów projektów
-        - monthly_trends: trendy miesięczne
+    Liczy statystyki dynamiki na podstawie wspólnych artefaktów
+    (sparsowane daty i spłaszczony timeline)
     """
-    print("[Process Dynamics] Fetching data...")
-    processes = fetch_all_processes()
-
     if not processes:
         print("[Process Dynamics] No processes found")
         return {}
@@ -81,45 +58,32 @@ def analyze_process_dynamics():
     monthly_finished = defaultdict(int)
     monthly_started = defaultdict(int)
 
-    for proc in processes:
+    stage_durations_by_process = group_stage_durations(timeline["stages"])
+
+    for index, proc in enumerate(processes):
         process_id = proc.get("id")
         project_type = proc.get("project_type", "unknown")
         is_finished = proc.get("is_finished", False)
         is_rejected = proc.get("is_rejected", False)
-        document_date = proc.get("document_date")
-        change_date = proc.get("change_date")
-        timeline = proc.get("timeline", [])
+        start, end = process_dates[index]
 
         # Oblicz całkowity czas procesu
-        total_duration = None
-        if is_finished and document_date and change_date:
-            try:
-                start = datetime.fromisoformat(document_date.replace("Z", "+00:00"))
-                end = datetime.fromisoformat(change_date.replace("Z", "+00:00"))
-                total_duration = (end - start).days
-
-                if 0 < total_duration < 3650:  # Filtruj nieprawidłowe
-                    total_durations.append(total_duration)
-                    durations_by_type[project_type].append(total_duration)
-
-                    # Trendy miesięczne
-                    month_key = end.strftime("%Y-%m")
-                    monthly_finished[month_key] += 1
-            except:
-                pass
+        total_duration = days_between(start, end) if is_finished else None
+        if total_duration is not None and 0 < total_duration < 3650:  # Filtruj nieprawidłowe
+            total_durations.append(total_duration)
+            durations_by_type[project_type].append(total_duration)
+
+            # Trendy miesięczne
+            month_key = end.strftime("%Y-%m")
+            monthly_finished[month_key] += 1
 
         # Miesięczne rozpoczęcia
-        if document_date:
-            try:
-                start = datetime.fromisoformat(document_date.replace("Z", "+00:00"))
-                month_key = start.strftime("%Y-%m")
-                monthly_started[month_key] += 1
-            except:
-                pass
+        if start:
+            month_key = start.strftime("%Y-%m")
+            monthly_started[month_key] += 1
 
         # Analizuj czas trwania etapów
-        stage_durations = calculate_stage_durations(timeline)
-        for stage_name, duration in stage_durations.items():
+        for stage_name, duration in stage_durations_by_process.get(index, {}).items():
             if 0 <= duration <= 365:  # Filtruj outliers
                 all_stage_durations[stage_name].append(duration)
 
@@ -129,7 +93,7 @@ def analyze_process_dynamics():
             "is_finished": is_finished,
             "is_rejected": is_rejected,
             "total_duration": total_duration,
-            "num_stages": len(timeline),
+            "num_stages": timeline["lengths"][index],
         })
 
     # Oblicz statystyki
@@ -203,6 +167,21 @@ def analyze_process_dynamics():
 
     return results
 
+def analyze_process_dynamics():
+    """
+    Główna funkcja analizy dynamiki procesów
+
+    Returns:
+        Dict z wynikami analizy:
+        - avg_total_duration: średni czas całego procesu
+        - avg_stage_durations: średnie czasy poszczególnych etapów
+        - bottlenecks: etapy, które trwają najdłużej
+        - speed_by_type: tempo różnych typów projektów
+        - monthly_trends: trendy miesięczne
+    """
+    print("[Process Dynamics] Fetching data...")
+    return run_analysis("process_dynamics")
+
 if __name__ == "__main__":
     print("=" * 60)
     print("⚡ PROCESS DYNAMICS ANALYZER")
@@ -0,0 +1,289 @@
+"""
+Model przejść między etapami procesu legislacyjnego
+
+Funkcje:
+- Kanoniczne identyfikatory etapów (niezależne od wielkości liter i diakrytyków)
+- Macierz liczby i prawdopodobieństwa przejść według project_type i urgency
+- Rozkłady czasu przejścia (dni) dla każdej krawędzi
+- Lejek: jaki odsetek procesów, które osiągnęły etap A, dochodzi do etapu B i w jakim czasie
+
+Model liczony jest raz na wersję danych i zapisywany na dysk (src.pipeline,
+persist=True); zapytania o lejek i przepływ to wyłącznie odczyty z macierzy.
+"""
+
+import re
+import unicodedata
+import numpy as np
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+from src.artifacts import days_between
+from src.pipeline import analysis, artifact, run_analysis
+
+# Klucz segmentu: (project_type, urgency); None = dowolna wartość
+Segment = Tuple[Optional[str], Optional[str]]
+
+DWELL_PERCENTILES = (10, 25, 50, 75, 90)
+
+def canonical_stage_id(name: str) -> str:
+    """
+    Kanoniczny identyfikator etapu: małe litery, bez diakrytyków, słowa łączone "_"
+
+    "I czytanie w komisjach" -> "i_czytanie_w_komisjach"
+    """
+    folded = unicodedata.normalize("NFKD", name.lower().replace("ł", "l"))
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return re.sub(r"[^a-z0-9]+", "_", folded).strip("_")
+
+def _segments_of(project_type: str, urgency: str) -> List[Segment]:
+    """Segment dokładny i wszystkie marginalne (do odczytu bez sumowania)"""
+    return [(project_type, urgency), (project_type, None), (None, urgency), (None, None)]
+
+def summarize_durations(durations: Optional[np.ndarray]) -> Dict[str, Any]:
+    """Statystyki rozkładu czasu (dni) dla krawędzi"""
+    if durations is None or len(durations) == 0:
+        return {"count": 0}
+
+    percentiles = np.percentile(durations, DWELL_PERCENTILES)
+    return {
+        "count": int(len(durations)),
+        "avg_days": round(float(np.mean(durations)), 1),
+        **{f"p{p}_days": round(float(v), 1) for p, v in zip(DWELL_PERCENTILES, percentiles)},
+    }
+
+@artifact("stage_transition_model", deps=["processes", "timeline"], persist=True)
+def build_stage_transition_model(processes: List[Dict], timeline: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Buduje model przejść dla wszystkich segmentów (project_type × urgency + marginalne)
+
+    Returns:
+        Dict:
+        - stages: lista kanonicznych id (indeksy macierzy)
+        - labels: id -> najczęstsza oryginalna nazwa
+        - segments: segment -> {processes, reached, transitions, reach, dwell, lead}
+          - transitions[a, b]: liczba bezpośrednich przejść a -> b
+          - reached[a]: liczba procesów, które osiągnęły a
+          - reach[a, b]: liczba procesów, które osiągnęły a, a później b
+          - dwell[(a, b)]: posortowane dni od startu a do startu następnego b
+          - lead[(a, b)]: posortowane dni od pierwszego a do pierwszego późniejszego b
+    """
+    # Etapy każdego procesu w kolejności z timeline
+    paths = defaultdict(list)
+    names = defaultdict(Counter)
+    for row in sorted(timeline["stages"], key=lambda r: (r["process"], r["position"])):
+        stage_id = canonical_stage_id(str(row["stage"]))
+        if not stage_id:
+            continue
+        names[stage_id][row["stage"]] += 1
+        paths[row["process"]].append((stage_id, row["start"]))
+
+    stages = sorted(names)
+    index = {stage_id: i for i, stage_id in enumerate(stages)}
+    size = len(stages)
+
+    segments: Dict[Segment, Dict[str, Any]] = {}
+    dwell_lists = defaultdict(lambda: defaultdict(list))
+    lead_lists = defaultdict(lambda: defaultdict(list))
+
+    def segment(key: Segment) -> Dict[str, Any]:
+        if key not in segments:
+            segments[key] = {
+                "processes": 0,
+                "reached": np.zeros(size, dtype=np.int32),
+                "transitions": np.zeros((size, size), dtype=np.int32),
+                "reach": np.zeros((size, size), dtype=np.int32),
+            }
+        return segments[key]
+
+    for process_index, path in paths.items():
+        proc = processes[process_index]
+        keys = _segments_of(proc.get("project_type") or "unknown", proc.get("urgency") or "normal")
+
+        # Pierwsze osiągnięcie każdego etapu (kolejność + data startu)
+        first_reach = {}
+        for stage_id, start in path:
+            first_reach.setdefault(stage_id, start)
+        order = list(first_reach)
+
+        for key in keys:
+            seg = segment(key)
+            seg["processes"] += 1
+            for stage_id in order:
+                seg["reached"][index[stage_id]] += 1
+
+            for (a, start_a), (b, start_b) in zip(path, path[1:]):
+                if a == b:
+                    continue
+                seg["transitions"][index[a], index[b]] += 1
+                days = days_between(start_a, start_b)
+                if days is not None and days >= 0:
+                    dwell_lists[key][(index[a], index[b])].append(days)
+
+            for i, a in enumerate(order):
+                for b in order[i + 1:]:
+                    seg["reach"][index[a], index[b]] += 1
+                    days = days_between(first_reach[a], first_reach[b])
+                    if days is not None and days >= 0:
+                        lead_lists[key][(index[a], index[b])].append(days)
+
+    for key, seg in segments.items():
+        seg["dwell"] = {edge: np.sort(np.array(v, dtype=np.float32)) for edge, v in dwell_lists[key].items()}
+        seg["lead"] = {edge: np.sort(np.array(v, dtype=np.float32)) for edge, v in lead_lists[key].items()}
+
+    return {
+        "stages": stages,
+        "labels": {stage_id: counter.most_common(1)[0][0] for stage_id, counter in names.items()},
+        "segments": segments,
+    }
+
+def _segment(model: Dict[str, Any], project_type: Optional[str], urgency: Optional[str]) -> Optional[Dict[str, Any]]:
+    return model["segments"].get((project_type, urgency))
+
+def resolve_stage(model: Dict[str, Any], stage: str) -> Optional[int]:
+    """Indeks etapu po id lub nazwie (dowolna pisownia); None gdy nieznany"""
+    try:
+        return model["stages"].index(canonical_stage_id(stage))
+    except ValueError:
+        return None
+
+def transition_flow(
+    model: Dict[str, Any],
+    project_type: Optional[str] = None,
+    urgency: Optional[str] = None,
+    min_count: int = 1,
+) -> Dict[str, Any]:
+    """
+    Graf przepływu (węzły + krawędzie) dla diagramów procesu w aplikacji web
+
+    Krawędź: liczba przejść, prawdopodobieństwo przejścia z etapu źródłowego,
+    rozkład czasu przejścia.
+    """
+    seg = _segment(model, project_type, urgency)
+    if seg is None:
+        return {"processes": 0, "nodes": [], "edges": []}
+
+    transitions = seg["transitions"]
+    outgoing = transitions.sum(axis=1)
+    stages = model["stages"]
+
+    edges = []
+    for a, b in zip(*np.nonzero(transitions >= max(min_count, 1))):
+        edges.append({
+            "from": stages[a],
+            "to": stages[b],
+            "count": int(transitions[a, b]),
+            "probability": round(float(transitions[a, b] / outgoing[a]), 3),
+            "dwell": summarize_durations(seg["dwell"].get((a, b))),
+        })
+    edges.sort(key=lambda e: e["count"], reverse=True)
+
+    nodes = [
+        {
+            "id": stage_id,
+            "label": model["labels"][stage_id],
+            "reached": int(seg["reached"][i]),
+            "reached_pct": round(float(seg["reached"][i] / seg["processes"] * 100), 1),
+        }
+        for i, stage_id in enumerate(stages)
+        if seg["reached"][i] > 0
+    ]
+    nodes.sort(key=lambda n: n["reached"], reverse=True)
+
+    return {"processes": seg["processes"], "nodes": nodes, "edges": edges}
+
+def funnel(
+    model: Dict[str, Any],
+    stages: List[str],
+    project_type: Optional[str] = None,
+    urgency: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Lejek od pierwszego etapu listy przez kolejne
+
+    Dla każdego kroku X: ile procesów, które osiągnęły pierwszy etap,
+    osiągnęło później X, odpływ względem poprzedniego kroku i czas dojścia.
+
+    Raises:
+        KeyError: nieznany etap
+    """
+    indexes = []
+    for stage in stages:
+        i = resolve_stage(model, stage)
+        if i is None:
+            raise KeyError(f"Unknown stage: {stage}")
+        indexes.append(i)
+
+    seg = _segment(model, project_type, urgency)
+    if seg is None or not indexes:
+        return {"processes": 0, "steps": []}
+
+    start = indexes[0]
+    entered = int(seg["reached"][start])
+    steps = [{
+        "stage": model["stages"][start],
+        "label": model["labels"][model["stages"][start]],
+        "count": entered,
+        "pct_of_start": 100.0 if entered else 0.0,
+        "pct_of_previous": 100.0 if entered else 0.0,
+        "time_from_start": {"count": 0},
+    }]
+
+    previous = entered
+    for i in indexes[1:]:
+        count = int(seg["reach"][start, i])
+        steps.append({
+            "stage": model["stages"][i],
+            "label": model["labels"][model["stages"][i]],
+            "count": count,
+            "pct_of_start": round(count / entered * 100, 1) if entered else 0.0,
+            "pct_of_previous": round(count / previous * 100, 1) if previous else 0.0,
+            "time_from_start": summarize_durations(seg["lead"].get((start, i))),
+        })
+        previous = count
+
+    return {"processes": seg["processes"], "steps": steps}
+
+@analysis("stage_transitions", deps=["stage_transition_model"])
+def compute_stage_transitions(stage_transition_model: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Podsumowanie modelu: najczęstsze etapy i przejścia dla wszystkich procesów
+    """
+    flow = transition_flow(stage_transition_model)
+    print(f"[Stage Transitions] {len(stage_transition_model['stages'])} stages, {len(flow['edges'])} transitions")
+
+    return {
+        "total_processes": flow["processes"],
+        "total_stages": len(stage_transition_model["stages"]),
+        "top_stages": flow["nodes"][:15],
+        "top_transitions": flow["edges"][:20],
+        "segments": sorted(
+            [{"project_type": pt, "urgency": urg, "processes": seg["processes"]}
+             for (pt, urg), seg in stage_transition_model["segments"].items()
+             if pt is not None and urg is not None],
+            key=lambda s: s["processes"],
+            reverse=True,
+        ),
+    }
+
+def analyze_stage_transitions():
+    """
+    Główna funkcja analizy przejść między etapami
+    """
+    print("[Stage Transitions] Fetching data...")
+    return run_analysis("stage_transitions")
+
+def get_stage_transition_model() -> Dict[str, Any]:
+    """Model przejść dla bieżącej wersji danych (z pamięci, dysku lub liczony)"""
+    return run_analysis("stage_transition_model")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🔀 STAGE TRANSITIONS ANALYZER")
+    print("=" * 60)
+    print()
+
+    results = analyze_stage_transitions()
+
+    for edge in results["top_transitions"][:5]:
+        print(f"  {edge['from']} -> {edge['to']}: {edge['count']} (p={edge['probability']})")
+
+    print("\n✅ Analysis complete!")
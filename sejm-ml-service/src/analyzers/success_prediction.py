@@ -14,9 +14,10 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict, Any, Tuple
 from collections import defaultdict
-from src.database import fetch_all_processes
+from src.feature_store import FeatureStore, refresh as refresh_features
+from src.pipeline import analysis, artifact, node_code, run_analysis
 
-def extract_features(process: Dict) -> Dict[str, Any]:
+def extract_features(process: Dict, timeline_length: int | None = None) -> Dict[str, Any]:
     """
     Wyciąga features z procesu do uczenia maszynowego
 
@@ -28,8 +29,13 @@ def extract_features(process: Dict) -> Dict[str, Any]:
     - timeline_length (ile etapów)
     - has_pdf_analysis (czy był PDF)
     - initiator_type
+
+    timeline_length można podać z artefaktu "timeline", by nie mierzyć go ponownie.
+    Zmiana tej funkcji zmienia odcisk kodu węzła feature_store, a z nim
+    wersję schematu magazynu cech (pełna przebudowa).
     """
-    timeline = process.get("timeline", [])
+    if timeline_length is None:
+        timeline_length = len(process.get("timeline") or [])
     categories = process.get("categories", [])
     extended_data = process.get("extended_data", {})
 
@@ -41,7 +47,7 @@ def extract_features(process: Dict) -> Dict[str, Any]:
 
         # Complexity
         "num_categories": len(categories),
-        "timeline_length": len(timeline),
+        "timeline_length": timeline_length,
         "has_description": 1 if process.get("description") else 0,
 
         # AI enrichment
@@ -64,27 +70,46 @@ def extract_features(process: Dict) -> Dict[str, Any]:
 
     return features
 
-def analyze_success_factors():
+@artifact("feature_store", deps=["processes", "timeline"], helpers=[extract_features])
+def build_feature_store(processes: List[Dict], timeline: Dict[str, Any]) -> FeatureStore:
+    """
+    Kolumnowy magazyn cech wyrównany z processes
+
+    extract_features wołane jest tylko dla procesów nowych lub zmienionych
+    od poprzedniej wersji (także sprzed restartu - magazyn jest na dysku).
+    Liczba etapów pochodzi ze wspólnego artefaktu "timeline"; wersja
+    schematu to odcisk kodu tego węzła razem z extract_features.
+    """
+    # Po id procesu, nie po id() obiektu: ProcessList (replika) tworzy nowy
+    # rekord przy każdym dostępie, a zwolnione rekordy dzielą adresy
+    lengths = {proc.get("id"): length for proc, length in zip(processes, timeline["lengths"])}
+    return refresh_features(
+        "success_prediction",
+        processes,
+        lambda proc: extract_features(proc, lengths.get(proc.get("id"))),
+        node_code("feature_store"),
+    )
+
+@artifact("feature_frame", deps=["feature_store"])
+def build_feature_frame(feature_store: FeatureStore) -> pd.DataFrame:
+    """
+    Ramka cech wszystkich procesów (jeden wiersz na proces)
+    """
+    return feature_store.frame()
+
+@analysis("success_prediction", deps=["feature_frame"])
+def compute_success_factors(feature_frame: pd.DataFrame) -> Dict[str, Any]:
     """
     Analizuje czynniki sukcesu procesów legislacyjnych
     (bez użycia ML - statystyczna analiza)
     """
-    print("[Success Prediction] Fetching data...")
-    processes = fetch_all_processes()
-
-    if not processes:
+    if feature_frame.empty:
         print("[Success Prediction] No processes found")
         return {}
 
-    print(f"[Success Prediction] Analyzing {len(processes)} processes...")
-
-    # Wyciągnij features
-    features_list = []
-    for proc in processes:
-        features = extract_features(proc)
-        features_list.append(features)
+    print(f"[Success Prediction] Analyzing {len(feature_frame)} processes...")
 
-    df = pd.DataFrame(features_list)
+    df = feature_frame
 
     # Oblicz statystyki
     total_processes = len(df)
@@ -180,6 +205,14 @@ def analyze_success_factors():
 
     return results
 
+def analyze_success_factors():
+    """
+    Analizuje czynniki sukcesu procesów legislacyjnych
+    (bez użycia ML - statystyczna analiza)
+    """
+    print("[Success Prediction] Fetching data...")
+    return run_analysis("success_prediction")
+
 if __name__ == "__main__":
     print("=" * 60)
     print("🎯 SUCCESS PREDICTION ANALYZER")
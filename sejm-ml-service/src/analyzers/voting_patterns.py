@@ -13,7 +13,7 @@ import pandas as pd
 import numpy as np
 from collections import defaultdict
 from typing import List, Dict, Any
-from src.database import fetch_all_processes, fetch_all_votings
+from src.pipeline import analysis, artifact, run_analysis
 
 def calculate_voting_metrics(voting: Dict) -> Dict[str, Any]:
     """
@@ -58,19 +58,97 @@ def calculate_voting_metrics(voting: Dict) -> Dict[str, Any]:
         "is_passed": yes > no,
     }
 
-def analyze_voting_patterns():
+@artifact("voting_metrics", deps=["votings"])
+def build_voting_metrics(votings: List[Dict]) -> List[Dict[str, Any]]:
     """
-    Główna funkcja analizy wzorców głosowań
+    Głosowania wzbogacone o metryki (pomija głosowania bez głosów)
     """
-    print("[Voting Patterns] Fetching data...")
-    processes = fetch_all_processes()
-    votings = fetch_all_votings()
+    enriched = []
+
+    for voting in votings:
+        metrics = calculate_voting_metrics(voting)
+        if not metrics:
+            continue
+
+        enriched.append({
+            **voting,
+            **metrics
+        })
+
+    return enriched
+
+VOTING_FIELDS = (
+    "id", "term_number", "sitting_number", "voting_number", "date", "topic", "kind",
+    "yes_count", "no_count", "abstain_count", "not_participating",
+)
+
+METRIC_FIELDS = ("yes_pct", "no_pct", "abstain_pct", "turnout_pct", "controversy_score", "margin", "margin_pct", "is_passed")
+
+def summarize_process_votings(votings: List[Dict]) -> Dict[str, Any]:
+    """
+    Agregat głosowań jednego procesu: liczba, średnie, najbardziej sporne
+    i najciaśniejsze głosowanie
+    """
+    if not votings:
+        return {"total_votings": 0}
+
+    most_contested = max(votings, key=lambda v: v["controversy_score"])
+    closest = min(votings, key=lambda v: v["margin_pct"])
+    return {
+        "total_votings": len(votings),
+        "passed": sum(1 for v in votings if v["is_passed"]),
+        "avg_turnout_pct": round(float(np.mean([v["turnout_pct"] for v in votings])), 1),
+        "avg_controversy_score": round(float(np.mean([v["controversy_score"] for v in votings])), 1),
+        "most_contested": {"id": most_contested.get("id"), "topic": most_contested.get("topic", ""),
+                           "controversy_score": most_contested["controversy_score"]},
+        "closest": {"id": closest.get("id"), "topic": closest.get("topic", ""),
+                    "margin_pct": closest["margin_pct"]},
+        "last_voting_date": votings[-1].get("date"),
+    }
+
+@artifact("votes_by_process", deps=["voting_metrics"])
+def build_votes_by_process(voting_metrics: List[Dict]) -> Dict[str, Dict[str, Any]]:
+    """
+    Indeks process_id -> głosowania procesu z metrykami + agregat
+
+    Budowany raz na wersję danych; odczyt dla procesu to jedno wyszukanie
+    w słowniku (także dla list kilkudziesięciu procesów naraz).
+    """
+    grouped = defaultdict(list)
+    for voting in voting_metrics:
+        process_id = voting.get("process_id")
+        if process_id:
+            grouped[process_id].append({
+                **{field: voting.get(field) for field in VOTING_FIELDS},
+                **{field: voting[field] for field in METRIC_FIELDS},
+            })
+
+    index = {}
+    for process_id, votings in grouped.items():
+        votings.sort(key=lambda v: (v.get("date") or "", v.get("sitting_number") or 0, v.get("voting_number") or 0))
+        index[process_id] = {"votings": votings, "summary": summarize_process_votings(votings)}
+
+    print(f"[Voting Patterns] Indexed votings of {len(index)} processes")
+    return index
+
+def get_votes_by_process() -> Dict[str, Dict[str, Any]]:
+    """Indeks głosowań procesów dla bieżącej wersji danych"""
+    return run_analysis("votes_by_process")
+
+def lookup_process_votings(index: Dict[str, Dict[str, Any]], process_id: str) -> Dict[str, Any]:
+    """Głosowania procesu z indeksu (pusty wynik dla procesu bez głosowań)"""
+    return index.get(process_id) or {"votings": [], "summary": summarize_process_votings([])}
 
+@analysis("voting_patterns", deps=["votings", "voting_metrics"])
+def compute_voting_patterns(votings: List[Dict], voting_metrics: List[Dict]) -> Dict[str, Any]:
+    """
+    Liczy statystyki głosowań na podstawie wzbogaconych metryk
+    """
     if not votings:
         print("[Voting Patterns] No votings found")
         return {}
 
-    print(f"[Voting Patterns] Analyzing {len(votings)} votings from {len(processes)} processes...")
+    print(f"[Voting Patterns] Analyzing {len(votings)} votings...")
 
     # Przygotuj metryki
     all_metrics = []
@@ -78,25 +156,12 @@ def analyze_voting_patterns():
     high_turnout_votes = []
     close_votes = []
 
-    # Zgrupuj głosowania według process_id
-    votes_by_process = defaultdict(list)
-
-    for voting in votings:
-        metrics = calculate_voting_metrics(voting)
-        if not metrics:
-            continue
-
-        process_id = voting.get("process_id")
-        voting_data = {
-            **voting,
-            **metrics
-        }
+    for voting in voting_metrics:
+        # Wiersz artefaktu zawiera już metryki głosowania
+        metrics = voting
 
         all_metrics.append(metrics)
 
-        if process_id:
-            votes_by_process[process_id].append(voting_data)
-
         # Kontrowersyjne (>70 controversy score)
         if metrics["controversy_score"] > 70:
             controversial_votes.append({
@@ -167,6 +232,13 @@ def analyze_voting_patterns():
 
     return results
 
+def analyze_voting_patterns():
+    """
+    Główna funkcja analizy wzorców głosowań
+    """
+    print("[Voting Patterns] Fetching data...")
+    return run_analysis("voting_patterns")
+
 if __name__ == "__main__":
     from datetime import datetime
     print("=" * 60)
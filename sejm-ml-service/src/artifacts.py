@@ -0,0 +1,107 @@
+"""
+Wspólne artefakty pochodne liczone raz na wersję danych
+
+- process_dates: sparsowane document_date / change_date
+- timeline: spłaszczony timeline (jeden wiersz na etap) + długości
+- related_laws: tabela extended_data.relatedLaws
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.pipeline import artifact
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """Parsuje datę ISO (także z sufiksem Z); None gdy brak lub błąd"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def days_between(start: Optional[datetime], end: Optional[datetime]) -> Optional[int]:
+    """Liczba dni między datami; None gdy brak danych lub niezgodne strefy"""
+    if start is None or end is None:
+        return None
+    try:
+        return (end - start).days
+    except TypeError:
+        return None
+
+
+@artifact("process_dates", deps=["processes"])
+def build_process_dates(processes: List[Dict]) -> List[Tuple[Optional[datetime], Optional[datetime]]]:
+    """
+    Daty procesów wyrównane z listą processes
+
+    Returns:
+        Lista krotek (document_date, change_date)
+    """
+    return [
+        (parse_date(proc.get("document_date")), parse_date(proc.get("change_date")))
+        for proc in processes
+    ]
+
+
+@artifact("timeline", deps=["processes"])
+def flatten_timeline(processes: List[Dict]) -> Dict[str, Any]:
+    """
+    Spłaszczony timeline wszystkich procesów
+
+    Returns:
+        Dict:
+        - lengths: liczba etapów każdego procesu (wyrównane z processes)
+        - stages: wiersze {process, position, stage, start, end, duration_days}
+    """
+    lengths = []
+    stages = []
+
+    for index, proc in enumerate(processes):
+        timeline = proc.get("timeline") or []
+        lengths.append(len(timeline))
+
+        for position, node in enumerate(timeline):
+            start = parse_date(node.get("dateStart"))
+            end = parse_date(node.get("dateEnd"))
+            stages.append({
+                "process": index,
+                "position": position,
+                "stage": node.get("name", f"Stage {position+1}"),
+                "start": start,
+                "end": end,
+                "duration_days": days_between(start, end),
+            })
+
+    return {"lengths": lengths, "stages": stages}
+
+
+@artifact("related_laws", deps=["processes", "process_dates"])
+def build_related_laws(processes: List[Dict], process_dates: List[Tuple]) -> List[Dict[str, Any]]:
+    """
+    Tabela powiązań proces -> ustawa z extended_data.relatedLaws (AI)
+
+    Returns:
+        Wiersze {process_number, law, relation, dz_u, change_date}
+    """
+    rows = []
+
+    for proc, (_, change_date) in zip(processes, process_dates):
+        extended_data = proc.get("extended_data") or {}
+
+        for law in extended_data.get("relatedLaws", []):
+            law_title = law.get("title", "").strip()
+            if not law_title:
+                continue
+
+            rows.append({
+                "process_number": proc.get("number"),
+                "law": law_title,
+                "relation": law.get("relation", ""),
+                "dz_u": law.get("dziennikUstaw", ""),
+                "change_date": change_date,
+            })
+
+    return rows
@@ -0,0 +1,257 @@
+"""
+Wykresy wyników analiz renderowane po stronie serwera (SVG / PNG)
+
+Zamiast wysyłać do przeglądarki pełne JSON-y (monthly_trends, bottlenecks,
+success_by_project_type...) serwis renderuje gotowe wykresy:
+- matplotlib działa w osobnych procesach (ProcessPoolExecutor), więc
+  rysowanie nie blokuje wątków serwera ani GIL-a,
+- plik jest adresowany wersją danych wyniku (klucz wersji z src.pipeline):
+  ARTIFACTS_DIR/charts/<analiza>.<wykres>.<klucz>.<format>; ta sama wersja
+  danych to zawsze ten sam plik i ten sam ETag,
+- po każdym przeliczeniu analizy wykresy renderowane są z wyprzedzeniem,
+  więc żądanie to zwykle odczyt pliku z dysku.
+
+Pulę procesów i prerender włącza start() wołane przy starcie serwera API;
+inne uruchomienia pipeline'u (CLI, skrypty) nie renderują wykresów.
+"""
+
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config import ARTIFACTS_DIR, CHART_WORKERS
+from src.pipeline import on_computed
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"svg": "image/svg+xml", "png": "image/png"}
+
+FIGSIZE = (8, 4.5)
+DPI = 100
+COLOR = "#dc2626"
+SECONDARY_COLOR = "#2563eb"
+
+
+def _shorten(label: Any, width: int = 40) -> str:
+    label = str(label)
+    return label if len(label) <= width else label[:width - 1] + "…"
+
+
+def _barh(ax, rows: List[Dict], label: str, value: str, xlabel: str):
+    """Poziomy wykres słupkowy (pierwszy wiersz na górze)"""
+    rows = list(reversed(rows))
+    ax.barh([_shorten(r[label]) for r in rows], [r[value] for r in rows], color=COLOR)
+    ax.set_xlabel(xlabel)
+
+
+def _monthly_trends(ax, data: Dict):
+    rows = data.get("monthly_trends", [])
+    months = [r["month"] for r in rows]
+    ax.plot(months, [r["started"] for r in rows], marker="o", color=SECONDARY_COLOR, label="Rozpoczęte")
+    ax.plot(months, [r["finished"] for r in rows], marker="o", color=COLOR, label="Zakończone")
+    ax.set_ylabel("Liczba procesów")
+    ax.tick_params(axis="x", rotation=45)
+    ax.legend()
+
+
+def _bottlenecks(ax, data: Dict):
+    _barh(ax, data.get("bottlenecks", []), "stage", "avg_days", "Średni czas etapu (dni)")
+
+
+def _speed_by_project_type(ax, data: Dict):
+    _barh(ax, data.get("speed_by_project_type", []), "type", "avg_days", "Średni czas procesu (dni)")
+
+
+def _success_by_project_type(ax, data: Dict):
+    _barh(ax, data.get("success_by_project_type", []), "type", "success_rate_pct", "Odsetek uchwalonych (%)")
+
+
+def _success_by_urgency(ax, data: Dict):
+    _barh(ax, data.get("success_by_urgency", []), "urgency", "success_rate_pct", "Odsetek uchwalonych (%)")
+
+
+def _most_referenced_laws(ax, data: Dict):
+    _barh(ax, data.get("most_referenced_laws", [])[:10], "law", "count", "Liczba odwołań")
+
+
+def _most_controversial(ax, data: Dict):
+    _barh(ax, data.get("most_controversial", [])[:10], "topic", "controversy_score", "Kontrowersyjność (0-100)")
+
+
+# (analiza, wykres) -> (tytuł, funkcja rysująca)
+CHARTS: Dict[Tuple[str, str], Tuple[str, Callable]] = {
+    ("process_dynamics", "monthly_trends"): ("Procesy rozpoczęte i zakończone", _monthly_trends),
+    ("process_dynamics", "bottlenecks"): ("Najwolniejsze etapy", _bottlenecks),
+    ("process_dynamics", "speed_by_project_type"): ("Tempo według typu projektu", _speed_by_project_type),
+    ("success_prediction", "success_by_project_type"): ("Skuteczność według typu projektu", _success_by_project_type),
+    ("success_prediction", "success_by_urgency"): ("Skuteczność według trybu", _success_by_urgency),
+    ("law_references", "most_referenced_laws"): ("Najczęściej przywoływane ustawy", _most_referenced_laws),
+    ("voting_patterns", "most_controversial"): ("Najbardziej kontrowersyjne głosowania", _most_controversial),
+}
+
+
+def list_charts() -> List[Dict[str, str]]:
+    return [{"analysis": a, "chart": c, "title": title} for (a, c), (title, _) in CHARTS.items()]
+
+
+def render(analysis: str, chart: str, data: Dict, fmt: str) -> bytes:
+    """Rysuje wykres (wołane w procesie roboczym; matplotlib importowany tutaj)"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    plt.rcParams["svg.hashsalt"] = "sejm-ml-service"
+    title, draw = CHARTS[(analysis, chart)]
+    fig, ax = plt.subplots(figsize=FIGSIZE, dpi=DPI)
+    try:
+        if data:
+            draw(ax, data)
+        else:
+            ax.text(0.5, 0.5, "Brak danych", ha="center", va="center", transform=ax.transAxes)
+            ax.set_axis_off()
+        ax.set_title(title)
+        fig.tight_layout()
+        buffer = io.BytesIO()
+        # Bez daty w metadanych: ta sama wersja danych daje identyczny plik
+        fig.savefig(buffer, format=fmt, metadata={"Date": None} if fmt == "svg" else {"Software": None})
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def chart_path(analysis: str, chart: str, key: str, fmt: str) -> Path:
+    return Path(ARTIFACTS_DIR) / "charts" / f"{analysis}.{chart}.{key}.{fmt}"
+
+
+def chart_etag(analysis: str, chart: str, key: str, fmt: str) -> str:
+    digest = hashlib.blake2b(f"{analysis}|{chart}|{key}|{fmt}".encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_prerender: Optional[ThreadPoolExecutor] = None
+_listening = False
+_inflight: Dict[Path, Future] = {}
+_lock = threading.Lock()
+
+
+def start():
+    """Tworzy pulę procesów i włącza prerender po przeliczeniu analiz (start serwera API)"""
+    global _pool, _prerender, _listening
+    with _lock:
+        if _pool is None:
+            # spawn: procesy robocze nie dziedziczą wątków i blokad serwera
+            _pool = ProcessPoolExecutor(max_workers=CHART_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+            _prerender = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chart-prerender")
+        if not _listening:
+            on_computed(_on_computed)
+            _listening = True
+
+
+def shutdown():
+    """Zatrzymuje prerender i pulę procesów (przy zamykaniu serwisu)"""
+    global _pool, _prerender
+    with _lock:
+        if _prerender is not None:
+            _prerender.shutdown(wait=False, cancel_futures=True)
+            _prerender = None
+        if _pool is not None:
+            # Robocze procesy kończone jawnie: bez tego trwające renderowanie
+            # przeżywa serwer (PPID 1) i trzyma jego stdout/stderr
+            workers = list((_pool._processes or {}).values())
+            _pool.shutdown(wait=False, cancel_futures=True)
+            for process in workers:
+                process.terminate()
+            for process in workers:
+                process.join(timeout=5)
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    with _lock:
+        if _pool is None:
+            raise RuntimeError("Chart rendering is not started (charts.start())")
+        return _pool
+
+
+def _store(path: Path, content: bytes):
+    """Zapis atomowy; starsze wersje tego samego wykresu są usuwane"""
+    tmp = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unikalna nazwa: workery renderujące ten sam wykres nie dzielą pliku tymczasowego
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False) as f:
+            tmp = f.name
+            f.write(content)
+        os.replace(tmp, path)
+        analysis, chart, _, fmt = path.name.split(".")
+        for old in path.parent.glob(f"{analysis}.{chart}.*.{fmt}"):
+            if old != path:
+                old.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"[Charts] Could not store {path}: {e}")
+        if tmp:
+            Path(tmp).unlink(missing_ok=True)
+
+
+def get_chart(analysis: str, chart: str, key: str, data: Dict, fmt: str) -> bytes:
+    """
+    Wykres dla wersji danych `key`: z dysku albo renderowany w puli procesów
+
+    Równoległe żądania tego samego pliku czekają na jedno renderowanie.
+    """
+    path = chart_path(analysis, chart, key, fmt)
+    if path.exists():
+        return path.read_bytes()
+
+    with _lock:
+        future = _inflight.get(path)
+        owner = future is None
+        if owner:
+            future = _inflight[path] = Future()
+
+    if not owner:
+        return future.result()
+
+    try:
+        content = _get_pool().submit(render, analysis, chart, data, fmt).result()
+        _store(path, content)
+        future.set_result(content)
+        return content
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(path, None)
+
+
+def _prerender_all(analysis: str, key: str, data: Dict):
+    for (chart_analysis, chart) in CHARTS:
+        if chart_analysis != analysis:
+            continue
+        for fmt in FORMATS:
+            try:
+                get_chart(analysis, chart, key, data, fmt)
+            except Exception as e:
+                with _lock:
+                    stopped = _pool is None
+                if stopped:
+                    return  # shutdown() przerwał renderowanie
+                logger.error(f"[Charts] Prerender of {analysis}/{chart}.{fmt} failed: {e}")
+
+
+def _on_computed(name: str, key: str, value: Any):
+    """Po przeliczeniu analizy renderuje jej wykresy w tle"""
+    with _lock:
+        prerender = _prerender
+    if prerender is not None and isinstance(value, dict) and any(analysis == name for analysis, _ in CHARTS):
+        prerender.submit(_prerender_all, name, key, value)
@@ -0,0 +1,197 @@
+"""
+Sejm ML Service - nieinteraktywne CLI do uruchamiania analiz wsadowo
+
+Przykłady:
+    python -m src.cli list
+    python -m src.cli run --all --jobs 4 --out results/
+    python -m src.cli run --analysis process_dynamics --from-snapshot snapshot/
+    python -m src.cli snapshot snapshot/
+
+Dane ładowane są raz (z bazy lub ze snapshotu), a wybrane analizy liczą się
+równolegle we wspólnym grafie artefaktów (src.pipeline).
+
+Kody wyjścia:
+    0 - wszystkie analizy zakończone sukcesem
+    1 - co najmniej jedna analiza się nie powiodła
+    2 - błędne argumenty lub brak snapshotu
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+EXIT_OK = 0
+EXIT_ANALYSIS_FAILED = 1
+EXIT_USAGE = 2
+
+logger = logging.getLogger("src.cli")
+
+
+def load_snapshot(path: Path) -> Dict[str, List[Dict]]:
+    """Wczytuje snapshot: katalog z plikami <źródło>.json"""
+    from src.pipeline import SOURCES
+
+    sources = {}
+    for name in SOURCES:
+        file = path / f"{name}.json"
+        if file.exists():
+            with open(file, encoding="utf-8") as f:
+                sources[name] = json.load(f)
+    return sources
+
+
+def write_snapshot(path: Path, names: List[str]):
+    """Zapisuje tabele źródłowe do katalogu snapshotu"""
+    from src import database
+    from src.pipeline import SOURCES
+
+    path.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        rows = database.fetch_table(SOURCES[name])
+        with open(path / f"{name}.json", "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False)
+        logger.info(f"Saved {len(rows)} rows to {path / f'{name}.json'}")
+
+
+def write_json(out: Path, name: str, result: Any):
+    with open(out / f"{name}.json", "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2, default=str)
+
+
+def write_parquet(out: Path, name: str, result: Dict[str, Any]):
+    """
+    Listy rekordów zapisywane jako osobne pliki Parquet,
+    pozostałe (skalarne) pola jako <analiza>.json
+    """
+    import pandas as pd
+
+    folder = out / name
+    folder.mkdir(parents=True, exist_ok=True)
+    scalars = {}
+
+    for key, value in result.items():
+        if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+            pd.DataFrame(value).to_parquet(folder / f"{key}.parquet", index=False)
+        else:
+            scalars[key] = value
+
+    write_json(out, name, scalars)
+
+
+def cmd_list(args) -> int:
+    from src.pipeline import list_analyses
+
+    for name in list_analyses():
+        print(name)
+    return EXIT_OK
+
+
+def use_snapshot_features(snapshot: Path):
+    """Magazyn cech snapshotu w osobnym katalogu - bez nadpisywania magazynu serwisu"""
+    from src import feature_store
+    from src.config import ARTIFACTS_DIR
+
+    digest = hashlib.blake2b(str(snapshot.resolve()).encode(), digest_size=8).hexdigest()
+    feature_store.use_directory(Path(ARTIFACTS_DIR) / "features" / "snapshots" / digest)
+
+
+def cmd_snapshot(args) -> int:
+    from src.pipeline import SOURCES
+
+    names = args.tables or list(SOURCES)
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown:
+        logger.error(f"Unknown tables: {', '.join(unknown)} (available: {', '.join(SOURCES)})")
+        return EXIT_USAGE
+
+    write_snapshot(Path(args.path), names)
+    return EXIT_OK
+
+
+def cmd_run(args) -> int:
+    from src.pipeline import Run, list_analyses
+
+    available = list_analyses()
+    names = available if args.all else args.analysis
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        logger.error(f"Unknown analyses: {', '.join(unknown)} (available: {', '.join(available)})")
+        return EXIT_USAGE
+
+    sources = None
+    if args.from_snapshot:
+        snapshot = Path(args.from_snapshot)
+        if not snapshot.is_dir():
+            logger.error(f"Snapshot not found: {snapshot}")
+            return EXIT_USAGE
+        sources = load_snapshot(snapshot)
+        use_snapshot_features(snapshot)
+
+    out = Path(args.out) if args.out else None
+    if out:
+        out.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    run = Run(sources=sources, jobs=args.jobs)
+    # Komunikaty analizatorów na stderr - stdout zostaje na wyniki JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        results = run.execute(names)
+
+    for name in names:
+        if name in run.errors:
+            logger.error(f"{name}: FAILED ({run.errors[name]})")
+            continue
+
+        if out and args.format == "parquet":
+            write_parquet(out, name, results[name])
+        elif out:
+            write_json(out, name, results[name])
+        logger.info(f"{name}: ok")
+
+    logger.info(f"Finished {len(names)} analyses in {time.perf_counter() - started:.1f}s")
+
+    if not out:
+        json.dump(results, sys.stdout, ensure_ascii=False, indent=2, default=str)
+        print()
+
+    return EXIT_ANALYSIS_FAILED if any(name in run.errors for name in names) else EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Sejm ML Service batch runner")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="list registered analyses").set_defaults(handler=cmd_list)
+
+    run = commands.add_parser("run", help="run analyses headless")
+    selection = run.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--all", action="store_true", help="run every registered analysis")
+    selection.add_argument("--analysis", action="append", metavar="NAME", help="analysis to run (repeatable)")
+    run.add_argument("--jobs", type=int, default=4, help="parallel workers (default: 4)")
+    run.add_argument("--from-snapshot", metavar="PATH", help="read source tables from a snapshot directory")
+    run.add_argument("--out", metavar="DIR", help="write results to DIR instead of stdout")
+    run.add_argument("--format", choices=["json", "parquet"], default="json", help="output format for --out")
+    run.set_defaults(handler=cmd_run)
+
+    snapshot = commands.add_parser("snapshot", help="dump source tables to a snapshot directory")
+    snapshot.add_argument("path", help="snapshot directory")
+    snapshot.add_argument("--tables", nargs="+", metavar="NAME", help="source tables (default: all)")
+    snapshot.set_defaults(handler=cmd_snapshot)
+
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="[%(name)s] %(message)s", stream=sys.stderr)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,46 @@ load_dotenv()
 # Supabase
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+# Rozmiar strony odczytu przez REST; nie większy niż max-rows PostgREST (domyślnie 1000)
+SUPABASE_PAGE_SIZE = int(os.getenv("SUPABASE_PAGE_SIZE", "1000"))
+
+# Backend danych: "supabase" (REST API) lub "postgres" (bezpośrednie połączenie)
+DATA_BACKEND = os.getenv("DATA_BACKEND", "supabase")
+
+# PostgreSQL (dla DATA_BACKEND=postgres)
+DATABASE_URL = os.getenv("DATABASE_URL")
+PG_POOL_MIN = int(os.getenv("PG_POOL_MIN", "1"))
+PG_POOL_MAX = int(os.getenv("PG_POOL_MAX", "8"))
+PG_UPSERT_PAGE_SIZE = int(os.getenv("PG_UPSERT_PAGE_SIZE", "500"))
+
+# Replika w pamięci (legislative_processes, votings, process_stages)
+REPLICA_ENABLED = os.getenv("REPLICA_ENABLED", "true").lower() == "true"
+REPLICA_REFRESH_SECONDS = float(os.getenv("REPLICA_REFRESH_SECONDS", "60"))
+# Usunięte wiersze wykrywane co N odświeżeń (pełna lista kluczy), a nie przy każdej delcie
+REPLICA_DELETE_CHECK_EVERY = max(1, int(os.getenv("REPLICA_DELETE_CHECK_EVERY", "10")))
+
+# Katalog na dane lokalne (zapisane artefakty, modele)
+DATA_DIR = os.getenv("ML_DATA_DIR", "data")
+ARTIFACTS_DIR = os.path.join(DATA_DIR, "artifacts")
+
+# Kontrola dopuszczenia analiz: domyślna równoległość i kolejka per analiza,
+# nadpisania w formacie "nazwa:równoległość:kolejka,..." (np. "all:1:2")
+ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", "2"))
+ANALYSIS_QUEUE_SIZE = int(os.getenv("ANALYSIS_QUEUE_SIZE", "8"))
+ANALYSIS_LIMITS = os.getenv("ANALYSIS_LIMITS", "all:1:4")
+
+# Liczba procesów renderujących wykresy (matplotlib)
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", "2"))
+
+# Tryb na żywo (posiedzenie): rozmiar list top-k, kolejka zdarzeń na klienta SSE,
+# liczba trzymanych posiedzeń, opcjonalny token dla POST /live/votings
+# i opcjonalny plik JSONL z głosowaniami (zasilanie testowe)
+LIVE_TOP_K = int(os.getenv("LIVE_TOP_K", "10"))
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "256"))
+LIVE_MAX_SITTINGS = int(os.getenv("LIVE_MAX_SITTINGS", "8"))
+LIVE_HEARTBEAT_SECONDS = float(os.getenv("LIVE_HEARTBEAT_SECONDS", "15"))
+LIVE_INGEST_TOKEN = os.getenv("LIVE_INGEST_TOKEN")
+LIVE_FEED_FILE = os.getenv("LIVE_FEED_FILE")
 
 # OpenAI
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -15,6 +55,26 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 ML_SERVICE_PORT = int(os.getenv("ML_SERVICE_PORT", "8001"))
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
-# Validate required config
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("Missing Supabase credentials in .env")
+# Stan ciepłego startu (wyniki, artefakty, replika) zapisywany na dysk
+WARM_STATE_ENABLED = os.getenv("WARM_STATE_ENABLED", "true").lower() == "true"
+WARM_STATE_DIR = os.path.join(DATA_DIR, "warm")
+WARM_SNAPSHOT_SECONDS = float(os.getenv("WARM_SNAPSHOT_SECONDS", "600"))
+# Po starcie dolicz w tle wszystkie analizy (z przywróconego stanu to głównie trafienia w pamięć)
+WARM_PRECOMPUTE = os.getenv("WARM_PRECOMPUTE", "true").lower() == "true"
+
+def validate():
+    """
+    Sprawdza konfigurację backendu danych
+
+    Wołane przy pierwszym połączeniu z bazą (nie przy imporcie), więc serwis
+    startuje i serwuje ciepły stan z dysku także bez dostępu do bazy.
+
+    Raises:
+        ValueError: nieznany backend lub brak danych dostępowych
+    """
+    if DATA_BACKEND not in ("supabase", "postgres"):
+        raise ValueError(f"Unknown DATA_BACKEND: {DATA_BACKEND}")
+    if DATA_BACKEND == "supabase" and (not SUPABASE_URL or not SUPABASE_KEY):
+        raise ValueError("Missing Supabase credentials in .env")
+    if DATA_BACKEND == "postgres" and not DATABASE_URL:
+        raise ValueError("Missing DATABASE_URL in .env")
@@ -0,0 +1,339 @@
+"""
+Kostka agregatów (rollup cube) dla procesów i głosowań
+
+Zamiast osobnego groupby dla każdego przekroju dashboardu kostka trzyma
+zmaterializowane komórki na najdrobniejszym poziomie wymiarów z miarami
+addytywnymi (liczności, sumy, sumy kwadratów, liczniki sukcesów/odrzuceń).
+Dowolny przekrój (slice), drill-down czy roll-up to suma komórek, a średnie,
+odchylenia i wskaźniki procentowe wyliczane są dopiero z sum.
+
+Wymiary:
+- processes: term, month, project_type, urgency, document_type, category
+- votings: term, month, sitting
+
+Kategoria jest wielowartościowa (proces może mieć kilka), więc trzymana
+jest w osobnym cuboidzie (proces liczony raz na każdą swoją kategorię);
+zapytania bez wymiaru category korzystają z cuboidu bazowego i nie
+liczą procesów wielokrotnie.
+
+Aktualizacja przyrostowa: zmiana wiersza to odjęcie wkładu starej wersji
+i dodanie wkładu nowej (miary są addytywne), więc nie ma przeliczania.
+Gdy replika działa, kostka subskrybuje jej zmiany (src.replica);
+w przeciwnym razie budowana jest jako artefakt pipeline'u.
+"""
+
+import math
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.analyzers.voting_patterns import calculate_voting_metrics
+from src.artifacts import days_between, parse_date
+from src.pipeline import artifact, run_analysis
+from src.replica import active_replica
+
+UNKNOWN = "unknown"
+
+# Tabela źródłowa -> fakt kostki
+FACT_TABLES = {
+    "legislative_processes": "processes",
+    "votings": "votings",
+}
+
+
+def _month(value: Optional[str]) -> str:
+    dt = parse_date(value)
+    return dt.strftime("%Y-%m") if dt else UNKNOWN
+
+
+def _process_contribution(row: Dict) -> Tuple[Tuple, List[str], List[float]]:
+    """Klucz komórki, kategorie i wektor miar jednego procesu"""
+    is_finished = bool(row.get("is_finished"))
+    is_rejected = bool(row.get("is_rejected"))
+
+    duration = None
+    if is_finished:
+        duration = days_between(parse_date(row.get("document_date")), parse_date(row.get("change_date")))
+        if duration is not None and not 0 < duration < 3650:  # Filtruj nieprawidłowe
+            duration = None
+
+    stages = len(row.get("timeline") or [])
+
+    key = (
+        row.get("term_number") if row.get("term_number") is not None else UNKNOWN,
+        _month(row.get("document_date")),
+        row.get("project_type") or UNKNOWN,
+        row.get("urgency") or "normal",
+        row.get("document_type") or UNKNOWN,
+    )
+    measures = [
+        1,
+        int(is_finished),
+        int(is_finished and not is_rejected),
+        int(is_rejected),
+        1 if duration is not None else 0,
+        duration or 0,
+        (duration or 0) ** 2,
+        stages,
+        stages ** 2,
+    ]
+    return key, sorted(set(row.get("categories") or [])) or [UNKNOWN], measures
+
+
+def _voting_contribution(row: Dict) -> Tuple[Tuple, List[str], List[float]]:
+    """Klucz komórki i wektor miar jednego głosowania"""
+    metrics = calculate_voting_metrics(row)
+    counted = 1 if metrics else 0
+    turnout = metrics.get("turnout_pct", 0)
+    controversy = metrics.get("controversy_score", 0)
+
+    key = (
+        row.get("term_number") if row.get("term_number") is not None else UNKNOWN,
+        _month(row.get("date")),
+        row.get("sitting_number") if row.get("sitting_number") is not None else UNKNOWN,
+    )
+    measures = [
+        1,
+        counted,
+        int(bool(metrics.get("is_passed"))),
+        turnout,
+        turnout ** 2,
+        controversy,
+        controversy ** 2,
+        row.get("yes_count", 0) or 0,
+        row.get("no_count", 0) or 0,
+        row.get("abstain_count", 0) or 0,
+    ]
+    return key, [], measures
+
+
+class FactSpec:
+    """Opis faktu: wymiary, miary, wkład wiersza i miary pochodne"""
+
+    def __init__(
+        self,
+        dimensions: Sequence[str],
+        measures: Sequence[str],
+        contribution: Callable[[Dict], Tuple[Tuple, List[str], List[float]]],
+        derived: Callable[[Dict[str, float]], Dict[str, Any]],
+        multi_dimension: Optional[str] = None,
+    ):
+        self.dimensions = tuple(dimensions)
+        self.measures = tuple(measures)
+        self.contribution = contribution
+        self.derived = derived
+        self.multi_dimension = multi_dimension
+
+
+def _ratio(part: float, whole: float) -> float:
+    return round(part / whole * 100, 1) if whole else 0.0
+
+
+def _moments(total: float, squares: float, n: float) -> Dict[str, Optional[float]]:
+    """Średnia i odchylenie standardowe z sumy i sumy kwadratów"""
+    if not n:
+        return {"avg": None, "std": None}
+    mean = total / n
+    return {"avg": round(mean, 1), "std": round(math.sqrt(max(squares / n - mean ** 2, 0.0)), 1)}
+
+
+def _process_derived(m: Dict[str, float]) -> Dict[str, Any]:
+    duration = _moments(m["duration_sum"], m["duration_sq"], m["duration_count"])
+    stages = _moments(m["stages_sum"], m["stages_sq"], m["count"])
+    return {
+        "success_rate_pct": _ratio(m["successful"], m["count"]),
+        "rejection_rate_pct": _ratio(m["rejected"], m["count"]),
+        "finished_pct": _ratio(m["finished"], m["count"]),
+        "avg_duration_days": duration["avg"],
+        "std_duration_days": duration["std"],
+        "avg_stages": stages["avg"],
+        "std_stages": stages["std"],
+    }
+
+
+def _voting_derived(m: Dict[str, float]) -> Dict[str, Any]:
+    turnout = _moments(m["turnout_sum"], m["turnout_sq"], m["counted"])
+    controversy = _moments(m["controversy_sum"], m["controversy_sq"], m["counted"])
+    return {
+        "pass_rate_pct": _ratio(m["passed"], m["counted"]),
+        "avg_turnout_pct": turnout["avg"],
+        "std_turnout_pct": turnout["std"],
+        "avg_controversy_score": controversy["avg"],
+        "std_controversy_score": controversy["std"],
+    }
+
+
+FACTS: Dict[str, FactSpec] = {
+    "processes": FactSpec(
+        dimensions=("term", "month", "project_type", "urgency", "document_type"),
+        measures=("count", "finished", "successful", "rejected",
+                  "duration_count", "duration_sum", "duration_sq", "stages_sum", "stages_sq"),
+        contribution=_process_contribution,
+        derived=_process_derived,
+        multi_dimension="category",
+    ),
+    "votings": FactSpec(
+        dimensions=("term", "month", "sitting"),
+        measures=("count", "counted", "passed", "turnout_sum", "turnout_sq",
+                  "controversy_sum", "controversy_sq", "yes_sum", "no_sum", "abstain_sum"),
+        contribution=_voting_contribution,
+        derived=_voting_derived,
+    ),
+}
+
+
+class RollupCube:
+    """
+    Komórki jednego faktu: cuboid bazowy + (opcjonalnie) cuboid kategorii
+
+    Komórka: krotka wartości wymiarów -> wektor miar (float64).
+    """
+
+    def __init__(self, spec: FactSpec):
+        self.spec = spec
+        self.cells: Dict[Tuple, np.ndarray] = {}
+        self.multi_cells: Dict[Tuple, np.ndarray] = {}
+
+    def _add(self, cells: Dict[Tuple, np.ndarray], key: Tuple, vector: np.ndarray):
+        cell = cells.get(key)
+        if cell is None:
+            cells[key] = vector.copy()
+            return
+        cell += vector
+        if cell[0] <= 0:  # measures[0] to zawsze licznik wierszy
+            del cells[key]
+
+    def apply(self, old: Optional[Dict], new: Optional[Dict]):
+        """Zmiana wiersza: odejmij wkład starej wersji, dodaj nowej"""
+        for row, sign in ((old, -1.0), (new, 1.0)):
+            if row is None:
+                continue
+            key, multi, measures = self.spec.contribution(row)
+            vector = np.asarray(measures, dtype=np.float64) * sign
+            self._add(self.cells, key, vector)
+            if self.spec.multi_dimension:
+                for value in multi:
+                    self._add(self.multi_cells, key + (value,), vector)
+
+    def dimensions(self, multi: bool) -> Tuple[str, ...]:
+        return self.spec.dimensions + ((self.spec.multi_dimension,) if multi else ())
+
+    def query(
+        self,
+        group_by: Sequence[str] = (),
+        filters: Optional[Dict[str, Iterable[str]]] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Roll-up do wymiarów `group_by` po odfiltrowaniu komórek
+
+        Args:
+            group_by: wymiary wyniku (pusta lista = jeden wiersz z sumą)
+            filters: wymiar -> dopuszczalne wartości (porównywane jako tekst)
+
+        Raises:
+            KeyError: nieznany wymiar
+        """
+        filters = filters or {}
+        multi = self.spec.multi_dimension is not None and (
+            self.spec.multi_dimension in group_by or self.spec.multi_dimension in filters
+        )
+        dims = self.dimensions(multi)
+        for dim in list(group_by) + list(filters):
+            if dim not in dims:
+                raise KeyError(f"Unknown dimension: {dim}")
+
+        positions = [dims.index(dim) for dim in group_by]
+        checks = [(dims.index(dim), {str(v) for v in values}) for dim, values in filters.items()]
+
+        groups: Dict[Tuple, np.ndarray] = defaultdict(lambda: np.zeros(len(self.spec.measures)))
+        for key, vector in (self.multi_cells if multi else self.cells).items():
+            if all(str(key[i]) in allowed for i, allowed in checks):
+                groups[tuple(key[i] for i in positions)] += vector
+
+        rows = []
+        for group, vector in groups.items():
+            measures = dict(zip(self.spec.measures, vector.tolist()))
+            rows.append({
+                **dict(zip(group_by, group)),
+                **{name: int(value) if value.is_integer() else round(value, 3)
+                   for name, value in measures.items() if not name.endswith("_sq")},
+                **self.spec.derived(measures),
+            })
+        rows.sort(key=lambda r: tuple(str(r[dim]) for dim in group_by))
+
+        return {
+            "dimensions": list(group_by),
+            "cells": len(self.multi_cells if multi else self.cells),
+            "rows": rows[:limit] if limit else rows,
+        }
+
+
+class CubeSet:
+    """Kostki wszystkich faktów + słuchacz zmian repliki"""
+
+    def __init__(self):
+        self.cubes = {fact: RollupCube(spec) for fact, spec in FACTS.items()}
+        self._lock = threading.Lock()
+
+    def on_change(self, table: str, changes: List[Tuple[Optional[Dict], Optional[Dict]]]):
+        """Słuchacz src.replica: nakłada zmiany wierszy na kostkę"""
+        fact = FACT_TABLES.get(table)
+        if fact is None:
+            return
+        cube = self.cubes[fact]
+        with self._lock:
+            for old, new in changes:
+                cube.apply(old, new)
+
+    def query(self, fact: str, **kwargs) -> Dict[str, Any]:
+        """
+        Raises:
+            KeyError: nieznany fakt lub wymiar
+        """
+        if fact not in self.cubes:
+            raise KeyError(f"Unknown fact: {fact}")
+        with self._lock:
+            return self.cubes[fact].query(**kwargs)
+
+    def describe(self) -> Dict[str, Any]:
+        """Fakty, wymiary i miary (dla klienta budującego zapytania)"""
+        return {
+            fact: {
+                "dimensions": list(cube.dimensions(cube.spec.multi_dimension is not None)),
+                "measures": [m for m in cube.spec.measures if not m.endswith("_sq")],
+                "cells": len(cube.cells),
+            }
+            for fact, cube in self.cubes.items()
+        }
+
+
+@artifact("rollup_cube", deps=["processes", "votings"])
+def build_rollup_cube(processes: List[Dict], votings: List[Dict]) -> CubeSet:
+    """
+    Pełna budowa kostki (gdy replika nie utrzymuje jej przyrostowo)
+    """
+    cubes = CubeSet()
+    cubes.on_change("legislative_processes", [(None, row) for row in processes])
+    cubes.on_change("votings", [(None, row) for row in votings])
+    return cubes
+
+
+_live: Optional[CubeSet] = None
+
+
+def attach(replica) -> CubeSet:
+    """Podpina kostkę utrzymywaną przyrostowo pod replikę (przed jej załadowaniem)"""
+    global _live
+    _live = CubeSet()
+    replica.subscribe(_live.on_change)
+    return _live
+
+
+def get_cube() -> CubeSet:
+    """Kostka z repliki, jeśli gotowa; w przeciwnym razie artefakt pipeline'u"""
+    if _live is not None and active_replica() is not None:
+        return _live
+    return run_analysis("rollup_cube")
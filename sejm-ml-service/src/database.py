@@ -1,42 +1,86 @@
-"""Database client for Supabase"""
-from supabase import create_client, Client
-from src.config import SUPABASE_URL, SUPABASE_KEY
+"""Database client for Supabase (lub bezpośrednio PostgreSQL, zob. DATA_BACKEND)"""
+from src.config import SUPABASE_URL, SUPABASE_KEY, SUPABASE_PAGE_SIZE, DATA_BACKEND, validate
 
-_supabase_client: Client | None = None
+_supabase_client = None
 
-def get_supabase() -> Client:
-    """Get or create Supabase client"""
+def get_supabase():
+    """Get or create Supabase client (klient importowany dopiero przy pierwszym użyciu)"""
     global _supabase_client
     if _supabase_client is None:
+        from supabase import create_client
+        validate()
         _supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
     return _supabase_client
 
+def _select_all(table: str, columns: str = "*", since: str | None = None):
+    """
+    Wszystkie wiersze zapytania REST, stronami po SUPABASE_PAGE_SIZE
+
+    PostgREST obcina każdą odpowiedź do max-rows, więc bez stronicowania
+    duże tabele byłyby niekompletne (a replika uznałaby brakujące wiersze
+    za usunięte). Sortowanie po id daje stabilne granice stron.
+    """
+    supabase = get_supabase()
+    rows = []
+    start = 0
+    while True:
+        query = supabase.table(table).select(columns)
+        if since is not None:
+            query = query.gte("updated_at", since)
+        page = query.order("id").range(start, start + SUPABASE_PAGE_SIZE - 1).execute().data
+        rows.extend(page)
+        if len(page) < SUPABASE_PAGE_SIZE:
+            return rows
+        start += SUPABASE_PAGE_SIZE
+
+def fetch_table(table: str):
+    """Fetch all rows of a table from the configured backend"""
+    if DATA_BACKEND == "postgres":
+        from src import postgres
+        return postgres.fetch_table(table)
+
+    return _select_all(table)
+
+def fetch_rows_since(table: str, since: str):
+    """Fetch rows with updated_at >= since (delta sync)"""
+    if DATA_BACKEND == "postgres":
+        from src import postgres
+        return postgres.fetch_table(table, since=since)
+
+    return _select_all(table, since=since)
+
+def fetch_ids(table: str):
+    """Fetch primary keys of all rows (used to detect deletes)"""
+    if DATA_BACKEND == "postgres":
+        from src import postgres
+        return postgres.fetch_ids(table)
+
+    return [row["id"] for row in _select_all(table, columns="id")]
+
 def fetch_all_processes():
     """Fetch all legislative processes with extended data"""
-    supabase = get_supabase()
-    response = supabase.table("legislative_processes").select("*").execute()
-    return response.data
+    return fetch_table("legislative_processes")
 
 def fetch_all_prints():
     """Fetch all prints"""
-    supabase = get_supabase()
-    response = supabase.table("prints").select("*").execute()
-    return response.data
+    return fetch_table("prints")
 
 def fetch_all_votings():
     """Fetch all votings"""
-    supabase = get_supabase()
-    response = supabase.table("votings").select("*").execute()
-    return response.data
+    return fetch_table("votings")
 
 def fetch_process_stages():
     """Fetch all process stages"""
-    supabase = get_supabase()
-    response = supabase.table("process_stages").select("*").execute()
-    return response.data
+    return fetch_table("process_stages")
+
+def save_analysis_results(table: str, data: dict | list):
+    """Save analysis results (single row or batch) to the configured backend"""
+    if DATA_BACKEND == "postgres":
+        from src import postgres
+        rows = data if isinstance(data, list) else [data]
+        postgres.upsert_rows(table, rows)
+        return rows
 
-def save_analysis_results(table: str, data: dict):
-    """Save analysis results to Supabase"""
     supabase = get_supabase()
     response = supabase.table(table).upsert(data).execute()
     return response.data
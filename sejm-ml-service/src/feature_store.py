@@ -0,0 +1,217 @@
+"""
+Przyrostowy magazyn cech (feature store) kluczowany wersją procesu
+
+Cechy trzymane są kolumnowo (tablice numpy wyrównane z listą procesów):
+- kolumny liczbowe jako int64/float64,
+- kolumny tekstowe jako kody int32 + słownik wartości.
+
+Każdy wiersz ma odcisk wersji procesu (updated_at, a gdy go brak — hash
+treści). Przy kolejnej wersji danych funkcja wyciągająca cechy wołana
+jest tylko dla nowych i zmienionych procesów; pozostałe wiersze są
+przenoszone indeksowaniem tablic. Zmiana wersji schematu cech (odcisku kodu
+funkcji wyciągającej) wymusza pełną przebudowę.
+
+Magazyn zapisywany jest w ARTIFACTS_DIR/features, więc po restarcie
+przeliczane są tylko procesy zmienione od ostatniego zapisu. Uruchomienia
+na innych danych (CLI ze snapshotu) wskazują osobny katalog przez
+use_directory(), żeby nie nadpisywać magazynu serwisu.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.config import ARTIFACTS_DIR
+
+logger = logging.getLogger(__name__)
+
+FeatureExtractor = Callable[[Dict], Dict[str, Any]]
+
+
+def row_stamp(row: Dict) -> str:
+    """Odcisk wersji wiersza: updated_at lub hash treści"""
+    if row.get("updated_at"):
+        return str(row["updated_at"])
+    return hashlib.blake2b(json.dumps(dict(row), sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+class FeatureStore:
+    """
+    Kolumnowa tabela cech: id procesu -> wiersz cech
+
+    Args:
+        schema_version: wersja definicji cech, np. odcisk kodu węzła
+            (pipeline.node_code); zmiana = pełna przebudowa
+    """
+
+    def __init__(self, schema_version: str):
+        self.schema_version = schema_version
+        self.ids: List[Any] = []
+        self.stamps: List[str] = []
+        self.columns: Dict[str, np.ndarray] = {}
+        self.vocab: Dict[str, List[Any]] = {}
+        self.recomputed = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def update(self, rows: Sequence[Dict], extract: FeatureExtractor) -> "FeatureStore":
+        """
+        Nowy magazyn wyrównany z `rows`; cechy liczone tylko dla zmienionych wierszy
+
+        Returns:
+            FeatureStore (bieżący obiekt pozostaje niezmieniony)
+        """
+        position = {row_id: i for i, row_id in enumerate(self.ids)}
+        take = np.full(len(rows), -1, dtype=np.int64)
+        stamps = []
+        fresh_index, fresh_features = [], []
+
+        for i, row in enumerate(rows):
+            stamp = row_stamp(row)
+            stamps.append(stamp)
+            j = position.get(row.get("id"))
+            if j is not None and self.stamps[j] == stamp:
+                take[i] = j
+            else:
+                fresh_index.append(i)
+                fresh_features.append(extract(row))
+
+        store = FeatureStore(self.schema_version)
+        store.ids = [row.get("id") for row in rows]
+        store.stamps = stamps
+
+        names = list(self.columns) or (list(fresh_features[0]) if fresh_features else [])
+        reused = take >= 0
+        fresh = np.asarray(fresh_index, dtype=np.int64)
+
+        for name in names:
+            old = self.columns.get(name)
+            values = [features[name] for features in fresh_features]
+
+            if name in self.vocab or (old is None and any(isinstance(v, str) or v is None for v in values)):
+                vocab = list(self.vocab.get(name, []))
+                lookup = {value: code for code, value in enumerate(vocab)}
+                codes = []
+                for value in values:
+                    if value not in lookup:
+                        lookup[value] = len(vocab)
+                        vocab.append(value)
+                    codes.append(lookup[value])
+                column = np.zeros(len(rows), dtype=np.int32)
+                store.vocab[name] = vocab
+                fresh_values = np.asarray(codes, dtype=np.int32)
+            else:
+                dtype = old.dtype if old is not None else np.asarray(values).dtype
+                column = np.zeros(len(rows), dtype=dtype)
+                fresh_values = np.asarray(values, dtype=dtype)
+
+            if old is not None and reused.any():
+                column[reused] = old[take[reused]]
+            if len(fresh):
+                column[fresh] = fresh_values
+            store.columns[name] = column
+
+        store.recomputed = len(fresh_index)
+        return store
+
+    def decoded(self, name: str) -> np.ndarray:
+        """Kolumna w wartościach oryginalnych (tekstowe dekodowane wektorowo)"""
+        column = self.columns[name]
+        if name in self.vocab:
+            return np.asarray(self.vocab[name], dtype=object)[column]
+        return column
+
+    def frame(self) -> pd.DataFrame:
+        """Ramka cech (kolumny liczbowe bez kopiowania wiersz po wierszu)"""
+        return pd.DataFrame({name: self.decoded(name) for name in self.columns})
+
+    def matrix(self, columns: Optional[Iterable[str]] = None, dtype=np.float64) -> np.ndarray:
+        """
+        Macierz liczbowa (wiersze = procesy) dla analiz i treningu modeli
+
+        Kolumny tekstowe oddawane są jako kody słownika.
+        """
+        names = list(columns) if columns is not None else list(self.columns)
+        if not names:
+            return np.empty((len(self), 0), dtype=dtype)
+        return np.column_stack([self.columns[name].astype(dtype, copy=False) for name in names])
+
+
+_stores: Dict[str, FeatureStore] = {}
+_lock = threading.Lock()
+_directory: Optional[Path] = None
+
+
+def use_directory(path: Path):
+    """Przełącza magazyny na osobny katalog (zamiast ARTIFACTS_DIR/features)"""
+    global _directory
+    with _lock:
+        _directory = Path(path)
+        _stores.clear()
+
+
+def _store_path(name: str) -> Path:
+    directory = _directory if _directory is not None else Path(ARTIFACTS_DIR) / "features"
+    return directory / f"{name}.pkl"
+
+
+def _load(name: str, schema_version: str) -> FeatureStore:
+    path = _store_path(name)
+    if path.exists():
+        try:
+            with open(path, "rb") as f:
+                store = pickle.load(f)
+            if store.schema_version == schema_version:
+                logger.info(f"[Features] {name}: loaded {len(store)} rows from {path}")
+                return store
+            logger.info(f"[Features] {name}: schema {store.schema_version} -> {schema_version}, full rebuild")
+        except Exception as e:
+            logger.warning(f"[Features] {name}: ignoring unreadable {path}: {e}")
+    return FeatureStore(schema_version)
+
+
+def _save(name: str, store: FeatureStore):
+    """Zapis atomowy (plik tymczasowy + rename)"""
+    path = _store_path(name)
+    tmp = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unikalna nazwa: równoległe procesy (workery, CLI) nie nadpisują sobie pliku tymczasowego
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False) as f:
+            tmp = f.name
+            pickle.dump(store, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"[Features] {name}: could not persist to {path}: {e}")
+        if tmp:
+            Path(tmp).unlink(missing_ok=True)
+
+
+def refresh(name: str, rows: Sequence[Dict], extract: FeatureExtractor, schema_version: str) -> FeatureStore:
+    """
+    Aktualizuje magazyn `name` do bieżących wierszy (pamięć -> dysk -> pusty)
+
+    Zapisuje go na dysk, jeśli cokolwiek się zmieniło.
+    """
+    with _lock:
+        current = _stores.get(name)
+        if current is None or current.schema_version != schema_version:
+            current = _load(name, schema_version)
+
+        store = current.update(rows, extract)
+        print(f"[Features] {name}: {store.recomputed} of {len(store)} rows recomputed")
+
+        if store.recomputed or len(store) != len(current):
+            _save(name, store)
+        _stores[name] = store
+        return store
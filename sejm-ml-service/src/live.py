@@ -0,0 +1,333 @@
+"""
+Tryb na żywo dla trwającego posiedzenia: przyrostowe agregaty głosowań + SSE
+
+Nowe głosowania (wysyłane przez serwis synchronizacji przez POST
+/live/votings albo czytane z pliku JSONL przy testach) aktualizują
+bieżące agregaty posiedzenia w czasie stałym na głosowanie:
+- sumy i liczniki (średnia frekwencja, odsetek TAK, kontrowersyjność,
+  odsetek przyjętych) zamiast średnich po całej historii,
+- ograniczone kopce top-k (najbardziej kontrowersyjne, najciaśniejsze),
+  więc wstawienie kosztuje O(log k) niezależnie od liczby głosowań.
+
+Ponowne przesłanie tego samego głosowania jest ignorowane; korekta wyniku
+odejmuje stary wkład z sum i odbudowuje kopce tylko tego posiedzenia.
+Partia głosowań sprawdzana jest w całości przed zmianą stanu: niepoprawny
+wiersz odrzuca całą partię, a agregaty zostają nietknięte.
+
+Każda zmiana jest serializowana raz i rozsyłana do subskrybentów
+(kolejki asyncio, GET /live/stream jako Server-Sent Events). Wszystko
+działa w pętli zdarzeń serwera, więc nie ma potrzeby blokad.
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.analyzers.voting_patterns import calculate_voting_metrics
+from src.config import LIVE_MAX_SITTINGS, LIVE_QUEUE_SIZE, LIVE_TOP_K
+
+logger = logging.getLogger(__name__)
+
+SittingKey = Tuple[int, int]
+
+# Pola głosowania przekazywane w zdarzeniach (obok metryk)
+EVENT_FIELDS = ("term_number", "sitting_number", "voting_number", "date", "topic", "kind",
+                "yes_count", "no_count", "abstain_count", "not_participating")
+
+# Liczniki głosów (brak wartości = 0, jak w kostce agregatów)
+COUNT_FIELDS = ("yes_count", "no_count", "abstain_count", "not_participating")
+
+
+def _voting_key(voting: Dict) -> Tuple[int, int, int]:
+    """(kadencja, posiedzenie, numer głosowania); ValueError dla niepełnego wiersza"""
+    try:
+        return int(voting["term_number"]), int(voting["sitting_number"]), int(voting["voting_number"])
+    except (KeyError, TypeError, ValueError, OverflowError):
+        raise ValueError(f"Voting needs term_number, sitting_number and voting_number: {voting}")
+
+
+def _count(value: Any) -> int:
+    """Licznik głosów jako int; ValueError dla wartości ujemnej lub nieliczbowej"""
+    if value is None:
+        return 0
+    try:
+        count = int(value)
+        valid = count >= 0 and count == float(value)
+    except (TypeError, ValueError, OverflowError):
+        valid = False
+    if not valid:
+        raise ValueError(f"Vote count must be a non-negative integer, got {value!r}")
+    return count
+
+
+def validate_voting(voting: Any) -> Dict:
+    """
+    Kopia głosowania z kluczem i licznikami jako int
+
+    Raises:
+        ValueError: wiersz nie jest obiektem, brak klucza lub niepoprawny licznik
+    """
+    if not isinstance(voting, dict):
+        raise ValueError(f"Voting must be an object, got {type(voting).__name__}")
+    term, sitting, number = _voting_key(voting)
+    row = {**voting, "term_number": term, "sitting_number": sitting, "voting_number": number}
+    for field in COUNT_FIELDS:
+        try:
+            row[field] = _count(voting.get(field))
+        except ValueError as e:
+            raise ValueError(f"Voting {term}/{sitting}/{number} {field}: {e}")
+    return row
+
+
+class SittingAggregate:
+    """
+    Bieżące agregaty jednego posiedzenia
+
+    Args:
+        term: numer kadencji
+        sitting: numer posiedzenia
+        top_k: rozmiar list najbardziej kontrowersyjnych / najciaśniejszych głosowań
+    """
+
+    def __init__(self, term: int, sitting: int, top_k: int):
+        self.term = term
+        self.sitting = sitting
+        self.top_k = top_k
+        self.votings: Dict[int, Dict[str, Any]] = {}
+        self.turnout_sum = 0.0
+        self.yes_sum = 0.0
+        self.controversy_sum = 0.0
+        self.passed = 0
+        # Kopce minimalne rozmiaru k: na szczycie najsłabszy z zachowanych
+        self.controversial: List[Tuple[float, int]] = []
+        self.closest: List[Tuple[float, int]] = []
+        self.last_voting: Optional[int] = None
+        self.updated_at: Optional[str] = None
+
+    def _account(self, entry: Dict[str, Any], sign: int):
+        self.turnout_sum += sign * entry["turnout_pct"]
+        self.yes_sum += sign * entry["yes_pct"]
+        self.controversy_sum += sign * entry["controversy_score"]
+        self.passed += sign * int(entry["is_passed"])
+
+    def _push(self, heap: List[Tuple[float, int]], item: Tuple[float, int]):
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def _offer(self, number: int, entry: Dict[str, Any]):
+        self._push(self.controversial, (entry["controversy_score"], number))
+        self._push(self.closest, (-entry["margin_pct"], number))
+
+    def _rebuild_heaps(self):
+        self.controversial, self.closest = [], []
+        for number, entry in self.votings.items():
+            self._offer(number, entry)
+
+    def add(self, voting: Dict) -> Optional[Dict[str, Any]]:
+        """
+        Nakłada głosowanie (po validate_voting) na agregaty
+
+        Returns:
+            Wiersz głosowania z metrykami albo None, gdy nic się nie zmieniło
+            (duplikat lub głosowanie bez oddanych głosów)
+        """
+        metrics = calculate_voting_metrics(voting)
+        if not metrics:
+            return None
+
+        number = voting["voting_number"]
+        entry = {**{field: voting.get(field) for field in EVENT_FIELDS}, **metrics}
+        previous = self.votings.get(number)
+        if previous == entry:
+            return None
+
+        self.votings[number] = entry
+        if previous is not None:
+            # Korekta wyniku: stary wkład znika z sum, kopce budowane od nowa (rzadkie)
+            self._account(previous, -1)
+            self._account(entry, 1)
+            self._rebuild_heaps()
+        else:
+            self._account(entry, 1)
+            self._offer(number, entry)
+
+        self.last_voting = number
+        self.updated_at = datetime.now().isoformat()
+        return entry
+
+    def _top(self, heap: List[Tuple[float, int]], fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+        rows = []
+        for _, number in sorted(heap, reverse=True):
+            entry = self.votings[number]
+            rows.append({"voting_number": number, **{field: entry[field] for field in fields}})
+        return rows
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Agregaty posiedzenia w układzie wyniku /analyze/voting-patterns"""
+        n = len(self.votings)
+        return {
+            "term_number": self.term,
+            "sitting_number": self.sitting,
+            "total_votings": n,
+            "avg_turnout_pct": round(self.turnout_sum / n, 1) if n else 0,
+            "avg_yes_pct": round(self.yes_sum / n, 1) if n else 0,
+            "avg_controversy_score": round(self.controversy_sum / n, 1) if n else 0,
+            "pass_rate_pct": round(self.passed / n * 100, 1) if n else 0,
+            "most_controversial": self._top(self.controversial, ("topic", "date", "controversy_score", "yes_pct", "no_pct")),
+            "closest_votes": self._top(self.closest, ("topic", "date", "margin_pct", "yes_count", "no_count")),
+            "last_voting": self.last_voting,
+            "updated_at": self.updated_at,
+        }
+
+
+class Subscriber:
+    """Kolejka zdarzeń SSE jednego klienta (opcjonalnie tylko dla wybranego posiedzenia)"""
+
+    def __init__(self, term: Optional[int], sitting: Optional[int], queue_size: int):
+        self.term = term
+        self.sitting = sitting
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def matches(self, key: SittingKey) -> bool:
+        return (self.term is None or self.term == key[0]) and (self.sitting is None or self.sitting == key[1])
+
+    def put(self, message: str):
+        """Wolny klient traci najstarsze zdarzenie (każde niesie pełne agregaty)"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+def format_event(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """Ramka Server-Sent Events"""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+class LiveFeed:
+    """
+    Agregaty posiedzeń + rozsyłanie zmian do subskrybentów
+
+    Trzyma LIVE_MAX_SITTINGS ostatnio aktualizowanych posiedzeń.
+    """
+
+    def __init__(self, top_k: int = LIVE_TOP_K, queue_size: int = LIVE_QUEUE_SIZE, max_sittings: int = LIVE_MAX_SITTINGS):
+        self.top_k = top_k
+        self.queue_size = queue_size
+        self.max_sittings = max_sittings
+        self.sittings: "OrderedDict[SittingKey, SittingAggregate]" = OrderedDict()
+        self.subscribers: Set[Subscriber] = set()
+        self.sequence = 0
+
+    def ingest(self, votings: Iterable[Dict]) -> int:
+        """
+        Nakłada nowe głosowania i rozsyła zmiany
+
+        Returns:
+            Liczba głosowań, które zmieniły agregaty
+
+        Raises:
+            ValueError: niepoprawny wiersz (cała partia odrzucona, stan bez zmian)
+        """
+        batch = []
+        for position, voting in enumerate(votings):
+            try:
+                batch.append(validate_voting(voting))
+            except ValueError as e:
+                raise ValueError(f"Row {position}: {e}")
+
+        changed = 0
+        for voting in batch:
+            term, sitting = voting["term_number"], voting["sitting_number"]
+            key = (term, sitting)
+            aggregate = self.sittings.get(key)
+            if aggregate is None:
+                aggregate = self.sittings[key] = SittingAggregate(term, sitting, self.top_k)
+                if len(self.sittings) > self.max_sittings:
+                    self.sittings.popitem(last=False)
+            self.sittings.move_to_end(key)
+
+            entry = aggregate.add(voting)
+            if entry is None:
+                continue
+            changed += 1
+            self._publish(key, {"voting": entry, "sitting": aggregate.snapshot()})
+        return changed
+
+    def _publish(self, key: SittingKey, data: Dict[str, Any]):
+        self.sequence += 1
+        message = format_event("voting", data, self.sequence)
+        for subscriber in self.subscribers:
+            if subscriber.matches(key):
+                subscriber.put(message)
+
+    def subscribe(self, term: Optional[int] = None, sitting: Optional[int] = None) -> Subscriber:
+        subscriber = Subscriber(term, sitting, self.queue_size)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+
+    def snapshots(self, term: Optional[int] = None, sitting: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Bieżące agregaty posiedzeń (najnowsze na końcu), opcjonalnie filtrowane"""
+        probe = Subscriber(term, sitting, 1)
+        return [aggregate.snapshot() for key, aggregate in self.sittings.items() if probe.matches(key)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tracked_sittings": len(self.sittings),
+            "subscribers": len(self.subscribers),
+            "events": self.sequence,
+            "dropped": sum(s.dropped for s in self.subscribers),
+        }
+
+
+async def follow_file(feed: LiveFeed, path: str, poll_seconds: float = 0.5):
+    """
+    Czyta głosowania z pliku JSONL jak `tail -f` (jeden wiersz = głosowanie
+    lub lista głosowań) - zasilanie trybu na żywo bez serwisu synchronizacji
+    """
+    source = Path(path)
+    while not source.exists():
+        await asyncio.sleep(poll_seconds)
+
+    logger.info(f"[Live] Following {source}")
+    with open(source, encoding="utf-8") as f:
+        pending = ""
+        while True:
+            chunk = f.readline()
+            if not chunk:
+                await asyncio.sleep(poll_seconds)
+                continue
+            pending += chunk
+            if not pending.endswith("\n"):
+                continue  # Wiersz jeszcze niedopisany
+            line, pending = pending.strip(), ""
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+                feed.ingest(item if isinstance(item, list) else [item])
+            except ValueError as e:
+                logger.warning(f"[Live] Skipping line from {source}: {e}")
+
+
+_feed: Optional[LiveFeed] = None
+
+
+def get_live_feed() -> LiveFeed:
+    """Get or create the process-wide live feed"""
+    global _feed
+    if _feed is None:
+        _feed = LiveFeed()
+    return _feed
@@ -2,23 +2,81 @@
 Sejm ML Service - FastAPI Application
 
 Endpointy:
+- GET /ready - Gotowość (ciepły stan załadowany) i czasy startu
 - GET /analyze/law-references - Analiza odwołań do ustaw
 - GET /analyze/process-dynamics - Analiza dynamiki procesów
 - GET /analyze/voting-patterns - Analiza wzorców głosowań
+- GET /analyze/stage-transitions - Model przejść między etapami
 - GET /analyze/all - Uruchom wszystkie analizy
+- GET /flow/transitions - Graf przepływu między etapami (diagramy procesu)
+- GET /flow/funnel - Lejek: odsetek i czas dojścia między etapami
+- GET /process/{id}/votings - Głosowania procesu z metrykami i agregatem
+- GET /processes/votings - To samo dla wielu procesów naraz (listy)
+- GET /cube - Przekroje z kostki agregatów (slice / drill-down / roll-up)
+- GET /search - Wyszukiwanie pełnotekstowe w procesach i drukach (BM25)
+- GET /charts - Lista dostępnych wykresów
+- GET /charts/{analysis}/{chart} - Wykres wyniku analizy (SVG / PNG, z ETag)
+- POST /live/votings - Nowe głosowania trwającego posiedzenia (serwis synchronizacji)
+- GET /live/sittings - Bieżące agregaty posiedzeń w trybie na żywo
+- GET /live/stream - Zmiany agregatów na żywo (Server-Sent Events)
 """
 
-from fastapi import FastAPI, HTTPException
+import time
+
+# Początek ścieżki startu (czas importu aplikacji w /ready)
+BOOT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, List
+import asyncio
 import logging
 
-from src.config import ML_SERVICE_PORT
-from src.analyzers.law_references import analyze_law_references
-from src.analyzers.process_dynamics import analyze_process_dynamics
-from src.analyzers.voting_patterns import analyze_voting_patterns
-from src.analyzers.success_prediction import analyze_success_factors
+from src.config import (
+    ML_SERVICE_PORT,
+    DATA_BACKEND,
+    REPLICA_ENABLED,
+    REPLICA_REFRESH_SECONDS,
+    ANALYSIS_CONCURRENCY,
+    ANALYSIS_QUEUE_SIZE,
+    ANALYSIS_LIMITS,
+    WARM_STATE_ENABLED,
+    WARM_SNAPSHOT_SECONDS,
+    WARM_PRECOMPUTE,
+    LIVE_HEARTBEAT_SECONDS,
+    LIVE_INGEST_TOKEN,
+    LIVE_FEED_FILE,
+    validate,
+)
+from src.admission import AdmissionController, Saturated, parse_limits
+from src.replica import get_replica
+from src.pipeline import run_analyses, run_analysis_versioned
+from src import charts
+from src.charts import CHARTS, FORMATS, chart_etag, get_chart, list_charts
+from src import warm
+from src.warm import lazy
+
+# Analizatory, kostka i indeks importowane leniwie: pandas/numpy ładują się
+# przy pierwszym użyciu (albo w tle po starcie), a nie przy imporcie aplikacji
+analyze_law_references = lazy("src.analyzers.law_references", "analyze_law_references")
+analyze_process_dynamics = lazy("src.analyzers.process_dynamics", "analyze_process_dynamics")
+analyze_voting_patterns = lazy("src.analyzers.voting_patterns", "analyze_voting_patterns")
+get_votes_by_process = lazy("src.analyzers.voting_patterns", "get_votes_by_process")
+lookup_process_votings = lazy("src.analyzers.voting_patterns", "lookup_process_votings")
+analyze_success_factors = lazy("src.analyzers.success_prediction", "analyze_success_factors")
+analyze_stage_transitions = lazy("src.analyzers.stage_transitions", "analyze_stage_transitions")
+get_stage_transition_model = lazy("src.analyzers.stage_transitions", "get_stage_transition_model")
+transition_flow = lazy("src.analyzers.stage_transitions", "transition_flow")
+funnel = lazy("src.analyzers.stage_transitions", "funnel")
+resolve_stage = lazy("src.analyzers.stage_transitions", "resolve_stage")
+attach_cube = lazy("src.cube", "attach")
+get_cube = lazy("src.cube", "get_cube")
+get_search_index = lazy("src.search", "get_search_index")
+get_live_feed = lazy("src.live", "get_live_feed")
+follow_live_file = lazy("src.live", "follow_file")
+format_event = lazy("src.live", "format_event")
 
 # Logging
 logging.basicConfig(level=logging.INFO)
@@ -46,15 +104,155 @@ class AnalysisResponse(BaseModel):
     data: Dict[str, Any]
     error: str | None = None
 
+# Scalanie identycznych żądań + limity równoległości per analiza
+admission = AdmissionController(
+    limits=parse_limits(ANALYSIS_LIMITS),
+    default=(ANALYSIS_CONCURRENCY, ANALYSIS_QUEUE_SIZE),
+)
+
+@app.exception_handler(Saturated)
+async def saturated_handler(request: Request, exc: Saturated):
+    """Przepełniona kolejka analizy -> 503 z Retry-After"""
+    logger.warning(str(exc))
+    return JSONResponse(
+        status_code=503,
+        content={"success": False, "data": {}, "error": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+async def load_replica(replica):
+    """Pełne załadowanie repliki (ponawiane do skutku)"""
+    while not replica.ready:
+        try:
+            await asyncio.to_thread(replica.load)
+        except Exception as e:
+            logger.error(f"Replica load failed, retrying: {e}")
+            await asyncio.sleep(REPLICA_REFRESH_SECONDS)
+
+async def replica_sync_loop(replica):
+    """Co REPLICA_REFRESH_SECONDS nakłada deltę (wiersze z nowszym updated_at; usunięcia co REPLICA_DELETE_CHECK_EVERY)"""
+    while True:
+        await asyncio.sleep(REPLICA_REFRESH_SECONDS)
+        try:
+            await asyncio.to_thread(replica.refresh)
+        except Exception as e:
+            logger.error(f"Replica refresh failed: {e}")
+
+async def warm_start():
+    """
+    Ciepły start: przywróć stan z dysku (replika + wyniki), dociągnij deltę
+    lub pełną replikę, oznacz gotowość, a potem w tle dolicz brakujące wyniki
+    """
+    replica = get_replica() if REPLICA_ENABLED else None
+    if replica is not None:
+        # Kostka musi słuchać repliki, zanim ta zostanie załadowana lub przywrócona
+        await asyncio.to_thread(attach_cube, replica)
+
+    if WARM_STATE_ENABLED:
+        await asyncio.to_thread(warm.restore, replica)
+
+    if replica is not None and replica.ready:
+        # Przywrócona replika: od razu delta od zapisanego znacznika, razem
+        # z usunięciami (stan z dysku może być sprzed wielu odświeżeń)
+        try:
+            await asyncio.to_thread(replica.refresh, True)
+        except Exception as e:
+            logger.error(f"Replica refresh after restore failed: {e}")
+
+    if replica is not None:
+        await load_replica(replica)
+
+    app.state.boot["ready_seconds"] = round(time.perf_counter() - BOOT_STARTED, 3)
+    logger.info(f"[Boot] Ready in {app.state.boot['ready_seconds']}s (warm state restored: {warm.status['restored']})")
+
+    if WARM_PRECOMPUTE:
+        app.state.precompute_task = asyncio.create_task(asyncio.to_thread(warm.precompute))
+
+    if replica is not None:
+        await replica_sync_loop(replica)
+
+async def warm_snapshot_loop():
+    """Co WARM_SNAPSHOT_SECONDS zapisuje stan na dysk (tylko jeśli się zmienił)"""
+    while True:
+        await asyncio.sleep(WARM_SNAPSHOT_SECONDS)
+        if app.state.boot["ready_seconds"] is None:
+            continue
+        try:
+            await asyncio.to_thread(warm.save, get_replica() if REPLICA_ENABLED else None)
+        except Exception as e:
+            logger.error(f"Warm state snapshot failed: {e}")
+
+@app.on_event("startup")
+async def startup():
+    """Przywrócenie stanu i synchronizacja repliki w tle (nie blokują startu)"""
+    app.state.boot = {"import_seconds": round(time.perf_counter() - BOOT_STARTED, 3), "ready_seconds": None}
+    logger.info(f"[Boot] Application imported in {app.state.boot['import_seconds']}s")
+
+    app.state.config_error = None
+    try:
+        validate()
+    except ValueError as e:
+        app.state.config_error = str(e)
+        logger.warning(f"Invalid configuration, serving warm state only: {e}")
+
+    charts.start()
+    app.state.warm_task = asyncio.create_task(warm_start())
+    if WARM_STATE_ENABLED:
+        app.state.snapshot_task = asyncio.create_task(warm_snapshot_loop())
+    if LIVE_FEED_FILE:
+        app.state.live_file_task = asyncio.create_task(follow_live_file(get_live_feed(), LIVE_FEED_FILE))
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Zatrzymaj zadania w tle, zapisz stan na dysk, zamknij pulę wykresów i połączeń PostgreSQL"""
+    for name in ("warm_task", "snapshot_task", "precompute_task", "live_file_task"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+
+    if WARM_STATE_ENABLED and app.state.boot["ready_seconds"] is not None:
+        try:
+            await asyncio.to_thread(warm.save, get_replica() if REPLICA_ENABLED else None)
+        except Exception as e:
+            logger.error(f"Warm state snapshot failed: {e}")
+
+    charts.shutdown()
+
+    if DATA_BACKEND == "postgres":
+        from src.postgres import close_pool
+        close_pool()
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
     return {
         "service": "Sejm ML Service",
         "status": "running",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "replica_ready": get_replica().ready if REPLICA_ENABLED else None,
+        "admission": admission.stats(),
     }
 
+@app.get("/ready")
+async def ready():
+    """
+    Gotowość do obsługi ruchu (dla load balancera / autoscalera)
+
+    200 gdy replika jest załadowana (lub przywrócona z dysku), inaczej 503.
+    Zawiera czasy startu i informację o przywróconym stanie.
+    """
+    is_ready = app.state.boot["ready_seconds"] is not None
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={
+            "ready": is_ready,
+            "boot": app.state.boot,
+            "warm": warm.status,
+            "replica_ready": get_replica().ready if REPLICA_ENABLED else None,
+            "config_error": app.state.config_error,
+        },
+    )
+
 @app.get("/analyze/law-references", response_model=AnalysisResponse)
 async def get_law_references():
     """
@@ -67,8 +265,10 @@ async def get_law_references():
     """
     try:
         logger.info("Running law references analysis...")
-        results = analyze_law_references()
+        results = await admission.run("law_references", analyze_law_references)
         return AnalysisResponse(success=True, data=results)
+    except Saturated:
+        raise
     except Exception as e:
         logger.error(f"Error in law references analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -86,8 +286,10 @@ async def get_process_dynamics():
     """
     try:
         logger.info("Running process dynamics analysis...")
-        results = analyze_process_dynamics()
+        results = await admission.run("process_dynamics", analyze_process_dynamics)
         return AnalysisResponse(success=True, data=results)
+    except Saturated:
+        raise
     except Exception as e:
         logger.error(f"Error in process dynamics analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -104,8 +306,10 @@ async def get_voting_patterns():
     """
     try:
         logger.info("Running voting patterns analysis...")
-        results = analyze_voting_patterns()
+        results = await admission.run("voting_patterns", analyze_voting_patterns)
         return AnalysisResponse(success=True, data=results)
+    except Saturated:
+        raise
     except Exception as e:
         logger.error(f"Error in voting patterns analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -122,32 +326,335 @@ async def get_success_prediction():
     """
     try:
         logger.info("Running success prediction analysis...")
-        results = analyze_success_factors()
+        results = await admission.run("success_prediction", analyze_success_factors)
         return AnalysisResponse(success=True, data=results)
+    except Saturated:
+        raise
     except Exception as e:
         logger.error(f"Error in success prediction analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/analyze/stage-transitions", response_model=AnalysisResponse)
+async def get_stage_transitions():
+    """
+    Model przejść między etapami procesu legislacyjnego
+
+    Returns:
+    - top_stages: najczęściej osiągane etapy
+    - top_transitions: najczęstsze przejścia z prawdopodobieństwem i czasem
+    - segments: liczność segmentów project_type × urgency
+    """
+    try:
+        logger.info("Running stage transitions analysis...")
+        results = await admission.run("stage_transitions", analyze_stage_transitions)
+        return AnalysisResponse(success=True, data=results)
+    except Saturated:
+        raise
+    except Exception as e:
+        logger.error(f"Error in stage transitions analysis: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/flow/transitions", response_model=AnalysisResponse)
+async def get_flow_transitions(
+    project_type: str | None = None,
+    urgency: str | None = None,
+    min_count: int = 1,
+):
+    """
+    Graf przepływu między etapami (węzły + krawędzie) dla diagramów procesu
+
+    Returns:
+    - nodes: etapy z liczbą i odsetkiem procesów, które je osiągnęły
+    - edges: przejścia z liczbą, prawdopodobieństwem i rozkładem czasu
+    """
+    try:
+        model = await admission.run("stage_transition_model", get_stage_transition_model)
+        return AnalysisResponse(success=True, data=transition_flow(model, project_type, urgency, min_count))
+    except Saturated:
+        raise
+    except Exception as e:
+        logger.error(f"Error in flow transitions: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/flow/funnel", response_model=AnalysisResponse)
+async def get_flow_funnel(
+    stages: str = Query(..., description="Etapy oddzielone przecinkami, np. 'I czytanie w komisjach,Senat'"),
+    project_type: str | None = None,
+    urgency: str | None = None,
+):
+    """
+    Lejek między etapami
+
+    Returns:
+    - steps: dla każdego etapu liczba procesów, odsetek względem pierwszego
+      i poprzedniego etapu oraz rozkład czasu dojścia od pierwszego etapu
+    """
+    names = [s.strip() for s in stages.split(",") if s.strip()]
+    try:
+        model = await admission.run("stage_transition_model", get_stage_transition_model)
+    except Saturated:
+        raise
+    except Exception as e:
+        logger.error(f"Error in flow funnel: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Nieznany etap sprawdzany jawnie: KeyError z wnętrza obliczeń to błąd (500), nie 404
+    unknown = [name for name in names if resolve_stage(model, name) is None]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown stage: {', '.join(unknown)}")
+
+    try:
+        return AnalysisResponse(success=True, data=funnel(model, names, project_type, urgency))
+    except Exception as e:
+        logger.error(f"Error in flow funnel: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Limit procesów w jednym żądaniu zbiorczym (strona listy to ~50)
+MAX_BATCH_PROCESSES = 100
+
+@app.get("/process/{process_id}/votings", response_model=AnalysisResponse)
+async def get_process_votings(process_id: str):
+    """
+    Głosowania procesu legislacyjnego
+
+    Returns:
+    - votings: głosowania (chronologicznie) z frekwencją, marginesem i kontrowersyjnością
+    - summary: agregat procesu (m.in. najbardziej sporne i najciaśniejsze głosowanie)
+    """
+    try:
+        index = await admission.run("votes_by_process", get_votes_by_process)
+        return AnalysisResponse(success=True, data=lookup_process_votings(index, process_id))
+    except Saturated:
+        raise
+    except Exception as e:
+        logger.error(f"Error in process votings: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/processes/votings", response_model=AnalysisResponse)
+async def get_processes_votings(
+    ids: str = Query(..., description="Id procesów oddzielone przecinkami"),
+    include_votings: bool = False,
+):
+    """
+    Głosowania wielu procesów naraz (np. strona listy)
+
+    Domyślnie zwraca tylko agregaty; include_votings=true dołącza listy głosowań.
+
+    Returns:
+    - process_id -> {summary[, votings]}
+    """
+    process_ids = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if len(process_ids) > MAX_BATCH_PROCESSES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_PROCESSES} processes per request")
+
+    try:
+        index = await admission.run("votes_by_process", get_votes_by_process)
+        data = {}
+        for process_id in process_ids:
+            entry = lookup_process_votings(index, process_id)
+            data[process_id] = entry if include_votings else {"summary": entry["summary"]}
+        return AnalysisResponse(success=True, data=data)
+    except Saturated:
+        raise
+    except Exception as e:
+        logger.error(f"Error in processes votings: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Limit wierszy przekroju kostki w jednej odpowiedzi
+MAX_CUBE_ROWS = 1000
+
+@app.get("/cube", response_model=AnalysisResponse)
+async def get_cube_slice(
+    fact: str = "processes",
+    group_by: str = Query("", description="Wymiary oddzielone przecinkami, np. 'project_type,urgency,month'"),
+    filter: List[str] = Query([], description="Filtr 'wymiar:wartość' (kilka wartości przez '|'), np. 'term:10'"),
+    limit: int | None = Query(None, ge=1, le=MAX_CUBE_ROWS),
+):
+    """
+    Przekrój kostki agregatów
+
+    Fakty i wymiary:
+    - processes: term, month, project_type, urgency, document_type, category
+    - votings: term, month, sitting
+
+    Returns:
+    - rows: dla każdej grupy sumy miar addytywnych i miary pochodne
+      (wskaźniki sukcesu/odrzuceń, średnie i odchylenia)
+    """
+    try:
+        filters = {}
+        for item in filter:
+            dim, sep, values = item.partition(":")
+            if not sep:
+                raise HTTPException(status_code=400, detail=f"Invalid filter: {item}")
+            filters.setdefault(dim.strip(), []).extend(v.strip() for v in values.split("|"))
+
+        cube = await admission.run("rollup_cube", get_cube)
+        data = cube.query(
+            fact,
+            group_by=[d.strip() for d in group_by.split(",") if d.strip()],
+            filters=filters,
+            limit=limit,
+        )
+        return AnalysisResponse(success=True, data=data)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except (Saturated, HTTPException):
+        raise
+    except Exception as e:
+        logger.error(f"Error in cube query: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/search", response_model=AnalysisResponse)
+async def search(
+    q: str = Query(..., min_length=1, description='Zapytanie: słowa, "fraza", prefiks*'),
+    kind: str | None = Query(None, description="process | print"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Wyszukiwanie pełnotekstowe (tytuły i opisy procesów, streszczenia, tytuły druków)
+
+    Returns:
+    - total: liczba trafień
+    - results: dokumenty (kind, id, title, score) wg rankingu BM25
+    """
+    try:
+        index = await admission.run("search_index", get_search_index)
+        return AnalysisResponse(success=True, data=index.search(q, kind=kind, limit=limit, offset=offset))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Saturated:
+        raise
+    except Exception as e:
+        logger.error(f"Error in search: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/charts", response_model=AnalysisResponse)
+async def get_charts():
+    """Lista wykresów: analiza, nazwa wykresu i tytuł"""
+    return AnalysisResponse(success=True, data={"charts": list_charts(), "formats": list(FORMATS)})
+
+@app.get("/charts/{analysis}/{chart}")
+async def get_chart_image(
+    analysis: str,
+    chart: str,
+    request: Request,
+    format: str = Query("svg", description="svg | png"),
+):
+    """
+    Wykres wyniku analizy renderowany po stronie serwera
+
+    Plik jest adresowany wersją danych: ETag zmienia się tylko po zmianie
+    danych źródłowych, a If-None-Match z aktualnym ETagiem daje 304.
+    """
+    name = analysis.replace("-", "_")
+    if (name, chart) not in CHARTS:
+        raise HTTPException(status_code=404, detail=f"Unknown chart: {analysis}/{chart}")
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format} (expected one of {', '.join(FORMATS)})")
+
+    try:
+        data, key = await admission.run(name, run_analysis_versioned, analysis=name)
+        etag = chart_etag(name, chart, key, format)
+        headers = {"ETag": etag, "Cache-Control": "public, max-age=60"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+
+        content = await asyncio.to_thread(get_chart, name, chart, key, data, format)
+        return Response(content=content, media_type=FORMATS[format], headers=headers)
+    except Saturated:
+        raise
+    except Exception as e:
+        logger.error(f"Error rendering chart {name}/{chart}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/live/votings", response_model=AnalysisResponse)
+async def ingest_live_votings(request: Request, votings: List[Dict[str, Any]]):
+    """
+    Nowe głosowania trwającego posiedzenia (wiersze jak w tabeli votings)
+
+    Agregaty aktualizowane są bez przeliczania historii, a zmiany trafiają
+    od razu do klientów /live/stream. Powtórzone głosowania są ignorowane.
+    Niepoprawny wiersz (brak klucza, licznik nieliczbowy) odrzuca całą
+    partię z kodem 422, bez zmiany agregatów.
+    Wymagany jest nagłówek `Authorization: Bearer <LIVE_INGEST_TOKEN>`;
+    bez skonfigurowanego tokenu przyjmowanie danych jest wyłączone (503).
+    """
+    if not LIVE_INGEST_TOKEN:
+        raise HTTPException(status_code=503, detail="Live ingest disabled (LIVE_INGEST_TOKEN not set)")
+    if request.headers.get("authorization") != f"Bearer {LIVE_INGEST_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid ingest token")
+
+    try:
+        feed = get_live_feed()
+        changed = feed.ingest(votings)
+        return AnalysisResponse(success=True, data={"received": len(votings), "changed": changed, **feed.stats()})
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in live ingest: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/live/sittings", response_model=AnalysisResponse)
+async def get_live_sittings(term: int | None = None, sitting: int | None = None):
+    """Bieżące agregaty posiedzeń (frekwencja, odsetek przyjętych, top-k) bez subskrypcji"""
+    feed = get_live_feed()
+    return AnalysisResponse(success=True, data={"sittings": feed.snapshots(term, sitting), **feed.stats()})
+
+@app.get("/live/stream")
+async def live_stream(request: Request, term: int | None = None, sitting: int | None = None):
+    """
+    Strumień Server-Sent Events z agregatami posiedzenia
+
+    Po połączeniu klient dostaje zdarzenia `snapshot` z bieżącym stanem,
+    a potem `voting` po każdym nowym głosowaniu (głosowanie + agregaty).
+    Filtry `term` i `sitting` zawężają strumień do jednego posiedzenia.
+    """
+    feed = get_live_feed()
+    subscriber = feed.subscribe(term, sitting)
+
+    async def events():
+        try:
+            for snapshot in feed.snapshots(term, sitting):
+                yield format_event("snapshot", snapshot)
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber.queue.get(), LIVE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # Komentarz SSE: podtrzymuje połączenie przez proxy
+                    yield ": ping\n\n"
+        finally:
+            feed.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.get("/analyze/all", response_model=AnalysisResponse)
 async def get_all_analyses():
     """
     Uruchom wszystkie analizy naraz
+
+    Analizy współdzielą artefakty pochodne (daty, timeline, cechy),
+    więc każdy z nich liczony jest tylko raz, a niezależne gałęzie równolegle.
     """
     try:
         logger.info("Running all analyses...")
 
-        results = {
-            "law_references": analyze_law_references(),
-            "process_dynamics": analyze_process_dynamics(),
-            "voting_patterns": analyze_voting_patterns(),
-            "success_prediction": analyze_success_factors(),
-        }
+        results = await admission.run("all", run_analyses)
 
         return AnalysisResponse(success=True, data=results)
+    except Saturated:
+        raise
     except Exception as e:
         logger.error(f"Error in running all analyses: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=ML_SERVICE_PORT)
+    uvicorn.run(app, host="0.0.0.0", port=ML_SERVICE_PORT, timeout_graceful_shutdown=10)
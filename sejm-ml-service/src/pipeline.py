@@ -0,0 +1,422 @@
+"""
+Graf zależności artefaktów pochodnych współdzielonych przez analizatory
+
+Każdy artefakt (np. sparsowane daty, spłaszczony timeline, ramka cech)
+i każda analiza deklaruje, od czego zależy. Scheduler:
+- liczy każdy artefakt co najwyżej raz na wersję danych (memoizacja),
+- uruchamia niezależne gałęzie grafu równolegle,
+- ładuje tylko te tabele źródłowe, których faktycznie potrzebuje
+  (z repliki w pamięci, jeśli działa — zob. src.replica).
+
+Rejestracja:
+
+    @artifact("process_dates", deps=["processes"])
+    def build_process_dates(processes): ...
+
+    @analysis("process_dynamics", deps=["processes", "process_dates"])
+    def compute_process_dynamics(processes, process_dates): ...
+"""
+
+import hashlib
+import importlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src import database
+from src.config import ARTIFACTS_DIR
+from src.replica import active_replica
+
+logger = logging.getLogger(__name__)
+
+# Moduły rejestrujące analizy (importowane leniwie, przy pierwszym użyciu)
+ANALYZER_MODULES = [
+    "src.artifacts",
+    "src.analyzers.law_references",
+    "src.analyzers.process_dynamics",
+    "src.analyzers.voting_patterns",
+    "src.analyzers.success_prediction",
+    "src.analyzers.stage_transitions",
+    "src.cube",
+    "src.search",
+]
+
+# Tabele źródłowe: nazwa artefaktu -> tabela w bazie
+SOURCES: Dict[str, str] = {
+    "processes": "legislative_processes",
+    "prints": "prints",
+    "votings": "votings",
+    "process_stages": "process_stages",
+}
+
+DEFAULT_JOBS = 4
+
+
+@dataclass(frozen=True)
+class Node:
+    name: str
+    deps: Tuple[str, ...]
+    fn: Callable[..., Any]
+    is_analysis: bool = False
+    persist: bool = False
+    code: str = ""
+
+
+_nodes: Dict[str, Node] = {}
+
+# Memoizacja: nazwa -> (klucz wersji, wartość). Trzymamy tylko ostatnią wersję.
+_memo: Dict[str, Tuple[str, Any]] = {}
+_memo_lock = threading.Lock()
+_node_locks: Dict[str, threading.Lock] = {}
+_loaded = False
+
+# Słuchacze nowo policzonych wartości: (nazwa, klucz wersji, wartość), np. prerender wykresów
+_computed_listeners: List[Callable[[str, str, Any], None]] = []
+
+
+def _source(fn: Callable[..., Any]) -> str:
+    try:
+        return inspect.getsource(fn)
+    except (OSError, TypeError):
+        return f"{fn.__module__}.{fn.__qualname__}"
+
+
+def code_version(fn: Callable[..., Any], version: int = 1, helpers: Iterable[Callable[..., Any]] = ()) -> str:
+    """
+    Odcisk kodu węzła: źródło funkcji i jej funkcji pomocniczych + ręczny numer wersji
+
+    Wchodzi do klucza wersji, więc po wdrożeniu zmienionej funkcji wyniki
+    zapisane na dysku (persist=True, ciepły start) nie są już używane.
+    Pomocnicze funkcje spoza `helpers` nie są śledzone - ich zmiana
+    wymaga podbicia `version` w dekoratorze.
+    """
+    sources = [str(version), _source(fn)] + [_source(helper) for helper in helpers]
+    return hashlib.blake2b("|".join(sources).encode(), digest_size=8).hexdigest()
+
+
+def artifact(
+    name: str,
+    deps: Iterable[str] = (),
+    persist: bool = False,
+    version: int = 1,
+    helpers: Iterable[Callable[..., Any]] = (),
+):
+    """
+    Rejestruje artefakt pochodny
+
+    persist=True zapisuje wynik na dysk (ARTIFACTS_DIR) pod kluczem wersji,
+    więc po restarcie serwisu kosztowne modele nie są liczone od nowa.
+    helpers: funkcje pomocnicze wchodzące do odcisku kodu (zob. code_version).
+    version: podbić po zmianie logiki poza samą funkcją i `helpers`.
+    """
+    def decorator(fn):
+        _nodes[name] = Node(name, tuple(deps), fn, persist=persist, code=code_version(fn, version, helpers))
+        return fn
+    return decorator
+
+
+def analysis(name: str, deps: Iterable[str] = (), version: int = 1, helpers: Iterable[Callable[..., Any]] = ()):
+    """Rejestruje analizę (liść grafu, wynik zwracany klientowi)"""
+    def decorator(fn):
+        _nodes[name] = Node(name, tuple(deps), fn, is_analysis=True, code=code_version(fn, version, helpers))
+        return fn
+    return decorator
+
+
+def node_code(name: str) -> str:
+    """Odcisk kodu zarejestrowanego węzła (np. jako wersja schematu danych, które buduje)"""
+    return _nodes[name].code
+
+
+def _ensure_registered():
+    global _loaded
+    if not _loaded:
+        for module in ANALYZER_MODULES:
+            importlib.import_module(module)
+        _loaded = True
+
+
+def list_analyses() -> List[str]:
+    """Nazwy zarejestrowanych analiz"""
+    _ensure_registered()
+    return [name for name, node in _nodes.items() if node.is_analysis]
+
+
+def dataset_version(rows: List[Dict]) -> str:
+    """
+    Odcisk wersji tabeli źródłowej
+
+    Jeśli wiersze mają `updated_at`, wystarczą pary (id, updated_at);
+    w przeciwnym razie hashujemy całą treść wiersza.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(len(rows)).encode())
+    for row in rows:
+        if "updated_at" in row:
+            digest.update(f"{row.get('id')}|{row.get('updated_at')}\n".encode())
+        else:
+            digest.update(json.dumps(row, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _node_lock(name: str) -> threading.Lock:
+    with _memo_lock:
+        return _node_locks.setdefault(name, threading.Lock())
+
+
+def _artifact_path(name: str, key: str) -> Path:
+    return Path(ARTIFACTS_DIR) / f"{name}-{key}.pkl"
+
+
+def _load_persisted(name: str, key: str) -> Any:
+    path = _artifact_path(name, key)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            logger.info(f"[Pipeline] {name}: loaded from {path}")
+            return pickle.load(f)
+    except Exception as e:
+        logger.warning(f"[Pipeline] {name}: ignoring unreadable {path}: {e}")
+        return None
+
+
+def _persist(name: str, key: str, value: Any):
+    """Zapis atomowy (plik tymczasowy + rename); starsze wersje są usuwane"""
+    path = _artifact_path(name, key)
+    tmp = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unikalna nazwa: równoległe procesy nie nadpisują sobie pliku tymczasowego
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False) as f:
+            tmp = f.name
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        for old in path.parent.glob(f"{name}-*.pkl"):
+            if old != path:
+                old.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"[Pipeline] {name}: could not persist to {path}: {e}")
+        if tmp:
+            Path(tmp).unlink(missing_ok=True)
+
+
+def _closure(targets: Iterable[str]) -> List[str]:
+    """Topologicznie posortowane domknięcie zależności"""
+    order: List[str] = []
+    visiting = set()
+
+    def visit(name: str):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"Cycle in analysis graph at '{name}'")
+        if name not in _nodes and name not in SOURCES:
+            raise KeyError(f"Unknown artifact or analysis: '{name}'")
+        visiting.add(name)
+        for dep in (_nodes[name].deps if name in _nodes else ()):
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for target in targets:
+        visit(target)
+    return order
+
+
+class Run:
+    """
+    Pojedyncze uruchomienie grafu dla konkretnych danych źródłowych
+
+    `sources` pozwala podać już załadowane tabele (np. ze snapshotu),
+    brakujące są pobierane z bazy.
+    """
+
+    def __init__(self, sources: Optional[Dict[str, List[Dict]]] = None, jobs: int = DEFAULT_JOBS):
+        _ensure_registered()
+        self.values: Dict[str, Any] = {}
+        self.keys: Dict[str, str] = {}
+        self.errors: Dict[str, Exception] = {}
+        self.jobs = max(1, jobs)
+        self._sources = dict(sources or {})
+
+    def _version_key(self, name: str) -> str:
+        """Klucz z wersji kodu węzła i kluczy zależności (zmiana kodu w górze grafu zmienia klucze w dół)"""
+        node = _nodes[name]
+        return hashlib.blake2b(
+            "|".join([name, node.code] + [self.keys[dep] for dep in node.deps]).encode(),
+            digest_size=16,
+        ).hexdigest()
+
+    def _load_source(self, name: str) -> List[Dict]:
+        """
+        Tabela źródłowa: podana z zewnątrz, z repliki w pamięci
+        (wersja bez hashowania) lub pobrana z bazy
+        """
+        if name in self._sources:
+            rows = self._sources[name] or []
+            self.keys[name] = dataset_version(rows)
+            return rows
+
+        replica = active_replica()
+        snapshot = replica.snapshot(SOURCES[name]) if replica else None
+        if snapshot is not None:
+            rows, self.keys[name] = snapshot
+            return rows
+
+        rows = database.fetch_table(SOURCES[name]) or []
+        self.keys[name] = dataset_version(rows)
+        return rows
+
+    def _compute(self, name: str) -> Any:
+        if name in SOURCES:
+            return self._load_source(name)
+
+        node = _nodes[name]
+        key = self._version_key(name)
+        self.keys[name] = key
+
+        # Blokada per węzeł: równoległe uruchomienia (np. dwa żądania HTTP)
+        # czekają na pierwsze obliczenie zamiast liczyć ten sam artefakt
+        with _node_lock(name):
+            with _memo_lock:
+                cached = _memo.get(name)
+            if cached and cached[0] == key:
+                logger.debug("[Pipeline] %s: memo hit", name)
+                return cached[1]
+
+            value = _load_persisted(name, key) if node.persist else None
+            if value is None:
+                value = node.fn(**{dep: self.values[dep] for dep in node.deps})
+                if node.persist:
+                    _persist(name, key, value)
+
+            with _memo_lock:
+                _memo[name] = (key, value)
+
+        for listener in _computed_listeners:
+            try:
+                listener(name, key, value)
+            except Exception as e:
+                logger.error(f"[Pipeline] Listener failed for {name}: {e}")
+        return value
+
+    def execute(self, targets: Iterable[str]) -> Dict[str, Any]:
+        """
+        Liczy wskazane węzły; niezależne gałęzie idą równolegle.
+
+        Błąd w węźle pomija jego dependentów, ale nie przerywa
+        pozostałych gałęzi — zebrane błędy są w `self.errors`.
+        """
+        targets = list(targets)
+        order = _closure(targets)
+        pending = {name: set(_nodes[name].deps if name in _nodes else ()) for name in order}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while pending or running:
+                ready = [name for name, deps in pending.items() if not deps]
+                for name in ready:
+                    del pending[name]
+                    running[pool.submit(self._compute, name)] = name
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.values[name] = future.result()
+                    except Exception as e:
+                        logger.error(f"[Pipeline] {name} failed: {e}")
+                        self.errors[name] = e
+                        self._skip_dependents(name, pending)
+                        continue
+                    for deps in pending.values():
+                        deps.discard(name)
+
+        return {name: self.values[name] for name in targets if name in self.values}
+
+    def _skip_dependents(self, failed: str, pending: Dict[str, set]):
+        for name in [n for n, deps in pending.items() if failed in deps]:
+            if name in pending:
+                del pending[name]
+                self.errors[name] = RuntimeError(f"dependency '{failed}' failed")
+                self._skip_dependents(name, pending)
+
+
+def run_analyses(
+    names: Optional[Iterable[str]] = None,
+    sources: Optional[Dict[str, List[Dict]]] = None,
+    jobs: int = DEFAULT_JOBS,
+) -> Dict[str, Any]:
+    """
+    Uruchamia analizy (domyślnie wszystkie) we wspólnym grafie
+
+    Raises:
+        Pierwszy napotkany wyjątek, jeśli któraś z analiz się nie powiodła.
+    """
+    run = Run(sources=sources, jobs=jobs)
+    names = list(names) if names is not None else list_analyses()
+    results = run.execute(names)
+    for name in names:
+        if name in run.errors:
+            raise run.errors[name]
+    return results
+
+
+def run_analysis(name: str, **kwargs) -> Any:
+    """Uruchamia pojedynczą analizę"""
+    return run_analyses([name], **kwargs)[name]
+
+
+def run_analysis_versioned(analysis: str) -> Tuple[Any, str]:
+    """
+    Wynik analizy razem z kluczem wersji danych, z których powstał
+
+    Raises:
+        Wyjątek analizy, jeśli się nie powiodła.
+    """
+    run = Run()
+    results = run.execute([analysis])
+    if analysis in run.errors:
+        raise run.errors[analysis]
+    return results[analysis], run.keys[analysis]
+
+
+def on_computed(listener: Callable[[str, str, Any], None]):
+    """Rejestruje słuchacza nowo policzonych wartości (nie wołany dla trafień w pamięć)"""
+    _computed_listeners.append(listener)
+
+
+def node_versions() -> Dict[str, str]:
+    """Odciski kodu zarejestrowanych węzłów (zob. code_version)"""
+    _ensure_registered()
+    return {name: node.code for name, node in _nodes.items()}
+
+
+def export_memo() -> Dict[str, Tuple[str, Any]]:
+    """Zapamiętane wartości z kluczami wersji (do zapisu stanu ciepłego startu)"""
+    with _memo_lock:
+        return dict(_memo)
+
+
+def restore_memo(entries: Dict[str, Tuple[str, Any]]):
+    """Przywraca wartości zapisane przez export_memo(); użyte, gdy klucz wersji się zgadza"""
+    with _memo_lock:
+        _memo.update(entries)
+
+
+def clear_memo():
+    """Czyści zapamiętane artefakty (np. w testach)"""
+    with _memo_lock:
+        _memo.clear()
@@ -0,0 +1,171 @@
+"""Direct PostgreSQL backend (DATA_BACKEND=postgres)
+
+Omija REST API Supabase:
+- pula połączeń współdzielona przez wątki (ThreadedConnectionPool),
+- pełne tabele czytane jednym `COPY ... TO STDOUT` zamiast JSON po HTTPS,
+- zapisy jako wsadowe upserty (`INSERT ... ON CONFLICT DO UPDATE`).
+
+Wiersze zwracane przez `fetch_table` mają ten sam kształt co odpowiedzi
+Supabase (`row_to_json`: daty jako stringi ISO, JSONB jako dict/list),
+więc analizatory nie rozróżniają backendów.
+
+Odczyt celowo nie jest kolumnowy: replika, ProcessStore (src.store)
+i magazyn cech (src.feature_store) przyjmują wiersze-słowniki i same
+budują kolumny tam, gdzie to się opłaca, więc ramka kolumnowa z bazy
+i tak byłaby z powrotem rozkładana na wiersze. Zysk względem REST daje
+jeden strumień COPY bez stronicowania HTTP i narzutu PostgREST.
+"""
+import csv
+import io
+import json
+import sys
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Sequence
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import Json, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+from src.config import DATABASE_URL, PG_POOL_MIN, PG_POOL_MAX, PG_UPSERT_PAGE_SIZE, validate
+
+# Pojedyncze wartości JSON potrafią przekroczyć domyślny limit pola CSV (128 KB)
+csv.field_size_limit(sys.maxsize)
+
+_pool: ThreadedConnectionPool | None = None
+_primary_keys: Dict[str, List[str]] = {}
+
+
+def get_pool() -> ThreadedConnectionPool:
+    """Get or create connection pool"""
+    global _pool
+    if _pool is None:
+        validate()
+        _pool = ThreadedConnectionPool(PG_POOL_MIN, PG_POOL_MAX, dsn=DATABASE_URL)
+    return _pool
+
+
+def close_pool():
+    """Zamyka wszystkie połączenia puli"""
+    global _pool
+    if _pool is not None:
+        _pool.closeall()
+        _pool = None
+
+
+@contextmanager
+def connection() -> Iterator[psycopg2.extensions.connection]:
+    """Połączenie z puli; commit przy sukcesie, rollback przy błędzie"""
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+
+
+def _copy_out(query: sql.Composable) -> io.StringIO:
+    """Wykonuje COPY (query) TO STDOUT w formacie CSV do bufora w pamięci"""
+    buffer = io.StringIO()
+    statement = sql.SQL("COPY ({}) TO STDOUT WITH (FORMAT csv)").format(query)
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.copy_expert(statement.as_string(conn), buffer)
+
+    buffer.seek(0)
+    return buffer
+
+
+def fetch_table(table: str, since: str | None = None) -> List[Dict[str, Any]]:
+    """
+    Pobiera całą tabelę (lub wiersze z updated_at >= since) jednym COPY
+
+    Każdy wiersz serializowany jest po stronie serwera przez row_to_json,
+    dzięki czemu kształt danych jest identyczny z odpowiedzią PostgREST.
+    """
+    query = sql.SQL("SELECT row_to_json(t)::text FROM {} t").format(sql.Identifier(table))
+    if since is not None:
+        query = sql.SQL("{} WHERE t.updated_at >= {}").format(query, sql.Literal(since))
+
+    buffer = _copy_out(query)
+    return [json.loads(line[0]) for line in csv.reader(buffer)]
+
+
+def fetch_ids(table: str) -> List[Any]:
+    """Klucze główne (kolumna id) wszystkich wierszy tabeli"""
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("SELECT id FROM {}").format(sql.Identifier(table)))
+            return [row[0] for row in cur.fetchall()]
+
+
+def primary_key(table: str) -> List[str]:
+    """Kolumny klucza głównego tabeli (z katalogu systemowego, cache)"""
+    if table not in _primary_keys:
+        with connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT a.attname
+                    FROM pg_index i
+                    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+                    WHERE i.indrelid = %s::regclass AND i.indisprimary
+                    """,
+                    (table,),
+                )
+                _primary_keys[table] = [row[0] for row in cur.fetchall()]
+    return _primary_keys[table]
+
+
+def _adapt(value: Any) -> Any:
+    return Json(value) if isinstance(value, (dict, list)) else value
+
+
+def upsert_rows(table: str, rows: List[Dict[str, Any]], conflict_columns: Sequence[str] | None = None) -> int:
+    """
+    Wsadowy upsert wierszy (INSERT ... ON CONFLICT DO UPDATE)
+
+    Args:
+        conflict_columns: kolumny konfliktu; domyślnie klucz główny tabeli
+
+    Returns:
+        Liczba zapisanych wierszy
+    """
+    if not rows:
+        return 0
+
+    columns = list(rows[0].keys())
+    conflict_columns = list(conflict_columns or primary_key(table))
+    updates = [column for column in columns if column not in conflict_columns]
+
+    if conflict_columns and updates:
+        on_conflict = sql.SQL("ON CONFLICT ({}) DO UPDATE SET {}").format(
+            sql.SQL(", ").join(map(sql.Identifier, conflict_columns)),
+            sql.SQL(", ").join(
+                sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(column)) for column in updates
+            ),
+        )
+    elif conflict_columns:
+        on_conflict = sql.SQL("ON CONFLICT ({}) DO NOTHING").format(
+            sql.SQL(", ").join(map(sql.Identifier, conflict_columns))
+        )
+    else:
+        on_conflict = sql.SQL("")
+
+    statement = sql.SQL("INSERT INTO {} ({}) VALUES %s {}").format(
+        sql.Identifier(table),
+        sql.SQL(", ").join(map(sql.Identifier, columns)),
+        on_conflict,
+    )
+    values = [tuple(_adapt(row.get(column)) for column in columns) for row in rows]
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            execute_values(cur, statement.as_string(conn), values, page_size=PG_UPSERT_PAGE_SIZE)
+
+    return len(rows)
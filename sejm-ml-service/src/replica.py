@@ -0,0 +1,228 @@
+"""
+Replika tabel w pamięci z synchronizacją przyrostową po updated_at
+
+Serwis trzyma stałą kopię legislative_processes, votings, process_stages
+i prints.
+Zadanie w tle co REPLICA_REFRESH_SECONDS:
+- pobiera wiersze z updated_at >= znacznik (watermark) i nakłada je w miejscu,
+- co REPLICA_DELETE_CHECK_EVERY odświeżeń porównuje listę kluczy z bazą
+  i usuwa skasowane wiersze (to pełny odczyt kluczy, więc nie przy każdej delcie).
+
+Analizatory (przez src.pipeline) czytają z repliki, więc na ścieżce
+żądania nie ma pobierania danych, a odświeżenie kosztuje tylko deltę.
+"""
+
+import logging
+import pickle
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src import database
+from src.config import REPLICA_DELETE_CHECK_EVERY
+from src.store import COMPACT_RATIO, ProcessStore
+
+logger = logging.getLogger(__name__)
+
+REPLICATED_TABLES = ("legislative_processes", "votings", "process_stages", "prints")
+
+# Tabele trzymane w kompaktowym magazynie zamiast słowników (zob. src.store)
+COMPACT_TABLES = {"legislative_processes": ProcessStore.from_rows}
+
+# Słuchacze zmian: (tabela, [(stary_wiersz | None, nowy_wiersz | None)])
+ChangeListener = Callable[[str, List[Tuple[Optional[Dict], Optional[Dict]]]], None]
+
+
+def _timestamp(value: str) -> datetime:
+    """
+    updated_at jako datetime do porównań
+
+    Porównanie tekstowe myli się przy różnej liczbie cyfr ułamka sekund
+    czy różnym zapisie strefy (Z / +00:00).
+    """
+    stamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return stamp if stamp.tzinfo else stamp.replace(tzinfo=timezone.utc)
+
+
+class TableReplica:
+    """Kopia pojedynczej tabeli: id -> wiersz (dict lub ProcessStore)"""
+
+    def __init__(self, table: str):
+        self.table = table
+        self._storage = COMPACT_TABLES.get(table, lambda rows: {row["id"]: row for row in rows})
+        self.rows = self._storage([])
+        self.watermark: Optional[str] = None
+        self.version = 0
+        self._lock = threading.Lock()
+        self._snapshot: Optional[List[Dict]] = None
+        self._refreshes = 0
+
+    def load(self) -> List[Tuple[Optional[Dict], Optional[Dict]]]:
+        """Pełne załadowanie tabeli"""
+        rows = database.fetch_table(self.table)
+        with self._lock:
+            # Przy ponownym załadowaniu zmiany liczone są względem poprzedniej
+            # zawartości, by słuchacze przyrostowi nie policzyli wierszy dwa razy
+            previous = self.rows
+            ids = {row["id"] for row in rows}
+            changes = [(previous.get(row["id"]), row) for row in rows if previous.get(row["id"]) != row]
+            changes += [(previous[row_id], None) for row_id in previous if row_id not in ids]
+            self.rows = self._storage(rows)
+            self.watermark = max((row["updated_at"] for row in rows if row.get("updated_at")), key=_timestamp, default=None)
+            self._bump()
+        return changes
+
+    def refresh(self, check_deletes: Optional[bool] = None) -> List[Tuple[Optional[Dict], Optional[Dict]]]:
+        """
+        Nakłada deltę: upserty wierszy zmienionych od znacznika i usunięcia
+
+        Args:
+            check_deletes: porównać klucze z bazą; domyślnie co
+                REPLICA_DELETE_CHECK_EVERY wywołań
+
+        Returns:
+            Lista zmian (stary, nowy); pusta, jeśli nic się nie zmieniło
+        """
+        if self.watermark is None:
+            return self.load()
+
+        if check_deletes is None:
+            self._refreshes += 1
+            check_deletes = self._refreshes % REPLICA_DELETE_CHECK_EVERY == 0
+
+        # >= zamiast >: wiersze z tym samym updated_at co znacznik nie zginą,
+        # a ponowne nałożenie niezmienionego wiersza jest pomijane
+        changed = database.fetch_rows_since(self.table, self.watermark)
+        ids = set(database.fetch_ids(self.table)) if check_deletes else None
+
+        with self._lock:
+            changes = []
+
+            watermark = _timestamp(self.watermark)
+            for row in changed:
+                old = self.rows.get(row["id"])
+                if old != row:
+                    self.rows[row["id"]] = row
+                    changes.append((old, row))
+                if row.get("updated_at") and _timestamp(row["updated_at"]) > watermark:
+                    self.watermark, watermark = row["updated_at"], _timestamp(row["updated_at"])
+
+            if ids is not None:
+                for row_id in [row_id for row_id in self.rows if row_id not in ids]:
+                    changes.append((self.rows.pop(row_id), None))
+
+            if changes:
+                self._bump()
+
+            if isinstance(self.rows, ProcessStore) and self.rows.dead_ratio > COMPACT_RATIO:
+                self.rows = self.rows.compacted()
+
+        return changes
+
+    def export(self) -> bytes:
+        """Wiersze (dict lub ProcessStore) i znacznik zserializowane pod blokadą - do zapisu na dysk"""
+        with self._lock:
+            return pickle.dumps((self.rows, self.watermark), protocol=pickle.HIGHEST_PROTOCOL)
+
+    def restore(self, rows, watermark: Optional[str]) -> List[Tuple[Optional[Dict], Optional[Dict]]]:
+        """Przywraca stan zapisany przez export(); dalej wystarczy refresh() od znacznika"""
+        with self._lock:
+            self.rows = rows
+            self.watermark = watermark
+            self._bump()
+            return [(None, row) for row in rows.values()]
+
+    def snapshot(self) -> Tuple[List[Dict], str]:
+        """
+        Lista wierszy i klucz wersji (lista budowana raz na wersję)
+
+        Klucz zależy od treści (liczba wierszy + znacznik), nie od licznika
+        w pamięci, więc jest stabilny między restartami i nadaje się
+        do kluczowania artefaktów zapisanych na dysku.
+        """
+        with self._lock:
+            if self._snapshot is None:
+                if isinstance(self.rows, ProcessStore):
+                    self._snapshot = self.rows.snapshot()
+                else:
+                    self._snapshot = list(self.rows.values())
+            return self._snapshot, f"{self.table}:{len(self.rows)}:{self.watermark}"
+
+    def _bump(self):
+        self.version += 1
+        self._snapshot = None
+
+
+class Replica:
+    """Zbiór replik tabel + powiadamianie słuchaczy o zmianach"""
+
+    def __init__(self, tables=REPLICATED_TABLES):
+        self.tables = {table: TableReplica(table) for table in tables}
+        self.ready = False
+        self._listeners: List[ChangeListener] = []
+
+    def subscribe(self, listener: ChangeListener):
+        """Rejestruje słuchacza zmian (np. indeksy utrzymywane przyrostowo)"""
+        self._listeners.append(listener)
+
+    def load(self):
+        """Pełne załadowanie wszystkich tabel"""
+        for table, replica in self.tables.items():
+            changes = replica.load()
+            logger.info(f"[Replica] Loaded {len(replica.rows)} rows from {table}")
+            self._notify(table, changes)
+        self.ready = True
+
+    def restore(self, state: Dict[str, bytes]):
+        """Przywraca tabele zapisane przez export() (ciepły start) i oznacza replikę jako gotową"""
+        for table, replica in self.tables.items():
+            if table not in state:
+                continue
+            changes = replica.restore(*pickle.loads(state[table]))
+            logger.info(f"[Replica] Restored {len(replica.rows)} rows of {table}")
+            self._notify(table, changes)
+        self.ready = all(table in state for table in self.tables)
+
+    def export(self) -> Dict[str, bytes]:
+        """Stan wszystkich tabel (wiersze + znacznik, zserializowane)"""
+        return {table: replica.export() for table, replica in self.tables.items()}
+
+    def refresh(self, check_deletes: Optional[bool] = None) -> int:
+        """Synchronizacja przyrostowa; zwraca liczbę zastosowanych zmian (zob. TableReplica.refresh)"""
+        total = 0
+        for table, replica in self.tables.items():
+            changes = replica.refresh(check_deletes)
+            if changes:
+                logger.info(f"[Replica] {table}: applied {len(changes)} changes")
+                self._notify(table, changes)
+            total += len(changes)
+        return total
+
+    def snapshot(self, table: str) -> Optional[Tuple[List[Dict], str]]:
+        """Wiersze i wersja tabeli; None, gdy tabela nie jest replikowana lub replika niegotowa"""
+        if not self.ready or table not in self.tables:
+            return None
+        return self.tables[table].snapshot()
+
+    def _notify(self, table: str, changes):
+        for listener in self._listeners:
+            try:
+                listener(table, changes)
+            except Exception as e:
+                logger.error(f"[Replica] Listener failed for {table}: {e}")
+
+
+_replica: Optional[Replica] = None
+
+
+def get_replica() -> Replica:
+    """Get or create the process-wide replica"""
+    global _replica
+    if _replica is None:
+        _replica = Replica()
+    return _replica
+
+
+def active_replica() -> Optional[Replica]:
+    """Replika, jeśli została utworzona i załadowana"""
+    return _replica if _replica is not None and _replica.ready else None
@@ -0,0 +1,472 @@
+"""
+Pełnotekstowy indeks odwrócony dla procesów legislacyjnych i druków
+
+Indeksowane pola:
+- procesy: title, description, extended_data.simpleSummary / summary
+- druki: title
+
+Normalizacja: małe litery, usunięcie diakrytyków (ł -> l), prosty stemming
+przez obcięcie najczęstszych polskich końcówek fleksyjnych ("ustawy",
+"ustawie", "ustawach" -> "ustaw").
+
+Ranking BM25; zapytanie to słowa (wszystkie wymagane), frazy w cudzysłowie
+("kodeks karny") i prefiksy (konstytuc*).
+
+Przechowywanie:
+- segment bazowy budowany hurtowo i zapisywany na dysk (ARTIFACTS_DIR/search)
+  jako tablice .npy czytane przez mmap: słownik termów -> zakres postingów,
+  postingi (dokument, tf), pozycje (do fraz), długości dokumentów,
+- zmiany (nowe/zmienione/usunięte dokumenty) trafiają do małej delty
+  w pamięci + nagrobków w segmencie; gdy delta urośnie, segment jest
+  przebudowywany.
+"""
+
+import bisect
+import fcntl
+import json
+import logging
+import math
+import re
+import shutil
+import threading
+import time
+import unicodedata
+import uuid
+from array import array
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config import ARTIFACTS_DIR
+from src.feature_store import row_stamp
+from src.pipeline import artifact, run_analysis
+
+logger = logging.getLogger(__name__)
+
+# Parametry BM25
+K1 = 1.2
+B = 0.75
+
+# Luka pozycji między polami dokumentu (frazy nie łączą tytułu z opisem)
+FIELD_GAP = 16
+
+# Maksymalna liczba termów, na które rozwija się prefiks
+MAX_PREFIX_TERMS = 64
+
+# Delta większa niż max(MIN_REBUILD_DOCS, REBUILD_RATIO * segment) => przebudowa segmentu
+REBUILD_RATIO = 0.1
+MIN_REBUILD_DOCS = 1000
+
+KINDS = ("process", "print")
+
+# Kodowanie (dokument, pozycja) w jednej liczbie przy dopasowaniu fraz
+POSITION_STRIDE = 1 << 24
+
+# Końcówki fleksyjne (po usunięciu diakrytyków), najdłuższe najpierw
+SUFFIXES = sorted({
+    "owaniami", "owaniach", "owaniem", "owania", "owanie", "owaniu",
+    "osciami", "osciach", "oscia", "osci", "osc",
+    "iami", "iach", "ami", "ach", "ymi", "imi", "ego", "emu", "owi", "ow", "om",
+    "ej", "ych", "ich", "iem", "em", "ie", "ia", "ii", "iu", "ym", "im",
+    "a", "e", "i", "o", "u", "y",
+}, key=len, reverse=True)
+
+MIN_STEM = 3
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_PHRASE = re.compile(r'"([^"]*)"')
+
+Document = Tuple[str, str, str, Sequence[Optional[str]]]  # (klucz, tytuł, odcisk, pola)
+
+
+def fold(text: str) -> str:
+    """Małe litery bez diakrytyków: "Ustawa o Łowiectwie" -> "ustawa o lowiectwie\""""
+    folded = unicodedata.normalize("NFKD", text.lower().replace("ł", "l"))
+    return "".join(ch for ch in folded if not unicodedata.combining(ch))
+
+
+def stem(token: str) -> str:
+    """Obcina najdłuższą pasującą końcówkę, zostawiając co najmniej MIN_STEM znaków"""
+    if token.isdigit():
+        return token
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Termy tekstu po normalizacji i stemmingu"""
+    return [stem(token) for token in _TOKEN.findall(fold(text or ""))]
+
+
+def _index_fields(fields: Sequence[Optional[str]]) -> Tuple[Dict[str, List[int]], int]:
+    """Term -> pozycje w dokumencie oraz długość dokumentu (liczba termów)"""
+    positions = defaultdict(list)
+    position = length = 0
+    for text in fields:
+        for term in tokenize(text):
+            positions[term].append(position)
+            position += 1
+            length += 1
+        position += FIELD_GAP
+    return positions, length
+
+
+def process_document(row: Dict) -> Document:
+    extended = row.get("extended_data") or {}
+    fields = (row.get("title"), row.get("description"), extended.get("simpleSummary"), extended.get("summary"))
+    return f"process:{row['id']}", row.get("title") or "", row_stamp(row), fields
+
+
+def print_document(row: Dict) -> Document:
+    return f"print:{row['id']}", row.get("title") or "", row_stamp(row), (row.get("title"),)
+
+
+class Segment:
+    """Segment bazowy na dysku (tablice .npy mapowane w pamięci)"""
+
+    ARRAYS = ("term_offsets", "post_docs", "post_tf", "pos_offsets", "positions", "doc_len")
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.terms: List[str] = meta["terms"]
+        self.keys: List[str] = meta["keys"]
+        self.titles: List[str] = meta["titles"]
+        self.stamps: List[str] = meta["stamps"]
+        for name in self.ARRAYS:
+            setattr(self, name, np.load(path / f"{name}.npy", mmap_mode="r"))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def term_range(self, term: str) -> Optional[Tuple[int, int]]:
+        i = bisect.bisect_left(self.terms, term)
+        if i < len(self.terms) and self.terms[i] == term:
+            return int(self.term_offsets[i]), int(self.term_offsets[i + 1])
+        return None
+
+    def prefix_terms(self, prefix: str, limit: int) -> List[str]:
+        i = bisect.bisect_left(self.terms, prefix)
+        found = []
+        while i < len(self.terms) and self.terms[i].startswith(prefix) and len(found) < limit:
+            found.append(self.terms[i])
+            i += 1
+        return found
+
+    @staticmethod
+    def write(path: Path, documents: Sequence[Document]):
+        """Hurtowa budowa segmentu z listy dokumentów"""
+        postings: Dict[str, Tuple[array, array, array]] = {}
+        lengths = array("i")
+
+        for doc, (_, _, _, fields) in enumerate(documents):
+            positions, length = _index_fields(fields)
+            lengths.append(length)
+            for term, term_positions in positions.items():
+                entry = postings.get(term)
+                if entry is None:
+                    entry = postings[term] = (array("i"), array("i"), array("i"))
+                entry[0].append(doc)
+                entry[1].append(len(term_positions))
+                entry[2].extend(term_positions)
+
+        terms = sorted(postings)
+        term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        for i, term in enumerate(terms):
+            term_offsets[i + 1] = term_offsets[i] + len(postings[term][0])
+
+        def concat(part: int) -> np.ndarray:
+            return np.concatenate([np.frombuffer(postings[t][part], dtype=np.int32) for t in terms]) \
+                if terms else np.zeros(0, dtype=np.int32)
+
+        post_docs, post_tf, positions = concat(0), concat(1), concat(2)
+        pos_offsets = np.concatenate([[0], np.cumsum(post_tf, dtype=np.int64)])
+
+        path.mkdir(parents=True)
+        arrays = {
+            "term_offsets": term_offsets,
+            "post_docs": post_docs,
+            "post_tf": post_tf,
+            "pos_offsets": pos_offsets,
+            "positions": positions,
+            "doc_len": np.frombuffer(lengths, dtype=np.int32) if lengths else np.zeros(0, dtype=np.int32),
+        }
+        for name, values in arrays.items():
+            np.save(path / f"{name}.npy", values)
+        with open(path / "meta.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "terms": terms,
+                "keys": [d[0] for d in documents],
+                "titles": [d[1] for d in documents],
+                "stamps": [d[2] for d in documents],
+            }, f, ensure_ascii=False)
+
+
+class SearchIndex:
+    """
+    Segment bazowy + delta w pamięci
+
+    Dokumenty numerowane są globalnie: najpierw segment, potem delta.
+    Zmieniony dokument dostaje nowy numer, a stary staje się nagrobkiem.
+    """
+
+    def __init__(self, segment: Segment):
+        self.segment = segment
+        base = len(segment)
+        self.keys: List[str] = list(segment.keys)
+        self.titles: List[str] = list(segment.titles)
+        self.doc_of: Dict[str, int] = {key: doc for doc, key in enumerate(self.keys)}
+        self.stamps: Dict[str, str] = dict(zip(segment.keys, segment.stamps))
+        self.delta: Dict[str, Dict[int, List[int]]] = defaultdict(dict)
+        self.delta_docs = 0
+        self.alive = np.ones(base, dtype=bool)
+        self.lengths = np.asarray(segment.doc_len, dtype=np.float32)
+        self.kinds = np.array([KINDS.index(key.split(":", 1)[0]) for key in self.keys], dtype=np.int8)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.doc_of)
+
+    def apply(self, changed: Sequence[Document], deleted: Iterable[str]):
+        """Nakłada zmiany na deltę (stare wersje dokumentów -> nagrobki)"""
+        with self._lock:
+            alive = self.alive.copy()
+            for key in list(deleted) + [d[0] for d in changed]:
+                doc = self.doc_of.pop(key, None)
+                self.stamps.pop(key, None)
+                if doc is not None:
+                    alive[doc] = False
+
+            lengths, kinds = [], []
+            for key, title, stamp, fields in changed:
+                doc = len(self.keys)
+                positions, length = _index_fields(fields)
+                for term, term_positions in positions.items():
+                    self.delta[term][doc] = term_positions
+                self.keys.append(key)
+                self.titles.append(title)
+                self.doc_of[key] = doc
+                self.stamps[key] = stamp
+                lengths.append(length)
+                kinds.append(KINDS.index(key.split(":", 1)[0]))
+                self.delta_docs += 1
+
+            self.alive = np.concatenate([alive, np.ones(len(changed), dtype=bool)])
+            self.lengths = np.concatenate([self.lengths, np.array(lengths, dtype=np.float32)])
+            self.kinds = np.concatenate([self.kinds, np.array(kinds, dtype=np.int8)])
+
+    def _postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Dokumenty i tf termu (segment + delta)"""
+        docs, tfs = [], []
+        span = self.segment.term_range(term)
+        if span is not None:
+            lo, hi = span
+            docs.append(np.asarray(self.segment.post_docs[lo:hi]))
+            tfs.append(np.asarray(self.segment.post_tf[lo:hi]))
+        entry = self.delta.get(term)
+        if entry:
+            docs.append(np.fromiter(entry.keys(), dtype=np.int32, count=len(entry)))
+            tfs.append(np.fromiter((len(p) for p in entry.values()), dtype=np.int32, count=len(entry)))
+        if not docs:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+        return np.concatenate(docs), np.concatenate(tfs)
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        terms = set(self.segment.prefix_terms(prefix, MAX_PREFIX_TERMS))
+        terms.update(t for t in self.delta if t.startswith(prefix))
+        return sorted(terms)[:MAX_PREFIX_TERMS]
+
+    def _occurrences(self, term: str) -> np.ndarray:
+        """Wystąpienia termu zakodowane jako dokument * POSITION_STRIDE + pozycja"""
+        parts = []
+        span = self.segment.term_range(term)
+        if span is not None:
+            lo, hi = span
+            docs = np.repeat(np.asarray(self.segment.post_docs[lo:hi], dtype=np.int64), self.segment.post_tf[lo:hi])
+            positions = np.asarray(self.segment.positions[self.segment.pos_offsets[lo]:self.segment.pos_offsets[hi]])
+            parts.append(docs * POSITION_STRIDE + positions)
+        for doc, positions in self.delta.get(term, {}).items():
+            parts.append(doc * POSITION_STRIDE + np.asarray(positions, dtype=np.int64))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def _phrase_docs(self, phrase: List[str]) -> np.ndarray:
+        """Dokumenty, w których termy frazy występują na kolejnych pozycjach"""
+        starts = self._occurrences(phrase[0])
+        for i, term in enumerate(phrase[1:], 1):
+            starts = np.intersect1d(starts, self._occurrences(term) - i, assume_unique=True)
+            if not len(starts):
+                break
+        return np.unique(starts // POSITION_STRIDE)
+
+    def search(self, query: str, kind: Optional[str] = None, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """
+        Wyszukiwanie z rankingiem BM25
+
+        Raises:
+            ValueError: nieznany rodzaj dokumentu
+        """
+        started = time.perf_counter()
+        if kind is not None and kind not in KINDS:
+            raise ValueError(f"Unknown kind: {kind}")
+
+        phrases = [tokenize(p) for p in _PHRASE.findall(query)]
+        phrases = [p for p in phrases if p]
+        groups: List[List[str]] = []
+        for raw in _PHRASE.sub(" ", query).split():
+            tokens = _TOKEN.findall(fold(raw))
+            for i, token in enumerate(tokens):
+                if raw.endswith("*") and i == len(tokens) - 1:
+                    groups.append(self._expand_prefix(stem(token)) or [stem(token)])
+                else:
+                    groups.append([stem(token)])
+        groups += [[term] for phrase in phrases for term in phrase]
+
+        with self._lock:
+            live = int(self.alive.sum())
+            if not groups or not live:
+                return {"query": query, "total": 0, "results": [], "took_ms": 0.0}
+
+            avgdl = float(self.lengths[self.alive].mean()) or 1.0
+            scores = np.zeros(len(self.keys), dtype=np.float64)
+            matched = self.alive.copy()
+            if kind is not None:
+                matched &= self.kinds == KINDS.index(kind)
+
+            for group in groups:
+                hit = np.zeros(len(self.keys), dtype=bool)
+                for term in dict.fromkeys(group):
+                    docs, tf = self._postings(term)
+                    keep = self.alive[docs]
+                    docs, tf = docs[keep], tf[keep].astype(np.float64)
+                    if not len(docs):
+                        continue
+                    idf = math.log(1 + (live - len(docs) + 0.5) / (len(docs) + 0.5))
+                    norm = K1 * (1 - B + B * self.lengths[docs] / avgdl)
+                    scores[docs] += idf * tf * (K1 + 1) / (tf + norm)
+                    hit[docs] = True
+                matched &= hit
+
+            candidates = np.nonzero(matched)[0]
+            if phrases:
+                for phrase in phrases:
+                    candidates = candidates[np.isin(candidates, self._phrase_docs(phrase))]
+
+            order = candidates[np.argsort(-scores[candidates], kind="stable")][offset:offset + limit]
+            results = []
+            for doc in order:
+                doc_kind, doc_id = self.keys[doc].split(":", 1)
+                results.append({
+                    "kind": doc_kind,
+                    "id": doc_id,
+                    "title": self.titles[doc],
+                    "score": round(float(scores[doc]), 3),
+                })
+
+        return {
+            "query": query,
+            "total": int(len(candidates)),
+            "results": results,
+            "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+
+_index: Optional[SearchIndex] = None
+_lock = threading.Lock()
+
+
+def _search_dir() -> Path:
+    return Path(ARTIFACTS_DIR) / "search"
+
+
+def _load() -> Optional[SearchIndex]:
+    """Segment wskazany przez search/CURRENT (jeśli jest)"""
+    current = _search_dir() / "CURRENT"
+    if not current.exists():
+        return None
+    try:
+        segment = Segment(_search_dir() / current.read_text().strip())
+        logger.info(f"[Search] Loaded segment with {len(segment)} documents")
+        return SearchIndex(segment)
+    except Exception as e:
+        logger.warning(f"[Search] Ignoring unreadable segment: {e}")
+        return None
+
+
+def _build(documents: Sequence[Document]) -> SearchIndex:
+    """
+    Buduje nowy segment, przełącza CURRENT (atomowo) i usuwa stare segmenty
+
+    Całość pod blokadą plikową search/.lock: workery uvicorna budujące
+    indeks jednocześnie nie usuwają sobie nawzajem segmentów.
+    """
+    root = _search_dir()
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        name = f"segment-{uuid.uuid4().hex[:12]}"
+        tmp = root / f"{name}.tmp"
+        Segment.write(tmp, documents)
+        tmp.rename(root / name)
+
+        pointer = root / "CURRENT.tmp"
+        pointer.write_text(name)
+        pointer.replace(root / "CURRENT")
+
+        # Tylko gotowe segmenty inne niż CURRENT; otwarte mmapy starych
+        # segmentów pozostają ważne do zamknięcia (Linux)
+        for old in root.glob("segment-*"):
+            if old.name != name and old.suffix != ".tmp":
+                shutil.rmtree(old, ignore_errors=True)
+
+    return SearchIndex(Segment(root / name))
+
+
+def refresh(processes: Sequence[Dict], prints: Sequence[Dict]) -> SearchIndex:
+    """
+    Aktualizuje indeks do bieżących wierszy (pamięć -> dysk -> budowa hurtowa)
+
+    Dokumenty porównywane są po odcisku wersji (updated_at lub hash treści);
+    duża liczba zmian kończy się przebudową segmentu zamiast delty.
+    """
+    global _index
+    with _lock:
+        index = _index or _load()
+
+        rows = [(process_document, row) for row in processes] + [(print_document, row) for row in prints]
+        seen = set()
+        changed: List[Document] = []
+        for make, row in rows:
+            key = f"{'process' if make is process_document else 'print'}:{row['id']}"
+            seen.add(key)
+            if index is None or index.stamps.get(key) != row_stamp(row):
+                changed.append(make(row))
+        deleted = [key for key in index.stamps if key not in seen] if index is not None else []
+
+        threshold = max(MIN_REBUILD_DOCS, REBUILD_RATIO * len(index.segment)) if index is not None else 0
+        if index is None or index.delta_docs + len(changed) + len(deleted) > threshold:
+            index = _build([make(row) for make, row in rows])
+            print(f"[Search] Built segment with {len(index)} documents")
+        elif changed or deleted:
+            index.apply(changed, deleted)
+            print(f"[Search] Applied {len(changed)} updates, {len(deleted)} deletions")
+
+        _index = index
+        return index
+
+
+@artifact("search_index", deps=["processes", "prints"])
+def build_search_index(processes: List[Dict], prints: List[Dict]) -> SearchIndex:
+    """
+    Indeks pełnotekstowy dla bieżącej wersji danych (przyrostowo względem poprzedniej)
+    """
+    return refresh(processes, prints)
+
+
+def get_search_index() -> SearchIndex:
+    """Indeks dla bieżącej wersji danych (z pamięci, dysku lub budowany)"""
+    return run_analysis("search_index")
@@ -0,0 +1,241 @@
+"""
+Kompaktowy magazyn procesów legislacyjnych w pamięci (struct-of-arrays)
+
+Zamiast setek tysięcy słowników z pełnym JSON-em:
+- kolumny kategoryczne (project_type, urgency, document_type, ...) to kody
+  w array('i') + słownik wartości,
+- pozostałe stringi są internowane, a listy stringów (np. categories)
+  deduplikowane jako współdzielone krotki,
+- zagnieżdżony JSON (timeline, extended_data) trzymany jest jako zwarte
+  bajty UTF-8 i dekodowany dopiero, gdy analizator po niego sięgnie.
+
+Rekordy udostępniane są jako widoki `ProcessRecord` (Mapping), więc kod
+w stylu `proc.get("timeline", [])` działa bez zmian.
+
+Sloty są tylko dopisywane: aktualizacja dopisuje nowy slot, a stary
+oznacza jako martwy. Dzięki temu migawka (`snapshot()`) pozostaje spójna,
+nawet gdy replika w tle nakłada kolejne zmiany. `compacted()` buduje
+nowy magazyn bez martwych slotów.
+"""
+
+import json
+import sys
+from array import array
+from collections.abc import Mapping, MutableMapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List
+
+CATEGORICAL_FIELDS = (
+    "project_type",
+    "urgency",
+    "document_type",
+    "current_stage",
+    "term_number",
+)
+
+LAZY_JSON_FIELDS = ("timeline", "extended_data")
+
+# Próg martwych slotów, powyżej którego warto zrobić compacted()
+COMPACT_RATIO = 0.5
+
+_MISSING = object()
+
+
+class _Categorical:
+    """Kolumna słownikowa: kody int32 + lista unikalnych wartości (-1 = brak klucza)"""
+
+    def __init__(self):
+        self.codes = array("i")
+        self.values: List[Any] = []
+        self.index: Dict[Any, int] = {}
+
+    def append(self, value: Any):
+        if value is _MISSING:
+            self.codes.append(-1)
+            return
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def get(self, slot: int) -> Any:
+        code = self.codes[slot]
+        return _MISSING if code < 0 else self.values[code]
+
+
+class _LazyJson:
+    """Kolumna JSON: zwarte bajty UTF-8, dekodowane przy odczycie"""
+
+    def __init__(self):
+        self.blobs: List[Any] = []
+
+    def append(self, value: Any):
+        if value is _MISSING or value is None:
+            self.blobs.append(value)
+        else:
+            self.blobs.append(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode())
+
+    def get(self, slot: int) -> Any:
+        blob = self.blobs[slot]
+        return json.loads(blob) if isinstance(blob, bytes) else blob
+
+
+class _Plain:
+    """
+    Zwykła kolumna: internowane stringi, listy stringów jako współdzielone krotki
+
+    Krotki oddawane są jako świeże listy, by rekord porównywał się
+    z wierszem z bazy (ważne dla wykrywania zmian w replice).
+    """
+
+    def __init__(self, shared: Dict[tuple, tuple]):
+        self.values: List[Any] = []
+        self._shared = shared
+
+    def append(self, value: Any):
+        if isinstance(value, str):
+            value = sys.intern(value)
+        elif isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value):
+            key = tuple(sys.intern(item) for item in value)
+            value = self._shared.setdefault(key, key)
+        self.values.append(value)
+
+    def get(self, slot: int) -> Any:
+        value = self.values[slot]
+        return list(value) if isinstance(value, tuple) else value
+
+
+class ProcessRecord(Mapping):
+    """Widok jednego procesu (tylko do odczytu)"""
+
+    __slots__ = ("_store", "_slot")
+
+    def __init__(self, store: "ProcessStore", slot: int):
+        self._store = store
+        self._slot = slot
+
+    def __getitem__(self, key: str) -> Any:
+        column = self._store._columns.get(key)
+        value = column.get(self._slot) if column is not None else _MISSING
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        slot = self._slot
+        return (key for key, column in self._store._columns.items() if column.get(slot) is not _MISSING)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"ProcessRecord(id={self.get('id')!r})"
+
+
+class ProcessList(Sequence):
+    """Migawka procesów: tablica slotów, rekordy tworzone przy dostępie"""
+
+    def __init__(self, store: "ProcessStore", slots: array):
+        self._store = store
+        self._slots = slots
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ProcessList(self._store, self._slots[index])
+        return ProcessRecord(self._store, self._slots[index])
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+
+class ProcessStore(MutableMapping):
+    """
+    Magazyn procesów indeksowany po id
+
+    Interfejs słownika id -> rekord, dzięki czemu może zastąpić zwykły
+    dict w replice (src.replica).
+    """
+
+    def __init__(self):
+        self._columns: Dict[str, Any] = {}
+        self._shared: Dict[tuple, tuple] = {}
+        self._slot_of: Dict[Any, int] = {}
+        self._size = 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict]) -> "ProcessStore":
+        store = cls()
+        for row in rows:
+            store[row["id"]] = row
+        return store
+
+    def _column(self, key: str):
+        column = self._columns.get(key)
+        if column is None:
+            if key in CATEGORICAL_FIELDS:
+                column = _Categorical()
+            elif key in LAZY_JSON_FIELDS:
+                column = _LazyJson()
+            else:
+                column = _Plain(self._shared)
+            for _ in range(self._size):
+                column.append(_MISSING)
+            self._columns[key] = column
+        return column
+
+    def _append(self, row: Dict) -> int:
+        for key in row:
+            self._column(key)
+        for key, column in self._columns.items():
+            column.append(row.get(key, _MISSING))
+        self._size += 1
+        return self._size - 1
+
+    def __getitem__(self, process_id) -> ProcessRecord:
+        return ProcessRecord(self, self._slot_of[process_id])
+
+    def __setitem__(self, process_id, row: Dict):
+        # Nowy slot zamiast nadpisania: starsze migawki widzą poprzednią wersję
+        self._slot_of[process_id] = self._append(row)
+
+    def __delitem__(self, process_id):
+        del self._slot_of[process_id]
+
+    def __contains__(self, process_id) -> bool:
+        return process_id in self._slot_of
+
+    def __iter__(self) -> Iterator:
+        return iter(self._slot_of)
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    @property
+    def dead_ratio(self) -> float:
+        """Udział martwych slotów (nadpisanych lub usuniętych)"""
+        return 1 - len(self._slot_of) / self._size if self._size else 0.0
+
+    def snapshot(self) -> ProcessList:
+        """Żywe rekordy w kolejności dopisania"""
+        return ProcessList(self, array("q", sorted(self._slot_of.values())))
+
+    def compacted(self) -> "ProcessStore":
+        """Nowy magazyn bez martwych slotów (bez dekodowania JSON-a)"""
+        store = ProcessStore()
+        for key, column in self._columns.items():
+            store._columns[key] = type(column)() if not isinstance(column, _Plain) else _Plain(store._shared)
+
+        for process_id, slot in sorted(self._slot_of.items(), key=lambda item: item[1]):
+            for key, column in self._columns.items():
+                target = store._columns[key]
+                if isinstance(column, _LazyJson):
+                    target.blobs.append(column.blobs[slot])
+                else:
+                    target.append(column.get(slot))
+            store._slot_of[process_id] = store._size
+            store._size += 1
+
+        return store
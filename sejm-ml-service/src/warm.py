@@ -0,0 +1,176 @@
+"""
+Szybki start serwisu: leniwe importy i ciepły stan zapisywany na dysk
+
+- `lazy()` odkłada import modułów analitycznych (pandas, numpy) do pierwszego
+  wywołania, więc import aplikacji nie płaci za ciężkie biblioteki.
+- `save()` zapisuje do WARM_STATE_DIR replikę tabel (ze znacznikami delty)
+  i zapamiętane wyniki/artefakty pipeline'u razem z kluczami wersji
+  i odciskami kodu węzłów (pipeline.code_version).
+- `restore()` przy starcie przywraca ten stan: replika od razu jest gotowa
+  i dociąga tylko deltę od znacznika, a wyniki z pasującym kluczem wersji
+  są serwowane z pamięci bez przeliczania. Wyniki węzłów, których kod
+  zmienił się od zapisu, są odrzucane bez deserializacji.
+
+Indeks wyszukiwania, magazyn cech i model przejść mają własne pliki na dysku
+(src.search, src.feature_store, persist=True), więc nie trafiają do stanu.
+"""
+
+import importlib
+import logging
+import os
+import pickle
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from src import pipeline
+from src.config import WARM_STATE_DIR
+from src.replica import Replica
+
+logger = logging.getLogger(__name__)
+
+# Zmiana formatu pliku stanu => stary plik jest ignorowany
+STATE_VERSION = 2
+
+# Artefakty dogrzewane po starcie obok wszystkich analiz
+PRECOMPUTE_TARGETS = ("votes_by_process", "search_index")
+
+status: Dict[str, Any] = {
+    "restored": False,
+    "saved_at": None,
+    "restored_tables": 0,
+    "restored_entries": 0,
+    "stale_entries": 0,
+    "restore_seconds": None,
+    "last_snapshot": None,
+}
+
+_last_signature = None
+
+
+def lazy(module: str, name: str) -> Callable[..., Any]:
+    """Funkcja `name` z modułu `module` importowanego dopiero przy pierwszym wywołaniu"""
+    target = None
+
+    def call(*args, **kwargs):
+        nonlocal target
+        if target is None:
+            target = getattr(importlib.import_module(module), name)
+        return target(*args, **kwargs)
+
+    call.__name__ = name
+    return call
+
+
+def _state_path() -> Path:
+    return Path(WARM_STATE_DIR) / "state.pkl"
+
+
+def _signature(replica: Optional[Replica], memo: Dict[str, Any]):
+    tables = tuple((t, r.version) for t, r in replica.tables.items()) if replica is not None else ()
+    return tables, tuple(sorted((name, key) for name, (key, _) in memo.items()))
+
+
+def save(replica: Optional[Replica]) -> bool:
+    """
+    Zapisuje stan (atomowo); pomija zapis, jeśli nic się nie zmieniło od poprzedniego
+
+    Wartości, których nie da się zserializować (np. obiekty z blokadami), są pomijane.
+    """
+    global _last_signature
+    replica = replica if replica is not None and replica.ready else None
+    memo = pipeline.export_memo()
+    signature = _signature(replica, memo)
+    if signature == _last_signature:
+        return False
+
+    started = time.perf_counter()
+    codes = pipeline.node_versions()
+    entries = {}
+    for name, (key, value) in memo.items():
+        try:
+            entries[name] = (key, codes.get(name), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            logger.debug(f"[Warm] Skipping {name}: {e}")
+
+    state = {
+        "version": STATE_VERSION,
+        "saved_at": datetime.now().isoformat(),
+        "tables": replica.export() if replica is not None else {},
+        "memo": entries,
+    }
+
+    path = _state_path()
+    tmp = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unikalna nazwa: każdy worker zapisuje stan niezależnie
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False) as f:
+            tmp = f.name
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"[Warm] Could not save state to {path}: {e}")
+        if tmp:
+            Path(tmp).unlink(missing_ok=True)
+        return False
+
+    _last_signature = signature
+    status["last_snapshot"] = state["saved_at"]
+    logger.info(
+        f"[Warm] Saved {len(state['tables'])} tables and {len(entries)} results "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return True
+
+
+def restore(replica: Optional[Replica]) -> bool:
+    """Przywraca stan zapisany przez save(); False, gdy brak pliku lub jest nieczytelny"""
+    path = _state_path()
+    if not path.exists():
+        return False
+
+    started = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != STATE_VERSION:
+            logger.info(f"[Warm] Ignoring state version {state.get('version')}")
+            return False
+
+        if replica is not None and state["tables"]:
+            replica.restore(state["tables"])
+        codes = pipeline.node_versions()
+        memo = {
+            name: (key, pickle.loads(blob))
+            for name, (key, code, blob) in state["memo"].items()
+            if code is not None and code == codes.get(name)
+        }
+        pipeline.restore_memo(memo)
+    except Exception as e:
+        logger.warning(f"[Warm] Ignoring unreadable state {path}: {e}")
+        return False
+
+    status.update({
+        "restored": True,
+        "saved_at": state["saved_at"],
+        "restored_tables": len(state["tables"]) if replica is not None else 0,
+        "restored_entries": len(memo),
+        "stale_entries": len(state["memo"]) - len(memo),
+        "restore_seconds": round(time.perf_counter() - started, 3),
+    })
+    logger.info(
+        f"[Warm] Restored state from {state['saved_at']} "
+        f"({status['restored_entries']} results, {status['stale_entries']} stale) in {status['restore_seconds']}s"
+    )
+    return True
+
+
+def precompute():
+    """Dolicza wszystkie analizy i artefakty zapytań (po przywróceniu zwykle same trafienia w pamięć)"""
+    started = time.perf_counter()
+    run = pipeline.Run()
+    run.execute(pipeline.list_analyses() + list(PRECOMPUTE_TARGETS))
+    logger.info(f"[Warm] Precomputed in {time.perf_counter() - started:.2f}s ({len(run.errors)} errors)")
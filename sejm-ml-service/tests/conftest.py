@@ -0,0 +1,22 @@
+"""
+Wspólna konfiguracja testów
+
+Zmienne środowiska ustawiane są przed importem src.config (moduły czytają
+je przy imporcie): osobny, tymczasowy ML_DATA_DIR, bez repliki i bez
+zapisu ciepłego stanu. Dane dostępowe Supabase nie są potrzebne - testy
+podają tabele źródłowe bezpośrednio.
+"""
+
+import os
+import shutil
+import tempfile
+
+os.environ["ML_DATA_DIR"] = tempfile.mkdtemp(prefix="sejm-ml-tests-")
+os.environ.setdefault("SUPABASE_URL", "http://tests.invalid")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "tests")
+os.environ["REPLICA_ENABLED"] = "false"
+os.environ["WARM_STATE_ENABLED"] = "false"
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(os.environ["ML_DATA_DIR"], ignore_errors=True)
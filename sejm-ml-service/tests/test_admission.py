@@ -0,0 +1,80 @@
+"""Testy scalania identycznych żądań i kontroli dopuszczenia"""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import main
+from src.admission import AdmissionController, Saturated, parse_limits
+
+
+def test_identical_requests_share_one_computation():
+    calls = []
+    release = threading.Event()
+
+    def compute(year):
+        calls.append(year)
+        release.wait(5)
+        return {"year": year}
+
+    async def scenario():
+        controller = AdmissionController(limits={}, default=(1, 0))
+        pending = [asyncio.create_task(controller.run("dynamics", compute, year=2024)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*pending)
+
+    results = asyncio.run(scenario())
+    assert calls == [2024]
+    assert results == [{"year": 2024}] * 5
+
+
+def test_different_params_are_separate_computations():
+    calls = []
+
+    async def scenario():
+        controller = AdmissionController(limits={}, default=(2, 2))
+        return await asyncio.gather(
+            controller.run("dynamics", lambda x: calls.append(x), x=1),
+            controller.run("dynamics", lambda x: calls.append(x), x=2),
+        )
+
+    asyncio.run(scenario())
+    assert sorted(calls) == [1, 2]
+
+
+def test_saturated_when_queue_full():
+    release = threading.Event()
+
+    async def scenario():
+        controller = AdmissionController(limits=parse_limits("dynamics:1:1"), default=(4, 4))
+        first = asyncio.create_task(controller.run("dynamics", release.wait, timeout=5))
+        second = asyncio.create_task(controller.run("dynamics", release.wait, timeout=6))
+        await asyncio.sleep(0.05)
+        try:
+            with pytest.raises(Saturated) as info:
+                await controller.run("dynamics", release.wait, timeout=7)
+            # Inne analizy mają własne limity
+            assert await controller.run("other", lambda: "ok") == "ok"
+        finally:
+            release.set()
+            await asyncio.gather(first, second)
+        assert controller.stats()["dynamics"]["admitted"] == 0
+        return info.value
+
+    exc = asyncio.run(scenario())
+    assert exc.name == "dynamics"
+    assert exc.retry_after >= 1
+
+
+def test_saturated_is_503_with_retry_after(monkeypatch):
+    async def saturated(name, fn, **params):
+        raise Saturated(name, 7)
+
+    monkeypatch.setattr(main.admission, "run", saturated)
+    response = TestClient(main.app).get("/flow/funnel", params={"stages": "Senat"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+    assert response.json()["success"] is False
@@ -0,0 +1,36 @@
+"""Testy endpointów HTTP (bez startu aplikacji: replika i ciepły stan nieużywane)"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import main
+
+MODEL = {"stages": ["i_czytanie", "senat"]}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "get_stage_transition_model", lambda: MODEL)
+    return TestClient(main.app)
+
+
+def test_funnel_unknown_stage_is_404(client):
+    response = client.get("/flow/funnel", params={"stages": "I czytanie,Prezydent"})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Unknown stage: Prezydent"
+
+
+def test_funnel_internal_key_error_is_500(client, monkeypatch):
+    def broken(model, stages, project_type, urgency):
+        raise KeyError("segment")
+
+    monkeypatch.setattr(main, "funnel", broken)
+    response = client.get("/flow/funnel", params={"stages": "I czytanie,Senat"})
+    assert response.status_code == 500
+
+
+def test_funnel_known_stages(client, monkeypatch):
+    monkeypatch.setattr(main, "funnel", lambda model, stages, project_type, urgency: {"steps": stages})
+    response = client.get("/flow/funnel", params={"stages": "I czytanie, Senat"})
+    assert response.status_code == 200
+    assert response.json()["data"] == {"steps": ["I czytanie", "Senat"]}
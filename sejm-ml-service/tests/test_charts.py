@@ -0,0 +1,23 @@
+"""Testy puli renderującej wykresy"""
+
+import time
+
+from src import charts
+
+
+def test_shutdown_terminates_busy_workers():
+    charts.start()
+    try:
+        busy = charts._get_pool().submit(time.sleep, 60)
+        while not busy.running():
+            time.sleep(0.05)
+        workers = list(charts._pool._processes.values())
+        assert workers
+    finally:
+        started = time.perf_counter()
+        charts.shutdown()
+
+    # Renderowanie w toku nie przeżywa serwera (ani nie blokuje zamknięcia)
+    assert time.perf_counter() - started < 10
+    assert not any(process.is_alive() for process in workers)
+    assert charts._pool is None
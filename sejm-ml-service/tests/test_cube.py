@@ -0,0 +1,115 @@
+"""Testy kostki agregatów: stan po zmianach przyrostowych = pełna przebudowa"""
+
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from loadtest.fixture import generate
+from src import main
+from src.cube import FACTS, CubeSet
+
+QUERIES = [
+    ("processes", []),
+    ("processes", ["project_type", "urgency"]),
+    ("processes", ["month"]),
+    ("processes", ["category"]),
+    ("processes", ["term", "category", "document_type"]),
+    ("votings", []),
+    ("votings", ["sitting"]),
+    ("votings", ["term", "month"]),
+]
+
+
+def _rebuild(processes, votings) -> CubeSet:
+    cubes = CubeSet()
+    cubes.on_change("legislative_processes", [(None, row) for row in processes])
+    cubes.on_change("votings", [(None, row) for row in votings])
+    return cubes
+
+
+def _assert_same(actual: CubeSet, expected: CubeSet):
+    for fact, group_by in QUERIES:
+        got = actual.query(fact, group_by=group_by)
+        want = expected.query(fact, group_by=group_by)
+        assert got["cells"] == want["cells"], (fact, group_by)
+        assert len(got["rows"]) == len(want["rows"]), (fact, group_by)
+        for got_row, want_row in zip(got["rows"], want["rows"]):
+            assert got_row == pytest.approx(want_row), (fact, group_by)
+
+
+def test_incremental_updates_equal_full_rebuild():
+    data = generate(150, seed=3)
+    processes = {row["id"]: row for row in data["processes"]}
+    votings = {row["id"]: row for row in data["votings"]}
+    cubes = _rebuild(processes.values(), votings.values())
+
+    rng = random.Random(0)
+    process_changes, voting_changes = [], []
+    for pid in rng.sample(sorted(processes), 40):
+        old = processes[pid]
+        new = {**old,
+               "is_finished": not old["is_finished"],
+               "urgency": rng.choice(["normal", "pilny", None]),
+               "categories": rng.sample(["finanse", "zdrowie", "nowa"], rng.randint(0, 2)),
+               "timeline": old["timeline"][:1]}
+        processes[pid] = new
+        process_changes.append((old, new))
+    for pid in rng.sample(sorted(processes), 20):
+        process_changes.append((processes.pop(pid), None))
+    for vid in rng.sample(sorted(votings), 60):
+        old = votings[vid]
+        new = {**old, "yes_count": (old.get("yes_count") or 0) + 5, "sitting_number": 99}
+        votings[vid] = new
+        voting_changes.append((old, new))
+    for vid in rng.sample(sorted(votings), 30):
+        voting_changes.append((votings.pop(vid), None))
+
+    cubes.on_change("legislative_processes", process_changes)
+    cubes.on_change("votings", voting_changes)
+    cubes.on_change("prints", [(None, {"id": 1})])  # Tabela spoza kostki: ignorowana
+
+    _assert_same(cubes, _rebuild(processes.values(), votings.values()))
+
+
+def test_deleting_everything_leaves_no_cells():
+    data = generate(30, seed=5)
+    cubes = _rebuild(data["processes"], data["votings"])
+    cubes.on_change("legislative_processes", [(row, None) for row in data["processes"]])
+    cubes.on_change("votings", [(row, None) for row in data["votings"]])
+
+    for fact, cube in cubes.cubes.items():
+        assert cube.cells == {}
+        assert cube.multi_cells == {}
+    assert cubes.query("processes")["rows"] == []
+
+
+def test_category_cuboid_counts_each_category_once():
+    processes = [
+        {"id": "a", "term_number": 10, "categories": ["finanse", "zdrowie"]},
+        {"id": "b", "term_number": 10, "categories": ["finanse"]},
+    ]
+    cubes = _rebuild(processes, [])
+    assert cubes.query("processes")["rows"][0]["count"] == 2
+    by_category = {row["category"]: row["count"] for row in cubes.query("processes", group_by=["category"])["rows"]}
+    assert by_category == {"finanse": 2, "zdrowie": 1}
+
+
+def test_unknown_dimension_raises():
+    with pytest.raises(KeyError):
+        CubeSet().query("votings", group_by=["category"])
+    with pytest.raises(KeyError):
+        CubeSet().query("prints")
+    assert set(CubeSet().describe()) == set(FACTS)
+
+
+def test_cube_endpoint_bounds_limit(monkeypatch):
+    data = generate(30, seed=5)
+    monkeypatch.setattr(main, "get_cube", lambda: _rebuild(data["processes"], data["votings"]))
+    client = TestClient(main.app)
+
+    response = client.get("/cube", params={"group_by": "month", "limit": 2})
+    assert response.status_code == 200
+    assert len(response.json()["data"]["rows"]) == 2
+    assert client.get("/cube", params={"limit": 0}).status_code == 422
+    assert client.get("/cube", params={"limit": main.MAX_CUBE_ROWS + 1}).status_code == 422
@@ -0,0 +1,168 @@
+"""Testy trybu na żywo: agregaty posiedzeń, kopce top-k, walidacja partii i SSE"""
+
+import asyncio
+import json
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import main
+from src.analyzers.voting_patterns import calculate_voting_metrics
+from src.live import LiveFeed, Subscriber, validate_voting
+
+
+def _voting(number, yes, no, abstain=0, sitting=12, term=10, **extra):
+    return {"term_number": term, "sitting_number": sitting, "voting_number": number,
+            "yes_count": yes, "no_count": no, "abstain_count": abstain,
+            "not_participating": 460 - yes - no - abstain, "topic": f"Głosowanie {number}", **extra}
+
+
+def _events(message):
+    """Ramka SSE -> (zdarzenie, dane)"""
+    lines = dict(line.split(": ", 1) for line in message.strip().split("\n"))
+    return lines["event"], json.loads(lines["data"])
+
+
+def test_ingest_updates_aggregates_and_skips_duplicates():
+    feed = LiveFeed(top_k=3)
+    votings = [_voting(1, 300, 100), _voting(2, 100, 300), _voting(3, 0, 0)]
+
+    assert feed.ingest(votings) == 2  # Głosowanie bez oddanych głosów pominięte
+    assert feed.ingest(votings[:2]) == 0
+
+    snapshot = feed.snapshots()[0]
+    metrics = [calculate_voting_metrics(v) for v in votings[:2]]
+    assert snapshot["total_votings"] == 2
+    assert snapshot["pass_rate_pct"] == 50.0
+    assert snapshot["avg_turnout_pct"] == round(sum(m["turnout_pct"] for m in metrics) / 2, 1)
+    assert snapshot["last_voting"] == 2
+
+
+def test_correction_replaces_contribution():
+    feed = LiveFeed(top_k=3)
+    feed.ingest([_voting(1, 300, 100), _voting(2, 200, 200)])
+    assert feed.ingest([_voting(2, 100, 300)]) == 1
+
+    snapshot = feed.snapshots()[0]
+    assert snapshot["total_votings"] == 2
+    assert snapshot["pass_rate_pct"] == 50.0
+    assert snapshot["avg_yes_pct"] == 50.0
+    assert {row["voting_number"] for row in snapshot["closest_votes"]} == {1, 2}
+
+
+def test_top_k_heaps_match_full_sort():
+    rng = random.Random(7)
+    feed = LiveFeed(top_k=5)
+    votings = []
+    for number in range(1, 61):
+        yes = rng.randint(0, 400)
+        votings.append(_voting(number, yes, rng.randint(0, 400 - yes), rng.randint(0, 20)))
+    for start in range(0, len(votings), 7):
+        feed.ingest(votings[start:start + 7])
+    # Korekty przebudowują kopce
+    corrected = [_voting(number, 200, 199) for number in (3, 30)]
+    feed.ingest(corrected)
+
+    final = {v["voting_number"]: v for v in votings + corrected}
+    metrics = {number: calculate_voting_metrics(v) for number, v in final.items()}
+    expected_controversial = sorted(((m["controversy_score"], n) for n, m in metrics.items()), reverse=True)[:5]
+    expected_closest = sorted(((-m["margin_pct"], n) for n, m in metrics.items()), reverse=True)[:5]
+
+    snapshot = feed.snapshots()[0]
+    assert [r["voting_number"] for r in snapshot["most_controversial"]] == [n for _, n in expected_controversial]
+    assert [r["voting_number"] for r in snapshot["closest_votes"]] == [n for _, n in expected_closest]
+
+
+def test_validate_voting():
+    row = validate_voting({"term_number": "10", "sitting_number": 12, "voting_number": 3,
+                           "yes_count": "200", "no_count": None, "abstain_count": 5.0})
+    assert (row["term_number"], row["yes_count"], row["no_count"], row["abstain_count"]) == (10, 200, 0, 5)
+    assert row["not_participating"] == 0
+
+    for bad in ({"term_number": 10, "sitting_number": None, "voting_number": 1},
+                {**_voting(1, 10, 10), "yes_count": "dużo"},
+                {**_voting(1, 10, 10), "no_count": -1},
+                {**_voting(1, 10, 10), "abstain_count": 2.5},
+                [1, 2, 3]):
+        with pytest.raises(ValueError):
+            validate_voting(bad)
+
+
+def test_bad_row_rejects_whole_batch():
+    feed = LiveFeed(top_k=3)
+    subscriber = feed.subscribe()
+    batch = [_voting(1, 300, 100), _voting(2, 100, 300, sitting=13), {**_voting(3, 200, 100), "yes_count": None, "no_count": "x"}]
+
+    with pytest.raises(ValueError, match="Row 2"):
+        feed.ingest(batch)
+    assert feed.sittings == {}
+    assert feed.sequence == 0
+    assert subscriber.queue.empty()
+
+
+def test_ingest_endpoint_returns_422_without_partial_state(monkeypatch):
+    feed = LiveFeed(top_k=3)
+    monkeypatch.setattr(main, "LIVE_INGEST_TOKEN", "secret")
+    monkeypatch.setattr(main, "get_live_feed", lambda: feed)
+    client = TestClient(main.app)
+    headers = {"Authorization": "Bearer secret"}
+
+    bad = [_voting(1, 300, 100), {**_voting(2, 100, 300), "sitting_number": None}]
+    response = client.post("/live/votings", json=bad, headers=headers)
+    assert response.status_code == 422
+    assert feed.sittings == {}
+
+    response = client.post("/live/votings", json=[_voting(1, 300, 100)], headers=headers)
+    assert response.status_code == 200
+    assert response.json()["data"]["changed"] == 1
+    assert client.post("/live/votings", json=[], headers={"Authorization": "Bearer x"}).status_code == 401
+
+
+def test_slow_subscriber_drops_oldest():
+    subscriber = Subscriber(None, None, queue_size=2)
+    for message in ("a", "b", "c"):
+        subscriber.put(message)
+    assert subscriber.dropped == 1
+    assert [subscriber.queue.get_nowait() for _ in range(2)] == ["b", "c"]
+
+
+def test_stream_sends_snapshot_then_matching_votings(monkeypatch):
+    feed = LiveFeed(top_k=3)
+    feed.ingest([_voting(1, 300, 100)])
+    monkeypatch.setattr(main, "get_live_feed", lambda: feed)
+    monkeypatch.setattr(main, "LIVE_HEARTBEAT_SECONDS", 0.05)
+
+    class Request:
+        disconnected = False
+
+        async def is_disconnected(self):
+            return self.disconnected
+
+    async def scenario():
+        request = Request()
+        response = await main.live_stream(request, term=10, sitting=12)
+        stream = response.body_iterator
+
+        frames = [await stream.__anext__()]
+        feed.ingest([_voting(5, 10, 10, sitting=99)])  # Inne posiedzenie: poza filtrem
+        feed.ingest([_voting(2, 200, 190)])
+        frames.append(await stream.__anext__())
+        frames.append(await stream.__anext__())  # Brak zdarzeń: podtrzymanie
+
+        request.disconnected = True
+        rest = [frame async for frame in stream]
+        return frames, rest
+
+    frames, rest = asyncio.run(scenario())
+    event, data = _events(frames[0])
+    assert event == "snapshot" and data["total_votings"] == 1
+
+    event, data = _events(frames[1])
+    assert event == "voting"
+    assert data["voting"]["voting_number"] == 2
+    assert data["sitting"]["total_votings"] == 2
+
+    assert frames[2] == ": ping\n\n"
+    assert rest == []
+    assert feed.subscribers == set()
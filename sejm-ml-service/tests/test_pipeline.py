@@ -0,0 +1,135 @@
+"""Graf artefaktów (src.pipeline): memoizacja, klucze wersji, błędy zależności, eksport pamięci"""
+
+import pickle
+from collections import Counter
+
+import pytest
+
+from src import pipeline
+from src.pipeline import Run, analysis, artifact
+
+TEST_NODES = ("test_doubled", "test_total", "test_broken", "test_after_broken", "test_model")
+
+
+@pytest.fixture
+def calls():
+    counter = Counter()
+
+    @artifact("test_doubled", deps=["processes"])
+    def build_doubled(processes):
+        counter["test_doubled"] += 1
+        return [row["value"] * 2 for row in processes]
+
+    @analysis("test_total", deps=["test_doubled"])
+    def compute_total(test_doubled):
+        counter["test_total"] += 1
+        return {"total": sum(test_doubled)}
+
+    @artifact("test_broken", deps=["processes"])
+    def build_broken(processes):
+        raise ValueError("broken artifact")
+
+    @analysis("test_after_broken", deps=["test_broken"])
+    def compute_after_broken(test_broken):
+        counter["test_after_broken"] += 1
+        return {}
+
+    @artifact("test_model", deps=["processes"], persist=True)
+    def build_model(processes):
+        counter["test_model"] += 1
+        return {"rows": len(processes)}
+
+    pipeline.clear_memo()
+    yield counter
+    pipeline.clear_memo()
+    for name in TEST_NODES:
+        pipeline._nodes.pop(name, None)
+
+
+def rows(*values, stamp="2025-01-01T00:00:00+00:00"):
+    return [{"id": str(i), "value": value, "updated_at": stamp} for i, value in enumerate(values)]
+
+
+def test_memo_hit_for_same_data_version(calls):
+    first = Run(sources={"processes": rows(1, 2, 3)})
+    assert first.execute(["test_total"]) == {"test_total": {"total": 12}}
+
+    # Nowa lista o tej samej treści = ta sama wersja danych
+    second = Run(sources={"processes": rows(1, 2, 3)})
+    assert second.execute(["test_total"]) == {"test_total": {"total": 12}}
+    assert calls == {"test_doubled": 1, "test_total": 1}
+    assert first.keys["test_total"] == second.keys["test_total"]
+
+
+def test_memo_miss_when_data_changes(calls):
+    first = Run(sources={"processes": rows(1, 2, 3)})
+    first.execute(["test_total"])
+
+    second = Run(sources={"processes": rows(1, 2, 4, stamp="2025-02-01T00:00:00+00:00")})
+    assert second.execute(["test_total"]) == {"test_total": {"total": 14}}
+    assert calls == {"test_doubled": 2, "test_total": 2}
+    assert first.keys["test_doubled"] != second.keys["test_doubled"]
+
+
+def test_code_change_changes_version_key(calls):
+    first = Run(sources={"processes": rows(1)})
+    first.execute(["test_total"])
+
+    @analysis("test_total", deps=["test_doubled"])
+    def compute_total_v2(test_doubled):
+        return {"total": -sum(test_doubled)}
+
+    second = Run(sources={"processes": rows(1)})
+    assert second.execute(["test_total"]) == {"test_total": {"total": -2}}
+    assert first.keys["test_total"] != second.keys["test_total"]
+    # Węzeł bez zmian w kodzie i danych: trafienie w pamięć
+    assert first.keys["test_doubled"] == second.keys["test_doubled"]
+    assert calls["test_doubled"] == 1
+
+
+def test_failed_dependency_skips_dependents_only(calls):
+    run = Run(sources={"processes": rows(1, 2)})
+    results = run.execute(["test_after_broken", "test_total"])
+
+    assert results == {"test_total": {"total": 6}}
+    assert isinstance(run.errors["test_broken"], ValueError)
+    assert str(run.errors["test_after_broken"]) == "dependency 'test_broken' failed"
+    assert calls["test_after_broken"] == 0
+
+    with pytest.raises(RuntimeError, match="dependency 'test_broken' failed"):
+        pipeline.run_analysis("test_after_broken", sources={"processes": rows(1, 2)})
+
+
+def test_unknown_node():
+    with pytest.raises(KeyError):
+        Run(sources={"processes": []}).execute(["test_missing"])
+
+
+def test_export_restore_memo_roundtrip(calls):
+    run = Run(sources={"processes": rows(5, 6)})
+    run.execute(["test_total"])
+
+    # Jak w ciepłym starcie: wartości przechodzą przez pickle
+    exported = {name: (key, pickle.loads(pickle.dumps(value))) for name, (key, value) in pipeline.export_memo().items()}
+    assert set(exported) == {"test_doubled", "test_total"}
+    pipeline.clear_memo()
+    pipeline.restore_memo(exported)
+
+    restored = Run(sources={"processes": rows(5, 6)})
+    assert restored.execute(["test_total"]) == {"test_total": {"total": 22}}
+    assert calls == {"test_doubled": 1, "test_total": 1}
+
+    # Przywrócona wartość ze starszą wersją danych nie jest używana
+    changed = Run(sources={"processes": rows(5, 7, stamp="2025-03-01T00:00:00+00:00")})
+    assert changed.execute(["test_total"]) == {"test_total": {"total": 24}}
+    assert calls == {"test_doubled": 2, "test_total": 2}
+
+
+def test_persisted_artifact_survives_memo_clear(calls):
+    Run(sources={"processes": rows(1, 2)}).execute(["test_model"])
+    pipeline.clear_memo()
+
+    run = Run(sources={"processes": rows(1, 2)})
+    assert run.execute(["test_model"]) == {"test_model": {"rows": 2}}
+    assert calls["test_model"] == 1
+    assert pipeline._artifact_path("test_model", run.keys["test_model"]).exists()
@@ -0,0 +1,76 @@
+"""Replika w pamięci (src.replica): delta po updated_at i okresowe wykrywanie usunięć"""
+
+import pytest
+
+from src import database, replica as replica_module
+from src.replica import TableReplica
+
+
+@pytest.fixture
+def db(monkeypatch):
+    tables = {"votings": {}}
+    calls = {"fetch_ids": 0}
+
+    def fetch_ids(table):
+        calls["fetch_ids"] += 1
+        return list(tables[table])
+
+    monkeypatch.setattr(database, "fetch_table", lambda table: list(tables[table].values()))
+    monkeypatch.setattr(database, "fetch_rows_since", lambda table, since: [
+        row for row in tables[table].values() if replica_module._timestamp(row["updated_at"]) >= replica_module._timestamp(since)
+    ])
+    monkeypatch.setattr(database, "fetch_ids", fetch_ids)
+    monkeypatch.setattr(replica_module, "REPLICA_DELETE_CHECK_EVERY", 3)
+    return tables["votings"], calls
+
+
+def put(rows, row_id, stamp, **fields):
+    rows[row_id] = {"id": row_id, "updated_at": stamp, **fields}
+
+
+def test_refresh_applies_delta_without_listing_keys(db):
+    rows, calls = db
+    put(rows, 1, "2025-01-01T00:00:00Z", yes_count=10)
+    put(rows, 2, "2025-01-01T00:00:00Z", yes_count=20)
+    replica = TableReplica("votings")
+    replica.load()
+
+    put(rows, 2, "2025-01-02T00:00:00.5+00:00", yes_count=21)
+    put(rows, 3, "2025-01-02T00:00:00+00:00", yes_count=30)
+    changes = replica.refresh()
+
+    assert sorted((new["id"], new["yes_count"]) for _, new in changes) == [(2, 21), (3, 30)]
+    assert replica.watermark == "2025-01-02T00:00:00.5+00:00"
+    assert calls["fetch_ids"] == 0
+    # Wiersz ze znacznikiem równym watermarkowi wraca w delcie, ale bez zmiany nie jest nakładany
+    assert replica.refresh() == []
+
+
+def test_deletes_detected_every_n_refreshes(db):
+    rows, calls = db
+    put(rows, 1, "2025-01-01T00:00:00Z")
+    put(rows, 2, "2025-01-01T00:00:00Z")
+    replica = TableReplica("votings")
+    replica.load()
+
+    del rows[1]
+    assert replica.refresh() == []
+    assert replica.refresh() == []
+    assert 1 in replica.rows
+
+    changes = replica.refresh()
+    assert [(old["id"], new) for old, new in changes] == [(1, None)]
+    assert set(replica.rows) == {2}
+    assert calls["fetch_ids"] == 1
+
+
+def test_forced_delete_check(db):
+    rows, calls = db
+    put(rows, 1, "2025-01-01T00:00:00Z")
+    replica = TableReplica("votings")
+    replica.load()
+
+    del rows[1]
+    assert [new for _, new in replica.refresh(check_deletes=True)] == [None]
+    assert replica.refresh(check_deletes=False) == []
+    assert calls["fetch_ids"] == 1
@@ -0,0 +1,125 @@
+"""Testy indeksu pełnotekstowego: ranking BM25 i aktualizacja przyrostowa"""
+
+import math
+
+import pytest
+
+from src import search
+
+
+@pytest.fixture(autouse=True)
+def search_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(search, "ARTIFACTS_DIR", str(tmp_path))
+    monkeypatch.setattr(search, "_index", None)
+    return tmp_path / "search"
+
+
+def _process(pid, title, description=None, updated_at="2025-01-01T00:00:00+00:00"):
+    return {"id": pid, "title": title, "description": description, "updated_at": updated_at}
+
+
+PROCESSES = [
+    _process("1", "Projekt ustawy o podatku dochodowym"),
+    _process("2", "Projekt ustawy o ochronie zdrowia",
+             "Zmiany w ustawie o podatku dochodowym od osób fizycznych i w wielu innych ustawach"),
+    _process("3", "Kodeks karny", "Nowelizacja przepisów karnych"),
+    _process("4", "Ustawa o łowiectwie"),
+]
+PRINTS = [{"id": "p1", "title": "Druk w sprawie podatku akcyzowego", "updated_at": "2025-01-01T00:00:00+00:00"}]
+
+QUERIES = ["ustawa", "podatek", "podatku dochodowym", '"kodeks karny"', "kar*", "lowiectwo", "zdrowia podatku"]
+
+
+def _ids(result):
+    return [(r["kind"], r["id"]) for r in result["results"]]
+
+
+def test_normalization_and_stemming():
+    assert search.fold("Ustawa o Łowiectwie") == "ustawa o lowiectwie"
+    assert search.tokenize("ustawy ustawie ustawach") == ["ustaw"] * 3
+    assert search.stem("2024") == "2024"
+
+
+def test_bm25_prefers_shorter_document_with_same_tf():
+    index = search.refresh(PROCESSES, PRINTS)
+    result = index.search("podatku dochodowym")
+    # Oba procesy mają termy raz, krótszy dokument wygrywa
+    assert _ids(result) == [("process", "1"), ("process", "2")]
+    assert result["results"][0]["score"] > result["results"][1]["score"]
+
+
+def test_bm25_score_matches_formula():
+    index = search.refresh(PROCESSES, PRINTS)
+    lengths = [len(search.tokenize(p["title"])) + len(search.tokenize(p["description"])) for p in PROCESSES]
+    lengths.append(len(search.tokenize(PRINTS[0]["title"])))
+    avgdl = sum(lengths) / len(lengths)
+
+    # "lowiectwo" występuje tylko w procesie 4 (tf = 1)
+    n, df, tf = len(lengths), 1, 1
+    idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+    expected = idf * tf * (search.K1 + 1) / (tf + search.K1 * (1 - search.B + search.B * lengths[3] / avgdl))
+    assert index.search("łowiectwo")["results"][0]["score"] == pytest.approx(expected, abs=1e-3)
+
+
+def test_query_syntax():
+    index = search.refresh(PROCESSES, PRINTS)
+    # Wszystkie słowa wymagane
+    assert _ids(index.search("zdrowia podatku")) == [("process", "2")]
+    assert _ids(index.search('"kodeks karny"')) == [("process", "3")]
+    assert index.search('"karny kodeks"')["total"] == 0
+    assert {r["id"] for r in index.search("kar*")["results"]} == {"3"}
+    assert _ids(index.search("podatku", kind="print")) == [("print", "p1")]
+    assert index.search("podatku", limit=1, offset=1)["total"] == 3
+    with pytest.raises(ValueError):
+        index.search("podatku", kind="unknown")
+
+
+def test_incremental_refresh_matches_full_build():
+    index = search.refresh(PROCESSES, PRINTS)
+    segment = index.segment.path
+
+    processes = [
+        _process("1", "Projekt ustawy o podatku od towarów", updated_at="2025-02-01T00:00:00+00:00"),
+        PROCESSES[1],
+        PROCESSES[3],
+        _process("5", "Kodeks wyborczy", "Zmiany w kodeksie karnym skarbowym"),
+    ]
+    index = search.refresh(processes, PRINTS)
+
+    # Delta w pamięci, segment bez zmian: proces 1 zmieniony, 5 nowy, 3 usunięty
+    assert index.segment.path == segment
+    assert index.delta_docs == 2
+    assert len(index) == 5
+
+    updated = {q: index.search(q) for q in QUERIES}
+    rebuilt = search._build([search.process_document(r) for r in processes] +
+                            [search.print_document(r) for r in PRINTS])
+    for query, result in updated.items():
+        expected = rebuilt.search(query)
+        assert _ids(result) == _ids(expected), query
+        assert [r["score"] for r in result["results"]] == pytest.approx(
+            [r["score"] for r in expected["results"]], abs=1e-3), query
+
+
+def test_large_delta_rebuilds_segment(search_dir, monkeypatch):
+    monkeypatch.setattr(search, "MIN_REBUILD_DOCS", 2)
+    index = search.refresh(PROCESSES, PRINTS)
+    old_segment = index.segment.path
+
+    changed = [dict(p, updated_at="2025-03-01T00:00:00+00:00") for p in PROCESSES]
+    index = search.refresh(changed, PRINTS)
+
+    assert index.segment.path != old_segment
+    assert index.delta_docs == 0
+    assert not old_segment.exists()
+    assert (search_dir / "CURRENT").read_text() == index.segment.path.name
+
+
+def test_segment_reloaded_from_disk():
+    search.refresh(PROCESSES, PRINTS)
+    search._index = None
+
+    index = search.refresh(PROCESSES, PRINTS)
+    # Odciski bez zmian: segment z dysku, pusta delta
+    assert index.delta_docs == 0
+    assert _ids(index.search("kodeks")) == [("process", "3")]
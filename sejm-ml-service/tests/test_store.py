@@ -0,0 +1,110 @@
+"""Kompaktowy magazyn procesów (src.store): upserty, usunięcia, migawki, kompaktowanie"""
+
+import copy
+
+import pytest
+
+from loadtest.fixture import generate
+from src import feature_store, pipeline
+from src.store import ProcessRecord, ProcessStore
+
+
+def row(process_id, **fields):
+    return {
+        "id": process_id,
+        "project_type": "government",
+        "urgency": "normal",
+        "categories": ["finanse", "zdrowie"],
+        "timeline": [{"name": "Projekt wpłynął do Sejmu", "dateStart": "2024-01-01"}],
+        "extended_data": {"tags": ["podatki"]},
+        **fields,
+    }
+
+
+def test_upsert_and_delete():
+    store = ProcessStore.from_rows([row("10-1"), row("10-2", urgency="pilny")])
+    assert len(store) == 2 and "10-2" in store
+    assert store["10-2"]["urgency"] == "pilny"
+    assert store["10-1"]["timeline"] == [{"name": "Projekt wpłynął do Sejmu", "dateStart": "2024-01-01"}]
+
+    store["10-1"] = row("10-1", title="Nowy tytuł")
+    assert store["10-1"]["title"] == "Nowy tytuł"
+    assert "title" not in store["10-2"]
+
+    del store["10-2"]
+    assert list(store) == ["10-1"]
+    with pytest.raises(KeyError):
+        store["10-2"]
+
+
+def test_records_compare_by_value():
+    original = row("10-1", description=None)
+    store = ProcessStore.from_rows([copy.deepcopy(original)])
+    first, second = store.snapshot()[0], store.snapshot()[0]
+
+    assert isinstance(first, ProcessRecord)
+    assert first is not second
+    assert first == second == original
+    assert first.to_dict() == original
+    assert store["10-1"] != row("10-1", description="inny")
+
+
+def test_snapshot_consistent_after_mutation():
+    store = ProcessStore.from_rows([row("10-1"), row("10-2"), row("10-3")])
+    snapshot = store.snapshot()
+
+    store["10-1"] = row("10-1", urgency="ekspresowy")
+    del store["10-2"]
+    store["10-4"] = row("10-4")
+
+    # Migawka widzi stan z chwili utworzenia
+    assert [record["id"] for record in snapshot] == ["10-1", "10-2", "10-3"]
+    assert snapshot[0]["urgency"] == "normal"
+    # Nowa migawka: żywe rekordy w kolejności dopisania
+    assert [(r["id"], r["urgency"]) for r in store.snapshot()] == [("10-3", "normal"), ("10-1", "ekspresowy"), ("10-4", "normal")]
+
+
+def test_dead_ratio_and_compacted():
+    store = ProcessStore.from_rows([row("10-1"), row("10-2")])
+    assert store.dead_ratio == 0.0
+
+    store["10-1"] = row("10-1", urgency="pilny")
+    del store["10-2"]
+    assert store.dead_ratio == pytest.approx(2 / 3)
+
+    compacted = store.compacted()
+    assert compacted.dead_ratio == 0.0
+    assert list(compacted) == ["10-1"]
+    assert compacted["10-1"] == store["10-1"] == row("10-1", urgency="pilny")
+    # Kompaktowanie nie zmienia starego magazynu ani jego migawek
+    assert len(store.snapshot()) == 1 and store._size == 3
+
+
+def strip_generated_at(value):
+    if isinstance(value, dict):
+        return {k: strip_generated_at(v) for k, v in value.items() if k != "generated_at"}
+    if isinstance(value, list):
+        return [strip_generated_at(v) for v in value]
+    return value
+
+
+def test_analyses_same_on_dicts_and_snapshot(tmp_path):
+    data = generate(200, 3)
+    sources = {name: data[name] for name in ("votings", "process_stages", "prints")}
+    names = pipeline.list_analyses()
+
+    def run(processes, directory):
+        feature_store.use_directory(tmp_path / directory)
+        pipeline.clear_memo()
+        run = pipeline.Run(sources={**sources, "processes": processes})
+        return run, run.execute(names)
+
+    dict_run, from_dicts = run(data["processes"], "dicts")
+    snapshot = ProcessStore.from_rows(copy.deepcopy(data["processes"])).snapshot()
+    snapshot_run, from_snapshot = run(snapshot, "snapshot")
+    pipeline.clear_memo()
+
+    assert set(dict_run.errors) == set(snapshot_run.errors)
+    assert from_dicts and set(from_dicts) == set(from_snapshot)
+    for name in from_dicts:
+        assert strip_generated_at(from_snapshot[name]) == strip_generated_at(from_dicts[name]), name
@@ -0,0 +1,59 @@
+"""Magazyn i ramka cech (success_prediction) na słownikach i na migawce ProcessStore"""
+
+import copy
+
+import pandas as pd
+import pytest
+
+from loadtest.fixture import generate
+from src import feature_store, pipeline
+from src.analyzers.success_prediction import extract_features
+from src.store import ProcessStore
+
+
+@pytest.fixture
+def processes(tmp_path):
+    feature_store.use_directory(tmp_path / "features")
+    pipeline.clear_memo()
+    yield generate(300, 7)["processes"]
+    pipeline.clear_memo()
+
+
+def expected_frame(rows):
+    return pd.DataFrame([extract_features(row) for row in rows])
+
+
+def test_feature_frame_on_process_store_snapshot(processes):
+    # Migawka repliki: rekord ProcessRecord tworzony przy każdym dostępie
+    snapshot = ProcessStore.from_rows(copy.deepcopy(processes)).snapshot()
+    run = pipeline.Run(sources={"processes": snapshot})
+    results = run.execute(["feature_frame", "success_prediction"])
+
+    assert not run.errors
+    pd.testing.assert_frame_equal(results["feature_frame"], expected_frame(processes))
+
+
+def test_feature_frame_same_on_dicts_and_snapshot(processes, tmp_path):
+    from_dicts = pipeline.Run(sources={"processes": processes}).execute(["feature_frame"])["feature_frame"]
+
+    # Osobny magazyn: ścieżka migawki liczy cechy od zera, a nie z magazynu słowników
+    feature_store.use_directory(tmp_path / "snapshot-features")
+    pipeline.clear_memo()
+    snapshot = ProcessStore.from_rows(copy.deepcopy(processes)).snapshot()
+    from_snapshot = pipeline.Run(sources={"processes": snapshot}).execute(["feature_frame"])["feature_frame"]
+
+    pd.testing.assert_frame_equal(from_dicts, from_snapshot)
+
+
+def test_schema_version_follows_extract_features(processes, monkeypatch):
+    pipeline.Run(sources={"processes": processes}).execute(["feature_store"])
+    schema = pipeline.node_code("feature_store")
+    assert feature_store._stores["success_prediction"].schema_version == schema
+
+    # Zmieniony odcisk kodu (np. nowa wersja extract_features) = pełna przebudowa
+    node = pipeline._nodes["feature_store"]
+    monkeypatch.setitem(pipeline._nodes, "feature_store", pipeline.Node(**{**node.__dict__, "code": "changed"}))
+    pipeline.clear_memo()
+    store = pipeline.Run(sources={"processes": processes}).execute(["feature_store"])["feature_store"]
+    assert store.schema_version == "changed"
+    assert store.recomputed == len(processes)
@@ -8,6 +8,7 @@ import {
   syncPrints, 
   syncProcesses, 
   syncVotings,
+  syncLiveSitting,
   type SyncResult 
 } from "./sync"
 import { enrichProcesses } from "./enrichment/index"
@@ -103,6 +104,14 @@ cron.schedule("0 */6 * * *", async () => {
   await runFullSync()
 })
 
+// Tryb na żywo: w dni posiedzeń co 2 minuty głosowania trafiają do serwisu ML
+if (process.env.ML_SERVICE_URL) {
+  cron.schedule("*/2 * * * *", async () => {
+    const result = await syncLiveSitting(supabase)
+    if (result.errors.length > 0) console.error("Live votings sync errors:", result.errors)
+  })
+}
+
 // Manual start on launch
 console.log("Sejm Sync Service started. Scheduled for every 6 hours.")
 runFullSync().catch(console.error)
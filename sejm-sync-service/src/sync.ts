@@ -238,6 +238,23 @@ export async function syncProcesses(supabase: SupabaseClient, term = CURRENT_TER
   return result
 }
 
+// Wiersz tabeli votings (ten sam format przyjmuje POST /live/votings w serwisie ML)
+function votingRow(term: number, voting: SejmVoting) {
+  return {
+    term_number: term,
+    sitting_number: voting.sitting,
+    voting_number: voting.votingNumber,
+    date: voting.date,
+    topic: voting.topic,
+    description: voting.description,
+    kind: voting.kind,
+    yes_count: voting.yes,
+    no_count: voting.no,
+    abstain_count: voting.abstain,
+    not_participating: voting.notParticipating,
+  }
+}
+
 export async function syncVotings(supabase: SupabaseClient, term = CURRENT_TERM): Promise<SyncResult> {
   const startTime = Date.now()
   const result: SyncResult = { success: true, type: "votings", processed: 0, created: 0, updated: 0, errors: [], duration: 0 }
@@ -259,19 +276,7 @@ export async function syncVotings(supabase: SupabaseClient, term = CURRENT_TERM)
 
       for (const voting of votings) {
         result.processed++
-        const { error } = await supabase.from("votings").upsert({
-          term_number: term,
-          sitting_number: voting.sitting,
-          voting_number: voting.votingNumber,
-          date: voting.date,
-          topic: voting.topic,
-          description: voting.description,
-          kind: voting.kind,
-          yes_count: voting.yes,
-          no_count: voting.no,
-          abstain_count: voting.abstain,
-          not_participating: voting.notParticipating,
-        }, { onConflict: "term_number,sitting_number,voting_number" })
+        const { error } = await supabase.from("votings").upsert(votingRow(term, voting), { onConflict: "term_number,sitting_number,voting_number" })
 
         if (error) result.errors.push(`Voting ${sitting.number}/${voting.votingNumber}: ${error.message}`)
         else result.created++
@@ -284,3 +289,83 @@ export async function syncVotings(supabase: SupabaseClient, term = CURRENT_TERM)
   return result
 }
 
+
+// Wysyła głosowania do trybu na żywo serwisu ML (gdy ustawiono ML_SERVICE_URL)
+async function pushLiveVotings(rows: ReturnType<typeof votingRow>[]): Promise<void> {
+  const mlServiceUrl = process.env.ML_SERVICE_URL
+  if (!mlServiceUrl || rows.length === 0) return
+
+  const headers: Record<string, string> = { "Content-Type": "application/json" }
+  if (process.env.LIVE_INGEST_TOKEN) headers.Authorization = `Bearer ${process.env.LIVE_INGEST_TOKEN}`
+
+  const response = await fetch(`${mlServiceUrl}/live/votings`, { method: "POST", headers, body: JSON.stringify(rows) })
+  if (!response.ok) throw new Error(`ML live ingest HTTP ${response.status}`)
+}
+
+// Pola porównywane z zapisanym głosowaniem (data pomijana: API podaje czas
+// lokalny bez strefy, a baza zwraca TIMESTAMPTZ - tekst nigdy by się nie zgadzał)
+const LIVE_COMPARED_FIELDS = ["topic", "description", "kind", "yes_count", "no_count", "abstain_count", "not_participating"] as const
+
+// Ostatnio wysłany do serwisu ML numer głosowania per posiedzenie ("kadencja/posiedzenie")
+const lastPushedVoting = new Map<string, number>()
+
+// Głosowania dzisiejszego posiedzenia: zapis nowych i zmienionych do bazy + przekazanie do serwisu ML
+export async function syncLiveSitting(supabase: SupabaseClient, term = CURRENT_TERM): Promise<SyncResult> {
+  const startTime = Date.now()
+  const result: SyncResult = { success: true, type: "live_votings", processed: 0, created: 0, updated: 0, errors: [], duration: 0 }
+
+  try {
+    const today = new Date().toLocaleDateString("sv-SE", { timeZone: "Europe/Warsaw" }) // YYYY-MM-DD
+    const sittings = await fetchWithRetry<SejmSitting[]>(`${SEJM_API_BASE}/term${term}/proceedings`)
+    const sitting = sittings?.find((s) => s.dates?.includes(today))
+    if (!sitting) return result
+
+    const votings = await fetchWithRetry<SejmVoting[]>(`${SEJM_API_BASE}/term${term}/votings/${sitting.number}`)
+    if (!votings || votings.length === 0) return result
+
+    const rows = votings.map((voting) => votingRow(term, voting))
+    result.processed = rows.length
+
+    // Upsert tylko nowych i zmienionych: każdy zapis podbija updated_at (trigger),
+    // a niezmienione wiersze co 2 minuty wracałyby do delty serwisu ML
+    const { data: stored, error: selectError } = await supabase
+      .from("votings")
+      .select(`voting_number, ${LIVE_COMPARED_FIELDS.join(", ")}`)
+      .eq("term_number", term)
+      .eq("sitting_number", sitting.number)
+    if (selectError) throw new Error(`Live votings ${sitting.number}: ${selectError.message}`)
+
+    const existing = new Map<number, Record<string, unknown>>()
+    for (const row of (stored ?? []) as unknown as Record<string, unknown>[]) existing.set(Number(row.voting_number), row)
+
+    const created = rows.filter((row) => !existing.has(row.voting_number))
+    const updated = rows.filter((row) => {
+      const previous = existing.get(row.voting_number)
+      return previous !== undefined && LIVE_COMPARED_FIELDS.some((field) => (row[field] ?? null) !== (previous[field] ?? null))
+    })
+    const changed = [...created, ...updated]
+
+    if (changed.length > 0) {
+      const { error } = await supabase.from("votings").upsert(changed, { onConflict: "term_number,sitting_number,voting_number" })
+      if (error) {
+        result.errors.push(`Live votings ${sitting.number}: ${error.message}`)
+        return result
+      }
+      result.created = created.length
+      result.updated = updated.length
+    }
+
+    // Do serwisu ML: zmienione oraz nowsze niż ostatnio wysłane (po restarcie
+    // serwisu synchronizacji całe posiedzenie - ML pomija znane głosowania)
+    const sittingKey = `${term}/${sitting.number}`
+    const lastPushed = lastPushedVoting.get(sittingKey) ?? -1
+    const changedNumbers = new Set(changed.map((row) => row.voting_number))
+    const toPush = rows.filter((row) => row.voting_number > lastPushed || changedNumbers.has(row.voting_number))
+    await pushLiveVotings(toPush)
+    lastPushedVoting.set(sittingKey, Math.max(lastPushed, ...rows.map((row) => row.voting_number)))
+  } catch (error) {
+    result.success = false; result.errors.push(String(error))
+  }
+  result.duration = Date.now() - startTime
+  return result
+}
@@ -0,0 +1,7 @@
+-- updated_at is kept current by the update_*_updated_at triggers from
+-- 002_create_sejm_tables.sql; the ML service delta sync only needs indexes
+
+-- Delta sync filters on updated_at
+CREATE INDEX IF NOT EXISTS idx_processes_updated_at ON legislative_processes(updated_at);
+CREATE INDEX IF NOT EXISTS idx_votings_updated_at ON votings(updated_at);
+CREATE INDEX IF NOT EXISTS idx_process_stages_updated_at ON process_stages(updated_at);
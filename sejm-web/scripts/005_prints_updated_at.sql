@@ -0,0 +1,4 @@
+-- Prints are replicated by the ML service (full-text search); updated_at is
+-- kept current by update_prints_updated_at from 002_create_sejm_tables.sql
+
+CREATE INDEX IF NOT EXISTS idx_prints_updated_at ON prints(updated_at);